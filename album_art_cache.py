@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Hashable
+
+
+DEFAULT_ART_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.spotify_agent', 'album_art')
+DECODED_ART_CACHE_SIZE = 32  # Decoded, resized images kept in memory (~270KB each at 300x300 RGB)
+DEFAULT_ALBUM_ART_SIZE = 300  # Matches UI_CONFIG['album_art_size']
+
+
+def pick_album_image(images: List[Dict], target_size: int = DEFAULT_ALBUM_ART_SIZE) -> Optional[str]:
+    """URL of the smallest Spotify rendition at least target_size wide (else the largest one)"""
+    sized = [image for image in images if image.get('width')]
+    if not sized:
+        return images[0]['url'] if images else None  # Playlist/local art often has no dimensions
+    large_enough = [image for image in sized if image['width'] >= target_size]
+    if large_enough:
+        return min(large_enough, key=lambda image: image['width'])['url']
+    return max(sized, key=lambda image: image['width'])['url']
+
+
+class ArtDiskStore:
+    """Content-addressed disk store of raw album art bytes.
+
+    Images live under objects/ named by the SHA-256 of their bytes, so the same artwork
+    reached through different URLs (or sizes that happen to be identical) is stored once.
+    A small index/ directory maps each URL to the digest of its bytes.
+    """
+
+    def __init__(self, directory: str = DEFAULT_ART_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._index = {}  # url -> digest, read through from index/
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'index'), exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.directory, 'index', hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def _digest_for(self, url: str) -> Optional[str]:
+        digest = self._index.get(url)
+        if digest is None:
+            try:
+                with open(self._index_path(url), encoding='ascii') as f:
+                    digest = f.read().strip()
+            except OSError:
+                return None
+            self._index[url] = digest
+        return digest
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Stored bytes for url, or None on a miss"""
+        with self._lock:
+            digest = self._digest_for(url)
+            if digest:
+                try:
+                    with open(self._object_path(digest), 'rb') as f:
+                        data = f.read()
+                    self.hits += 1
+                    return data
+                except OSError:
+                    self._index.pop(url, None)  # Object was removed - treat as a miss
+            self.misses += 1
+            return None
+
+    def put(self, url: str, data: bytes) -> str:
+        """Store bytes for url and return their digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)  # Atomic: readers never see a partial image
+            with open(self._index_path(url), 'w', encoding='ascii') as f:
+                f.write(digest)
+            self._index[url] = digest
+        return digest
+
+    def stats(self) -> Dict:
+        """Object count, on-disk size and session hit rate"""
+        entries = 0
+        size_bytes = 0
+        for root, _, files in os.walk(os.path.join(self.directory, 'objects')):
+            for name in files:
+                entries += 1
+                size_bytes += os.path.getsize(os.path.join(root, name))
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'size_bytes': size_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class DecodedArtCache:
+    """In-memory LRU of decoded, already-resized images keyed by (album id, size)"""
+
+    def __init__(self, max_entries: int = DECODED_ART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached image for key (marking it most recently used), or None"""
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key: Hashable, image: Any):
+        """Store an image, evicting the least recently used one when full"""
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._images),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
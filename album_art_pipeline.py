@@ -0,0 +1,135 @@
+import functools
+import io
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Callable, Hashable, NamedTuple, Tuple
+from PIL import Image
+from album_art_cache import DecodedArtCache, DEFAULT_ALBUM_ART_SIZE, pick_album_image
+from task_pool import TaskPool
+
+
+class ArtLoad(NamedTuple):
+    """Cost of fetching and decoding one album art image"""
+    url: str
+    bytes: int  # Size of the rendition fetched (network or disk store)
+    fetch_ms: float
+    decode_ms: float
+    source_size: tuple  # Pixel size of the rendition
+    decoded_size: tuple  # Pixel size actually decoded (smaller than source_size with JPEG draft mode)
+
+
+def decode_art(data: bytes, size: int) -> Tuple[Image.Image, tuple, tuple]:
+    """Decode image bytes to a size x size RGB image, decoding no more pixels than needed.
+
+    Returns (image, source pixel size, pixel size actually decoded).
+    """
+    image = Image.open(io.BytesIO(data))
+    source_size = image.size
+    # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below the target size)
+    image.draft('RGB', (size, size))
+    decoded_size = image.size
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    if image.size != (size, size):
+        # reducing_gap box-reduces by an integer factor before the LANCZOS pass (non-JPEG sources)
+        image = image.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    image.load()
+    return image, source_size, decoded_size
+
+
+class AlbumArtPipeline:
+    """Size-aware album art loading on a worker pool, off the Tk thread.
+
+    request() picks the smallest rendition at or above the display size, then fetches it
+    through the controller (disk art store first) and decodes it in draft mode on a worker.
+    Results land in a DecodedArtCache so replays skip both steps.
+    """
+
+    def __init__(self, controller, size: int = DEFAULT_ALBUM_ART_SIZE, workers: int = 2,
+                 images: Optional[DecodedArtCache] = None, tasks: Optional[TaskPool] = None):
+        self.controller = controller
+        self.size = size
+        self.images = images if images is not None else DecodedArtCache()
+        self.loads = deque(maxlen=100)  # Recent ArtLoad records
+        # A shared TaskPool drops delivery of art for a track that is no longer current
+        self.tasks = tasks
+        self._pool = None if tasks else ThreadPoolExecutor(max_workers=workers, thread_name_prefix='album-art')
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def key_for(self, album: Dict) -> Hashable:
+        return (album.get('id') or album.get('uri'), self.size)
+
+    def request(self, album: Dict, on_ready: Callable[[Hashable, Image.Image, Optional[ArtLoad]], None]) -> bool:
+        """Deliver album art to on_ready(key, image, load); True if it was served from memory on the calling thread.
+
+        load is the ArtLoad (bytes fetched, fetch and decode time) for a fresh load, None for a memory hit.
+        """
+        key = self.key_for(album)
+        image = self.images.get(key)
+        if image is not None:
+            on_ready(key, image, None)
+            return True
+
+        url = pick_album_image(album.get('images') or [], self.size)
+        if not url:
+            return False
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+        deliver = functools.partial(self._deliver, key, on_ready)
+        if self.tasks:
+            # Decoded art is cached even if the track changes meanwhile - only delivery is dropped
+            self.tasks.submit(self._load, key, url, on_result=deliver, cancel_stale=False)
+        else:
+            self._pool.submit(lambda: deliver(self._load(key, url)))
+        return False
+
+    @staticmethod
+    def _deliver(key: Hashable, on_ready: Callable[[Hashable, Image.Image, Optional[ArtLoad]], None],
+                 result: Optional[Tuple[Image.Image, ArtLoad]]):
+        if result is not None:
+            on_ready(key, *result)
+
+    def _load(self, key: Hashable, url: str) -> Optional[Tuple[Image.Image, ArtLoad]]:
+        """Fetch and decode one cover into the decoded-image cache; (image, its ArtLoad) or None"""
+        try:
+            started = time.perf_counter()
+            data = self.controller.download_album_art(url)
+            fetched = time.perf_counter()
+            if not data:
+                return None
+
+            image, source_size, decoded_size = decode_art(data, self.size)
+            decoded = time.perf_counter()
+            load = ArtLoad(url, len(data), (fetched - started) * 1000,
+                           (decoded - fetched) * 1000, source_size, decoded_size)
+            self.loads.append(load)
+            self.images.put(key, image)
+            return image, load
+        except Exception as e:
+            print(f"Error loading album art: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def stats(self) -> Dict:
+        """Per-image averages for recent loads plus decoded-image cache hit rate"""
+        loads = list(self.loads)
+        stats = {
+            'images': len(loads),
+            'bytes_total': sum(load.bytes for load in loads),
+            'mean_bytes': sum(load.bytes for load in loads) / len(loads) if loads else 0,
+            'mean_fetch_ms': sum(load.fetch_ms for load in loads) / len(loads) if loads else 0.0,
+            'mean_decode_ms': sum(load.decode_ms for load in loads) / len(loads) if loads else 0.0,
+        }
+        stats.update({f'decoded_{name}': value for name, value in self.images.stats().items()})
+        return stats
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False)
@@ -0,0 +1,278 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, List, Dict, Callable, Coroutine, Any
+from album_art_cache import pick_album_image
+from spotify_controller import SpotifyController, PlaybackSnapshot, SKIP_WAIT_TIMEOUT
+
+
+class AsyncSpotifyController:
+    """asyncio API over SpotifyController, and the one implementation of its play/skip commands.
+
+    spotipy and the HTTP transport are blocking, so each call runs on a small thread pool
+    and is awaited. Independent calls (device lookup + search, then playback + lyrics + art)
+    run concurrently, and "give Spotify time to start" pauses are awaitable polls of the
+    playback state instead of fixed sleeps. Front-ends without their own event loop can
+    start() a background loop and submit() coroutines to it; SpotifyController's blocking
+    play_*/next_track/previous_track do exactly that (use controller.commands to share it).
+    """
+
+    def __init__(self, controller: SpotifyController, max_workers: int = 8, prefetch_art: bool = False):
+        self.controller = controller
+        self.prefetch_art = prefetch_art  # Also download album art while a track starts (front-ends that show it)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='spotify-async')
+        self._loop = None
+        self._loop_thread = None
+
+    @classmethod
+    def from_config(cls, config: Dict, **kwargs) -> 'AsyncSpotifyController':
+        return cls(SpotifyController(config), **kwargs)
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        """Await a blocking controller call on the worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    # ----- Background event loop for threaded front-ends -----
+
+    def start(self):
+        """Run an event loop on a daemon thread (for submit())"""
+        if self._loop_thread and self._loop_thread.is_alive():
+            return
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name='spotify-async-loop', daemon=True)
+        self._loop_thread.start()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the background loop; returns a concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def stop(self):
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=2)
+        self._executor.shutdown(wait=False)
+
+    # ----- Thin async wrappers -----
+
+    async def authenticate(self) -> bool:
+        return await self._run(self.controller.authenticate)
+
+    async def search_song(self, song_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        return await self._run(self.controller.search_song, song_name, artist_name)
+
+    async def search_album(self, album_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        return await self._run(self.controller.search_album, album_name, artist_name)
+
+    async def get_available_devices(self, force_refresh: bool = False):
+        return await self._run(self.controller.get_available_devices, force_refresh)
+
+    async def get_album_tracks(self, album_id: str) -> List[Dict]:
+        return await self._run(self.controller.get_album_tracks, album_id)
+
+    async def get_playlist_tracks(self, playlist_id: str) -> List[Dict]:
+        return await self._run(self.controller.get_playlist_tracks, playlist_id)
+
+    async def get_artist_top_tracks(self, artist_id: str) -> List[Dict]:
+        return await self._run(self.controller.get_artist_top_tracks, artist_id)
+
+    async def update_context_tracks(self):
+        await self._run(self.controller.update_context_tracks)
+
+    async def get_lyrics(self, song_name: str, artist_name: str, duration_ms: int = 0) -> Optional[str]:
+        return await self._run(self.controller.get_lyrics, song_name, artist_name, duration_ms)
+
+    async def download_album_art(self, url: str) -> Optional[bytes]:
+        return await self._run(self.controller.download_album_art, url)
+
+    async def refresh_playback(self) -> Optional[PlaybackSnapshot]:
+        return await self._run(self.controller.refresh_playback)
+
+    async def get_current_track(self) -> Optional[Dict]:
+        return await self._run(self.controller.get_current_track)
+
+    async def pause(self):
+        await self._run(self.controller.pause)
+
+    async def resume(self):
+        await self._run(self.controller.resume)
+
+    async def seek(self, position_ms: int):
+        await self._run(self.controller.seek, position_ms)
+
+    async def set_volume(self, volume: int):
+        await self._run(self.controller.set_volume, volume)
+
+    # ----- Awaitable waits (SpotifyController's polling loop on the worker pool) -----
+
+    async def wait_for_playback(self, predicate: Callable[[PlaybackSnapshot], bool],
+                                deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        """Poll playback until predicate(snapshot) holds; the last snapshot once the deadline passes"""
+        return await self._run(self.controller.wait_for_playback, predicate, deadline)
+
+    async def wait_for_track(self, uri: str, deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        return await self._run(self.controller.wait_for_track, uri, deadline)
+
+    async def wait_for_track_change(self, old_uri: Optional[str],
+                                    deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        return await self._run(self.controller.wait_for_track_change, old_uri, deadline)
+
+    async def wait_for_restart(self, uri: str, since: float,
+                               deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        return await self._run(self.controller.wait_for_restart, uri, since, deadline)
+
+    # ----- Composite commands -----
+
+    async def _start_playback(self, **kwargs) -> bool:
+        try:
+            return await self._run(self.controller.start_playback, **kwargs)
+        except Exception as e:
+            print(f"Error playing track: {e}")
+            if self.controller._is_device_error(e):
+                print("\n[TIP] Open Spotify on your phone/computer and play any song first,")
+                print("then try again. Just having the app open isn't enough.\n")
+            return False
+
+    async def prefetch_track_assets(self, track: Dict):
+        """Warm the lyrics cache (and art store, with prefetch_art) for a track, concurrently"""
+        artist_name = track['artists'][0]['name'] if track.get('artists') else 'Unknown'
+        jobs = [self._run(self.controller._lookup_lyrics, track['name'], artist_name, track.get('duration_ms', 0))]
+        art_url = pick_album_image((track.get('album') or {}).get('images') or [], self.controller.album_art_size)
+        if art_url and self.prefetch_art:
+            jobs.append(self.download_album_art(art_url))
+        await asyncio.gather(*jobs, return_exceptions=True)  # Best effort - the UI refetches on demand
+
+    async def play_track(self, track: Dict) -> bool:
+        """Start a track while its lyrics and art load, then wait for Spotify to report it"""
+        expected = track if track.get('album') else None  # Predicted state needs the album (art, name)
+        current = self.controller.playback_snapshot
+        replay = bool(current and current.track and current.track['uri'] == track['uri'])
+        sent_at = time.monotonic()
+        started, _ = await asyncio.gather(self._start_playback(track=expected, uris=[track['uri']]),
+                                          self.prefetch_track_assets(track))
+        if started:
+            if replay:
+                # Same URI (repeat one) - only a progress reset shows the command took effect
+                await self.wait_for_restart(track['uri'], sent_at)
+            else:
+                await self.wait_for_track(track['uri'])
+        return started
+
+    async def play_song(self, song_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        """Play a specific song"""
+        try:
+            # Device lookup doesn't depend on the search result
+            track, _ = await asyncio.gather(self.search_song(song_name, artist_name),
+                                            self._run(self.controller.resolve_device_id))
+            if not track:
+                print(f"Song not found: {song_name}")
+                return None
+
+            artist = track['artists'][0]['name'] if track['artists'] else 'Unknown'
+            print(f"Playing song: {track['name']} by {artist}")
+
+            await self.play_track(track)
+            self.controller.current_track = track
+            return track
+
+        except Exception as e:
+            print(f"Error playing song: {e}")
+            return None
+
+    async def play_album(self, album_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        """Play an album from the beginning"""
+        try:
+            album, _ = await asyncio.gather(self.search_album(album_name, artist_name),
+                                            self._run(self.controller.resolve_device_id))
+            if not album:
+                print(f"Album not found: {album_name}")
+                return None
+
+            artist = album['artists'][0]['name'] if album['artists'] else 'Unknown'
+            print(f"Playing album: {album['name']} by {artist}")
+
+            # Replaying the album that's playing - only a progress reset shows the command took effect
+            current = self.controller.playback_snapshot
+            replay = bool(current and current.track and current.track['album'].get('id') == album['id'])
+            sent_at = time.monotonic()
+
+            # Track list's first page loads while playback starts (the rest streams in); the
+            # album plays without its track list if that load fails
+            loaded, started = await asyncio.gather(self._run(self.controller.load_context, 'album', album['id']),
+                                                   self._start_playback(context_uri=album['uri']),
+                                                   return_exceptions=True)
+            if isinstance(loaded, Exception):
+                print(f"Error loading album tracks: {loaded}")
+            if started is not True:
+                return None
+
+            snapshot = await self.wait_for_playback(
+                lambda s: (bool(s.track) and s.track['album'].get('id') == album['id']
+                           and (not replay or s.restarted_since(sent_at)))
+            )
+            self.controller.current_track = snapshot.track if snapshot else None
+            self.controller.prefetch_upcoming_lyrics()
+            return self.controller.current_track
+
+        except Exception as e:
+            print(f"Error playing album: {e}")
+            return None
+
+    async def play_random_track(self, artist: Optional[str] = None, genre: Optional[str] = None) -> Optional[Dict]:
+        """Play a random track based on criteria"""
+        try:
+            track = await self._run(self.controller.pick_random_track, artist, genre)
+            if not track:
+                print("No tracks found matching criteria")
+                return None
+
+            await self.play_track(track)
+            self.controller.current_track = track
+            return track
+
+        except Exception as e:
+            print(f"Error playing random track: {e}")
+            return None
+
+    async def _skip(self, command: Callable[[], Any]) -> Optional[Dict]:
+        """Run a next/previous command, falling back to a random track when nothing is queued"""
+        old_uri = self.controller.current_track.get('uri') if self.controller.current_track else None
+        try:
+            await self._run(command)
+            self.controller.notify_activity()
+            # Short deadline: with nothing queued the track never changes and we fall back to random
+            snapshot = await self.wait_for_track_change(old_uri, time.monotonic() + SKIP_WAIT_TIMEOUT)
+        except Exception:
+            snapshot = None
+
+        new_track = snapshot.track if snapshot else None
+        if not new_track or (old_uri and new_track['uri'] == old_uri):
+            return await self.play_random_track()
+        self.controller.current_track = new_track
+        return new_track
+
+    async def next_track(self) -> Optional[Dict]:
+        """Skip to next track and auto-play"""
+        try:
+            mode = self.controller.play_mode
+            if mode == 'repeat_one':
+                if self.controller.current_track:
+                    await self.play_track(self.controller.current_track)
+                return self.controller.current_track
+            if mode == 'shuffle':
+                return await self.play_random_track()
+            return await self._skip(self.controller.sp.next_track)
+        except Exception as e:
+            print(f"Error skipping track: {e}")
+            return None
+
+    async def previous_track(self) -> Optional[Dict]:
+        """Go to previous track and auto-play"""
+        try:
+            return await self._skip(self.controller.sp.previous_track)
+        except Exception as e:
+            print(f"Error going to previous track: {e}")
+            return None
@@ -0,0 +1,198 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Callable, Tuple
+from track_list import TrackList
+
+
+CONTEXT_PAGE_SIZES = {'album': 50, 'playlist': 100}  # Spotify's maximum page size per endpoint
+CONTEXT_CACHE_SIZE = 64
+CONTEXT_CACHE_TTLS = {
+    'album': 24 * 60 * 60,  # Album track lists practically never change
+    'playlist': 5 * 60,  # Playlists are edited
+    'artist': 6 * 60 * 60,  # Top tracks drift slowly
+}
+
+
+class ContextTracks:
+    """Track list of one album/playlist/artist context, filled in as pages arrive"""
+
+    def __init__(self, kind: str, context_id: str):
+        self.kind = kind
+        self.context_id = context_id
+        self.total = 0
+        self.tracks = TrackList()  # Contiguous prefix loaded so far (replaced, never mutated, as pages land)
+        self.loaded_at = None  # time.monotonic() once complete
+        self.error = None
+        self._pages = {}  # offset -> items (None until that page arrives)
+        self._next_offset = 0  # Offset of the first page not yet in tracks
+        self._listeners = []
+        self._done = threading.Event()
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.kind, self.context_id
+
+    @property
+    def complete(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> TrackList:
+        """Block until every page has loaded (or failed); returns what is loaded"""
+        self._done.wait(timeout)
+        return self.tracks
+
+
+class ContextLoader:
+    """Loads every page of album/playlist track lists and caches them per context id.
+
+    The first page is fetched on the caller's thread so the UI has something to show at
+    once; the rest are requested in parallel (offsets are known from the first page's
+    total) and appended in order as they arrive, notifying listeners each time. Contexts
+    are cached only once their first page is in.
+    """
+
+    def __init__(self, controller, workers: int = 4, max_entries: int = CONTEXT_CACHE_SIZE):
+        self.controller = controller
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.pages_fetched = 0
+        self._contexts = OrderedDict()  # (kind, id) -> ContextTracks
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='context-pages')
+
+    def load(self, kind: str, context_id: str,
+             on_update: Optional[Callable[[ContextTracks], None]] = None) -> ContextTracks:
+        """Cached or freshly loading track list; returns after the first page"""
+        key = (kind, context_id)
+        with self._lock:
+            context = self._cached(key, on_update)
+            if context is not None:
+                self.hits += 1
+                return context
+            self.misses += 1
+
+        # Concurrent loads of the same context share one first-page request
+        items, total = self.controller.inflight.do(('context', kind, context_id),
+                                                   self._fetch_page, kind, context_id, 0)
+
+        page_size = CONTEXT_PAGE_SIZES.get(kind)
+        with self._lock:
+            context = self._cached(key, on_update)
+            if context is not None:
+                return context  # Another caller of the same request already set it up
+
+            context = ContextTracks(kind, context_id)
+            if on_update:
+                context._listeners.append(on_update)
+            self._contexts[key] = context
+            while len(self._contexts) > self.max_entries:
+                self._contexts.popitem(last=False)
+
+            context.total = total
+            context.tracks = TrackList(items)
+            context._next_offset = page_size or total
+            remaining = list(range(page_size, total, page_size)) if page_size else []
+            context._pages = {offset: None for offset in remaining}
+            if not remaining:
+                self._finish(context, notify=False)  # Single page - the caller has it all already
+
+        for offset in remaining:
+            self._pool.submit(self.controller.governor.as_background(self._load_page), context, offset)
+        return context
+
+    def _cached(self, key: Tuple[str, str],
+                on_update: Optional[Callable[[ContextTracks], None]]) -> Optional[ContextTracks]:
+        """Unexpired cached context, with on_update subscribed if it is still loading (lock held)"""
+        context = self._contexts.get(key)
+        if context is None or self._expired(context):
+            return None
+        self._contexts.move_to_end(key)
+        if on_update and not context.complete and on_update not in context._listeners:
+            context._listeners.append(on_update)
+        return context
+
+    def invalidate(self, kind: str, context_id: str):
+        with self._lock:
+            self._contexts.pop((kind, context_id), None)
+
+    def _expired(self, context: ContextTracks) -> bool:
+        if context.error is not None:
+            return True
+        if context.loaded_at is None:
+            return False  # Still streaming in
+        return time.monotonic() - context.loaded_at > CONTEXT_CACHE_TTLS.get(context.kind, 0)
+
+    def _fetch_page(self, kind: str, context_id: str, offset: int) -> Tuple[List[Dict], int]:
+        """(tracks, total) for one page of a context"""
+        sp = self.controller.sp
+        with self._lock:
+            self.pages_fetched += 1
+        if kind == 'album':
+            results = sp.album_tracks(context_id, limit=CONTEXT_PAGE_SIZES['album'], offset=offset)
+            return results.get('items', []), results.get('total', 0)
+        if kind == 'playlist':
+            results = sp.playlist_items(context_id, limit=CONTEXT_PAGE_SIZES['playlist'], offset=offset,
+                                        additional_types=('track',))
+            # Local files and removed tracks come back with track=None
+            return [item['track'] for item in results.get('items', []) if item.get('track')], results.get('total', 0)
+        if kind == 'artist':
+            results = sp.artist_top_tracks(context_id, country=self.controller.get_market())
+            tracks = results.get('tracks', [])
+            return tracks, len(tracks)
+        raise ValueError(f"Unknown context kind: {kind}")
+
+    def _load_page(self, context: ContextTracks, offset: int):
+        try:
+            items, _ = self._fetch_page(context.kind, context.context_id, offset)
+        except Exception as e:
+            print(f"Error loading {context.kind} tracks (offset {offset}): {e}")
+            with self._lock:
+                context.error = e  # Keeps the loaded prefix; the next load() refetches
+                self._finish(context)
+            return
+
+        with self._lock:
+            if context.complete:
+                return
+            context._pages[offset] = items
+            # Extend the contiguous prefix with every page that is now in order
+            tracks = context.tracks
+            arrived = []
+            while context._pages.get(context._next_offset) is not None:
+                arrived += context._pages.pop(context._next_offset)
+                context._next_offset += CONTEXT_PAGE_SIZES[context.kind]
+            if arrived:
+                tracks = tracks.extended(arrived)  # Indexes only the new tracks
+            grew = tracks is not context.tracks
+            context.tracks = tracks
+            if not context._pages:
+                self._finish(context)
+                return
+            listeners = list(context._listeners) if grew else []
+
+        for listener in listeners:
+            listener(context)
+
+    def _finish(self, context: ContextTracks, notify: bool = True):
+        """Mark complete and notify (called with the lock held; listeners run on a worker)"""
+        context.loaded_at = time.monotonic()
+        context._pages = {}
+        listeners, context._listeners = context._listeners, []
+        context._done.set()
+        if notify:
+            for listener in listeners:
+                self._pool.submit(listener, context)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._contexts),
+                'pages_fetched': self.pages_fetched,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, NamedTuple
+try:
+    import msvcrt  # Windows console input
+except ImportError:
+    msvcrt = None
+try:
+    import selectors
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+
+# Key names for non-printable keys (printable keys are delivered as the character itself)
+KEY_ENTER = 'enter'
+KEY_BACKSPACE = 'backspace'
+KEY_ESCAPE = 'escape'
+KEY_CTRL_C = 'ctrl_c'
+KEY_UP = 'up'
+KEY_DOWN = 'down'
+KEY_LEFT = 'left'
+KEY_RIGHT = 'right'
+
+MSVCRT_POLL_INTERVAL = 0.01  # The Windows console can't be select()ed, so kbhit() is polled
+ESCAPE_SEQUENCE_TIMEOUT = 0.02  # How long a lone ESC waits for the rest of an arrow key sequence
+
+MSVCRT_SPECIAL_KEYS = {b'H': KEY_UP, b'P': KEY_DOWN, b'K': KEY_LEFT, b'M': KEY_RIGHT}
+ANSI_ESCAPE_KEYS = {b'A': KEY_UP, b'B': KEY_DOWN, b'C': KEY_RIGHT, b'D': KEY_LEFT}
+CONTROL_KEYS = {b'\r': KEY_ENTER, b'\n': KEY_ENTER, b'\x08': KEY_BACKSPACE, b'\x7f': KEY_BACKSPACE,
+                b'\x03': KEY_CTRL_C}
+
+
+class KeyEvent(NamedTuple):
+    """One keystroke, stamped when the backend received it"""
+    key: str  # Printable character or one of the KEY_* names
+    received_at: float  # time.perf_counter() when the key was read
+
+    def latency_ms(self) -> float:
+        """Milliseconds since the key was received"""
+        return (time.perf_counter() - self.received_at) * 1000
+
+
+class InputBackend(ABC):
+    """Source of KeyEvents. read_key() blocks until a key arrives or the timeout passes."""
+
+    @abstractmethod
+    def read_key(self, timeout: Optional[float] = None) -> Optional[KeyEvent]:
+        ...
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MsvcrtInput(InputBackend):
+    """Windows console keyboard via msvcrt"""
+
+    def read_key(self, timeout: Optional[float] = None) -> Optional[KeyEvent]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(MSVCRT_POLL_INTERVAL)
+
+        received_at = time.perf_counter()
+        char = msvcrt.getch()
+        if char in (b'\xe0', b'\x00'):  # Special keys (arrows, etc.) arrive as two bytes
+            return KeyEvent(MSVCRT_SPECIAL_KEYS.get(msvcrt.getch(), KEY_ESCAPE), received_at)
+        if char in CONTROL_KEYS:
+            return KeyEvent(CONTROL_KEYS[char], received_at)
+        try:
+            return KeyEvent(char.decode('utf-8'), received_at)
+        except UnicodeDecodeError:
+            return None
+
+
+class TermiosInput(InputBackend):
+    """POSIX terminal keyboard: cbreak mode + selectors, so the reader sleeps until a key arrives"""
+
+    def __init__(self, stream=None):
+        self.fd = (stream or sys.stdin).fileno()
+        self._saved_attrs = termios.tcgetattr(self.fd)
+        self._buffer = b''
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.fd, selectors.EVENT_READ)
+
+        # Unbuffered, no echo; ISIG off so Ctrl+C arrives as a key like on Windows
+        tty.setcbreak(self.fd)
+        attrs = termios.tcgetattr(self.fd)
+        attrs[3] &= ~termios.ISIG
+        termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+
+    def _fill(self, timeout: Optional[float]) -> bool:
+        """Wait up to timeout for more input; False if none arrived"""
+        if not self._selector.select(timeout):
+            return False
+        data = os.read(self.fd, 1024)
+        self._buffer += data
+        return bool(data)
+
+    def read_key(self, timeout: Optional[float] = None) -> Optional[KeyEvent]:
+        if not self._buffer and not self._fill(timeout):
+            return None
+        received_at = time.perf_counter()
+
+        if self._buffer[:1] == b'\x1b':
+            if len(self._buffer) < 3:
+                self._fill(ESCAPE_SEQUENCE_TIMEOUT)  # Rest of an arrow key sequence is in flight
+            return KeyEvent(self._take_escape(), received_at)
+
+        char = self._buffer[:1]
+        if char in CONTROL_KEYS:
+            self._buffer = self._buffer[1:]
+            return KeyEvent(CONTROL_KEYS[char], received_at)
+
+        # One UTF-8 character (its length comes from the lead byte)
+        lead = self._buffer[0]
+        length = 1 if lead < 0xc0 else 2 if lead < 0xe0 else 3 if lead < 0xf0 else 4
+        while len(self._buffer) < length and self._fill(ESCAPE_SEQUENCE_TIMEOUT):
+            pass
+        char, self._buffer = self._buffer[:length], self._buffer[length:]
+        try:
+            return KeyEvent(char.decode('utf-8'), received_at)
+        except UnicodeDecodeError:
+            return None
+
+    def _take_escape(self) -> str:
+        """Consume an ESC [ X / ESC O X sequence (or a lone ESC) from the buffer"""
+        if self._buffer[1:2] not in (b'[', b'O'):
+            self._buffer = self._buffer[1:]
+            return KEY_ESCAPE
+        # CSI sequences end with a byte in @..~ (parameters like "1;5" come before it)
+        end = 2
+        while end < len(self._buffer) and not 0x40 <= self._buffer[end] <= 0x7e:
+            end += 1
+        final = self._buffer[end:end + 1]
+        self._buffer = self._buffer[end + 1:]
+        return ANSI_ESCAPE_KEYS.get(final, KEY_ESCAPE)
+
+    def close(self):
+        if self._saved_attrs is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved_attrs)
+            self._saved_attrs = None
+            self._selector.close()
+
+
+def create_input_backend() -> Optional[InputBackend]:
+    """Keyboard backend for this platform, or None when stdin isn't an interactive console"""
+    if msvcrt is not None:
+        return MsvcrtInput()
+    if termios is not None and sys.stdin.isatty():
+        return TermiosInput()
+    return None
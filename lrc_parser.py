@@ -0,0 +1,141 @@
+import re
+from typing import Optional, List, Tuple
+from synced_lyrics import SyncedLyrics
+
+
+# [mm:ss], [mm:ss.x], [mm:ss.xx], [mm:ss.xxx] (and the [mm:ss:xx] variant some editors write)
+TIMESTAMP = r'(\d+):(\d{1,2})(?:[.:](\d{1,3}))?'
+STAMP_RE = re.compile(r'\[' + TIMESTAMP + r'\]')
+WORD_STAMP_RE = re.compile(r'<' + TIMESTAMP + r'>')
+ID_TAG_RE = re.compile(r'\[([A-Za-z#]+):(.*)\]$')
+# Fast path: the common line of one stamp and its text (possibly word-timed), no further brackets
+SIMPLE_LINE_RE = re.compile(r'\[' + TIMESTAMP + r'\]([^\[]*)$')
+FRACTION_SCALE = (0, 100, 10, 1)  # Digits after the dot -> ms multiplier
+
+
+def timestamp_to_ms(minutes: str, seconds: str, fraction: Optional[str]) -> int:
+    """Convert captured timestamp fields to milliseconds (fraction may be tenths, centis or millis)"""
+    ms = int(minutes) * 60000 + int(seconds) * 1000
+    if fraction:
+        ms += int(fraction) * FRACTION_SCALE[len(fraction)]
+    return ms
+
+
+class LrcParser:
+    """Incremental parser for LRC lyrics.
+
+    Supports every timestamp precision, several timestamps on one line, ID tags
+    (including [offset:]) and enhanced word-level <mm:ss.xx> timings. Feed text in
+    arbitrary chunks with feed(); close() returns the SyncedLyrics model.
+    """
+
+    def __init__(self):
+        self.tags = {}  # ID tags such as ar, ti, al, length, offset
+        self._entries = []  # (timestamp_ms, text, word_timings) before the offset is applied
+        self._buffer = ''
+
+    def feed(self, chunk: str):
+        """Parse every complete line in chunk; a trailing partial line waits for the next chunk"""
+        lines = (self._buffer + chunk).split('\n')
+        self._buffer = lines.pop()
+        simple_line = SIMPLE_LINE_RE.match
+        parse_line = self._parse_line
+        parse_words = self._parse_words
+        append = self._entries.append
+        for line in lines:
+            match = simple_line(line)
+            if match is None:
+                parse_line(line)  # Tags, several stamps, leading BOM/whitespace
+                continue
+            minutes, seconds, fraction, text = match.groups()
+            if '<' in text:
+                text, words = parse_words(text)
+            else:
+                text, words = text.strip(), None
+            if text:
+                timestamp = int(minutes) * 60000 + int(seconds) * 1000
+                if fraction:
+                    timestamp += int(fraction) * FRACTION_SCALE[len(fraction)]
+                append((timestamp, text, words))
+
+    def close(self) -> SyncedLyrics:
+        """Flush the last line and build the lyrics model"""
+        if self._buffer:
+            self._parse_line(self._buffer)
+            self._buffer = ''
+        return SyncedLyrics(self._entries_with_offset())
+
+    @property
+    def offset_ms(self) -> int:
+        """[offset:] tag in ms; positive values make lyrics appear sooner"""
+        try:
+            return int(self.tags.get('offset', '0').strip() or 0)
+        except ValueError:
+            return 0
+
+    def _entries_with_offset(self) -> List[Tuple[int, str, Optional[List[Tuple[int, str]]]]]:
+        offset = self.offset_ms
+        if not offset:
+            return self._entries
+        return [
+            (max(0, timestamp - offset), text,
+             [(max(0, word_ms - offset), word) for word_ms, word in words] if words else None)
+            for timestamp, text, words in self._entries
+        ]
+
+    def _parse_line(self, line: str):
+        line = line.strip()
+        if not line.startswith('['):
+            if not line.startswith('\ufeff['):
+                return
+            line = line[1:]
+
+        # Leading run of [mm:ss.xx] stamps; anything else in brackets is an ID tag
+        stamps = []
+        pos = 0
+        match = STAMP_RE.match(line)
+        while match:
+            stamps.append(timestamp_to_ms(*match.groups()))
+            pos = match.end()
+            match = STAMP_RE.match(line, pos)
+
+        if not stamps:
+            tag = ID_TAG_RE.match(line)
+            if tag:
+                self.tags[tag.group(1).lower()] = tag.group(2).strip()
+            return
+
+        body = line[pos:]
+        if '<' in body:
+            text, words = self._parse_words(body)
+        else:
+            text, words = body.strip(), None
+        if not text:  # Only add non-empty lines
+            return
+
+        entries = self._entries
+        for timestamp in stamps:
+            entries.append((timestamp, text, words))
+
+    @staticmethod
+    def _parse_words(body: str) -> Tuple[str, Optional[List[Tuple[int, str]]]]:
+        """Split enhanced-LRC word timings out of a line body"""
+        parts = WORD_STAMP_RE.split(body)
+        # parts = [leading text, m, s, frac, word, m, s, frac, word, ...]
+        words = []
+        for minutes, seconds, fraction, word in zip(parts[1::4], parts[2::4], parts[3::4], parts[4::4]):
+            word = word.strip()
+            if word:
+                word_ms = int(minutes) * 60000 + int(seconds) * 1000  # timestamp_to_ms, inlined for the hot loop
+                if fraction:
+                    word_ms += int(fraction) * FRACTION_SCALE[len(fraction)]
+                words.append((word_ms, word))
+        text = ' '.join(''.join(parts[0::4]).split())
+        return text, words or None
+
+
+def parse_lrc(lrc_text: str) -> SyncedLyrics:
+    """Parse a complete LRC document"""
+    parser = LrcParser()
+    parser.feed(lrc_text)
+    return parser.close()
@@ -0,0 +1,131 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Optional, Dict, NamedTuple
+
+
+DEFAULT_LYRICS_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.spotify_agent', 'lyrics_cache.sqlite3')
+FOUND_TTL_SECONDS = 30 * 24 * 60 * 60  # Lyrics rarely change once published
+NOT_FOUND_TTL_SECONDS = 24 * 60 * 60  # Re-check misses daily - LRCLIB is community-edited
+DURATION_BUCKET_MS = 5000  # LRCLIB matches duration within a couple of seconds
+
+
+class CachedLyrics(NamedTuple):
+    """A cached LRCLIB lookup result (found=False is a cached "not found")"""
+    synced: Optional[str]
+    plain: Optional[str]
+    found: bool
+
+
+def normalize_text(text: str) -> str:
+    """Normalize a track/artist name for cache keys: case, accents, punctuation, featuring/remaster tags"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r'\s[-–]\s.*(remaster|version|edit|mix|live).*$', '', text)  # "Song - Remastered 2009"
+    text = re.sub(r'[(\[].*?[)\]]', '', text)  # "(feat. X)", "[Live]"
+    text = re.sub(r'[^\w\s]', '', text)
+    return ' '.join(text.split())
+
+
+def lyrics_cache_key(track_name: str, artist_name: str, duration_ms: int = 0) -> str:
+    """Cache key from normalized track name, artist and duration bucket"""
+    bucket = int(duration_ms // DURATION_BUCKET_MS) if duration_ms > 0 else 0
+    return f"{normalize_text(track_name)}|{normalize_text(artist_name)}|{bucket}"
+
+
+class LyricsCache:
+    """Persistent SQLite cache of LRCLIB lookups, including negative results"""
+
+    def __init__(self, path: str = DEFAULT_LYRICS_CACHE_PATH,
+                 found_ttl: float = FOUND_TTL_SECONDS, not_found_ttl: float = NOT_FOUND_TTL_SECONDS):
+        self.path = path
+        self.found_ttl = found_ttl
+        self.not_found_ttl = not_found_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL' if path != ':memory:' else 'PRAGMA journal_mode=MEMORY')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS lyrics (
+                key TEXT PRIMARY KEY,
+                synced TEXT,
+                plain TEXT,
+                found INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self._db.commit()
+
+    def get(self, track_name: str, artist_name: str, duration_ms: int = 0) -> Optional[CachedLyrics]:
+        """Return a fresh cached result, or None on a miss/expired entry"""
+        key = lyrics_cache_key(track_name, artist_name, duration_ms)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT synced, plain, found, fetched_at FROM lyrics WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row:
+                synced, plain, found, fetched_at = row
+                ttl = self.found_ttl if found else self.not_found_ttl
+                if time.time() - fetched_at < ttl:
+                    self.hits += 1
+                    return CachedLyrics(synced, plain, bool(found))
+
+            self.misses += 1
+            return None
+
+    def contains(self, track_name: str, artist_name: str, duration_ms: int = 0) -> bool:
+        """Whether a fresh entry exists (does not count towards hit/miss stats)"""
+        key = lyrics_cache_key(track_name, artist_name, duration_ms)
+        with self._lock:
+            row = self._db.execute('SELECT found, fetched_at FROM lyrics WHERE key = ?', (key,)).fetchone()
+        if not row:
+            return False
+        ttl = self.found_ttl if row[0] else self.not_found_ttl
+        return time.time() - row[1] < ttl
+
+    def put(self, track_name: str, artist_name: str, duration_ms: int,
+            synced: Optional[str], plain: Optional[str]):
+        """Store a lookup result; with neither synced nor plain lyrics it is cached as "not found\""""
+        key = lyrics_cache_key(track_name, artist_name, duration_ms)
+        found = 1 if (synced or plain) else 0
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO lyrics (key, synced, plain, found, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                (key, synced, plain, found, time.time())
+            )
+            self._db.commit()
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._db.execute('DELETE FROM lyrics')
+            self._db.commit()
+
+    def stats(self) -> Dict:
+        """Entry counts, on-disk size and session hit rate"""
+        with self._lock:
+            entries, found = self._db.execute('SELECT COUNT(*), COALESCE(SUM(found), 0) FROM lyrics').fetchone()
+            page_count = self._db.execute('PRAGMA page_count').fetchone()[0]
+            page_size = self._db.execute('PRAGMA page_size').fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'found': found,
+                'not_found': entries - found,
+                'size_bytes': page_count * page_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,199 @@
+import contextlib
+import functools
+import threading
+import time
+from typing import Optional, Dict, Callable
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+
+# Spotify rate-limits on a rolling 30 second window; the request count isn't published,
+# so stay comfortably under what a single app is observed to get away with.
+SPOTIFY_RATE_WINDOW = 30.0
+SPOTIFY_RATE_LIMIT = 150  # Requests per window
+BACKGROUND_RESERVE = 0.2  # Fraction of the bucket only user commands may spend
+RATE_LIMIT_RETRIES = 3  # 429 responses retried (after Retry-After) before giving up
+MAX_RETRY_AFTER = 30.0  # Longer Retry-After than this is returned to the caller as an error
+DEFAULT_RETRY_AFTER = 1.0  # When a 429 comes without a usable Retry-After
+
+PRIORITY_USER = 0  # Commands the user is waiting on
+PRIORITY_BACKGROUND = 1  # Polling, prefetch, revalidation
+
+
+class RequestGovernor:
+    """Client-side token bucket for Spotify API requests, with user commands ahead of background work.
+
+    acquire() blocks until a token is free and no throttle (from a 429's Retry-After) is in
+    force. User requests always go first; background requests also leave a reserve of the
+    bucket untouched so a burst of polling/prefetch can't make the next key press wait.
+    Priority is per thread: wrap background work in background() (or as_background()).
+    """
+
+    def __init__(self, limit: int = SPOTIFY_RATE_LIMIT, window: float = SPOTIFY_RATE_WINDOW,
+                 background_reserve: float = BACKGROUND_RESERVE):
+        # A full bucket plus a window's worth of refill must fit in the limit, so any rolling
+        # window sees at most `limit` requests: half as burst, half as sustained rate.
+        self.capacity = limit / 2
+        self.rate = limit / 2 / window  # Tokens refilled per second
+        self.reserve = self.capacity * background_reserve
+        self.tokens = self.capacity
+        self.throttled_until = 0.0  # time.monotonic() before which nothing is sent
+        self.requests = 0
+        self.delayed_requests = 0
+        self.throttle_seconds = 0.0  # Total time requests spent waiting in acquire()
+        self.rate_limited = 0  # 429 responses received
+        self.retry_after_seconds = 0.0  # Total Retry-After imposed by the server
+        self._waiting = {PRIORITY_USER: 0, PRIORITY_BACKGROUND: 0}
+        self._refilled_at = time.monotonic()
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    # ----- Per-thread priority -----
+
+    @property
+    def priority(self) -> int:
+        return getattr(self._local, 'priority', PRIORITY_USER)
+
+    @contextlib.contextmanager
+    def background(self):
+        """Requests made by this thread inside the block yield to user commands"""
+        previous = self.priority
+        self._local.priority = PRIORITY_BACKGROUND
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def as_background(self, fn: Callable) -> Callable:
+        """fn wrapped to run with background priority (for thread targets and pool tasks)"""
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with self.background():
+                return fn(*args, **kwargs)
+        return run
+
+    # ----- Bucket -----
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self, priority: Optional[int] = None) -> float:
+        """Take a token, waiting as long as needed; returns the seconds waited"""
+        priority = self.priority if priority is None else priority
+        floor = 1.0 if priority == PRIORITY_USER else 1.0 + self.reserve
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    ahead = priority == PRIORITY_BACKGROUND and self._waiting[PRIORITY_USER]
+                    if now >= self.throttled_until and self.tokens >= floor and not ahead:
+                        self.tokens -= 1
+                        break
+                    if now < self.throttled_until:
+                        delay = self.throttled_until - now
+                    else:
+                        delay = max((floor - self.tokens) / self.rate, 0.001)
+                    self._cond.wait(delay)
+            finally:
+                self._waiting[priority] -= 1
+            self._cond.notify_all()  # Lower-priority waiters re-check once this one is through
+
+            waited = time.monotonic() - started
+            self.requests += 1
+            if waited > 0.001:
+                self.delayed_requests += 1
+                self.throttle_seconds += waited
+            return waited
+
+    def throttle(self, retry_after: float):
+        """Hold every request until retry_after seconds from now (a 429's Retry-After)"""
+        with self._cond:
+            self.rate_limited += 1
+            self.retry_after_seconds += retry_after
+            hold = min(retry_after, MAX_RETRY_AFTER)  # Past that, let callers find out from a fresh 429
+            self.throttled_until = max(self.throttled_until, time.monotonic() + hold)
+            self.tokens = min(self.tokens, 0.0)  # Our estimate of the server's window was too generous
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                'tokens': int(self.tokens),
+                'queue_depth': sum(self._waiting.values()),
+                'queued_user': self._waiting[PRIORITY_USER],
+                'queued_background': self._waiting[PRIORITY_BACKGROUND],
+                'requests': self.requests,
+                'delayed': self.delayed_requests,
+                'throttle_s': round(self.throttle_seconds, 3),
+                'rate_limited': self.rate_limited,
+                'retry_after_s': round(self.retry_after_seconds, 3),
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Seconds from a Retry-After header (Spotify sends delta-seconds)"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def connect_failed(error: requests.exceptions.ConnectionError) -> bool:
+    """Whether a ConnectionError happened before the request left (safe to resend any method)"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, 'reason', reason)  # requests wraps urllib3's MaxRetryError
+    return isinstance(reason, ConnectTimeoutError)  # Includes NewConnectionError (refused, DNS)
+
+
+class GovernedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a governor token for every attempt it sends.
+
+    It runs its own retries instead of urllib3's Retry (which would resend inside
+    HTTPAdapter.send, past the governor): 429s after their Retry-After, and with exponential
+    backoff failed connects (any method) plus dropped connections and status_forcelist
+    responses (allowed_methods only - the request may already have been acted on).
+    """
+
+    def __init__(self, governor: RequestGovernor, retries: int = 0, backoff_factor: float = 0.3,
+                 status_forcelist=(), allowed_methods=('GET',), **kwargs):
+        self.governor = governor
+        self.retries = retries  # Connection errors + status_forcelist responses, like urllib3's Retry(total=...)
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = frozenset(status_forcelist)
+        self.allowed_methods = frozenset(allowed_methods)
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        rate_limited = failures = 0
+        while True:
+            self.governor.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if failures >= self.retries or not (request.method in self.allowed_methods or connect_failed(e)):
+                    raise
+                failures += 1
+                time.sleep(self.backoff_factor * 2 ** (failures - 1))
+                continue
+
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.governor.throttle(retry_after)
+                if rate_limited == RATE_LIMIT_RETRIES or retry_after > MAX_RETRY_AFTER:
+                    return response  # spotipy raises it as a SpotifyException like any other error
+                rate_limited += 1
+            elif (response.status_code in self.status_forcelist and request.method in self.allowed_methods
+                    and failures < self.retries):
+                failures += 1
+                time.sleep(self.backoff_factor * 2 ** (failures - 1))
+            else:
+                return response
+            response.close()
@@ -0,0 +1,94 @@
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Dict, Any, NamedTuple, Tuple
+
+
+SEARCH_CACHE_SIZE = 256
+SEARCH_FRESH_SECONDS = 6 * 60 * 60  # Served as-is
+SEARCH_STALE_SECONDS = 7 * 24 * 60 * 60  # Served while a background search refreshes it
+SEARCH_NOT_FOUND_SECONDS = 15 * 60  # Misses expire outright - the title may just have been mistyped
+
+
+def normalize_query(text: Optional[str]) -> str:
+    """Case-, accent- and whitespace-insensitive form of a search term"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.casefold().split())
+
+
+class SearchEntry(NamedTuple):
+    """A cached search result (value None is a cached "not found")"""
+    value: Optional[Any]
+    stale: bool  # Past the fresh window - caller should revalidate
+
+
+class SearchCache:
+    """In-memory LRU+TTL cache of song/album searches, with negative caching and stale-while-revalidate"""
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE, fresh_ttl: float = SEARCH_FRESH_SECONDS,
+                 stale_ttl: float = SEARCH_STALE_SECONDS, not_found_ttl: float = SEARCH_NOT_FOUND_SECONDS):
+        self.max_entries = max_entries
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.not_found_ttl = not_found_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, query: str, artist: Optional[str] = None) -> Tuple[str, str, str]:
+        return kind, normalize_query(query), normalize_query(artist)
+
+    def get(self, kind: str, query: str, artist: Optional[str] = None) -> Optional[SearchEntry]:
+        """Cached entry (possibly stale), or None when absent/expired"""
+        key = self.key(kind, query, artist)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                value, stored_at = cached
+                age = time.monotonic() - stored_at
+                max_age = self.stale_ttl if value is not None else self.not_found_ttl
+                if age < max_age:
+                    self._entries.move_to_end(key)
+                    stale = value is not None and age >= self.fresh_ttl
+                    if value is None:
+                        self.negative_hits += 1
+                    elif stale:
+                        self.stale_hits += 1
+                    else:
+                        self.hits += 1
+                    return SearchEntry(value, stale)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, kind: str, query: str, artist: Optional[str], value: Optional[Any]):
+        """Store a search result; None records "not found\""""
+        key = self.key(kind, query, artist)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            served = self.hits + self.stale_hits + self.negative_hits
+            lookups = served + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'hit_rate': served / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,238 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import deque, OrderedDict
+from typing import Optional, List, Dict, Callable, Tuple
+
+
+SHUFFLE_HISTORY_SIZE = 500  # Played track URIs remembered (oldest forgotten first)
+DEFAULT_SHUFFLE_HISTORY_PATH = os.path.join(os.path.expanduser('~'), '.spotify_agent', 'shuffle_history.json')
+SHUFFLE_PAGE_SIZE = 50  # Spotify's maximum search page size
+SHUFFLE_MAX_OFFSET = 1000  # Spotify refuses search offsets beyond this
+SHUFFLE_POOL_TTL = 30 * 60  # Search results drift; refetch a criteria's candidates after this
+SHUFFLE_MAX_POOLS = 16
+SHUFFLE_RANDOM_QUERY_ATTEMPTS = 5  # Fresh random searches per pick (empty or all played) before giving up
+
+
+class ShuffleHistory:
+    """Insertion-ordered, bounded set of played track URIs (deque keeps the order, set answers lookups).
+
+    Optionally persisted as a JSON list so shuffle doesn't repeat tracks from the last session.
+    """
+
+    def __init__(self, max_size: int = SHUFFLE_HISTORY_SIZE, path: Optional[str] = None):
+        self.max_size = max_size
+        self.path = path
+        self._order = deque()
+        self._uris = set()
+        if path:
+            self._load()
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._uris
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, uri: str):
+        if uri in self._uris:
+            return
+        self._order.append(uri)
+        self._uris.add(uri)
+        while len(self._order) > self.max_size:
+            self._uris.discard(self._order.popleft())  # Forget the oldest play
+        self._save()
+
+    def clear(self):
+        self._order.clear()
+        self._uris.clear()
+        self._save()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                uris = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Shuffle history not loaded: {e}")
+            return
+        for uri in uris[-self.max_size:]:
+            if isinstance(uri, str) and uri not in self._uris:
+                self._order.append(uri)
+                self._uris.add(uri)
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self._order), f)
+            os.replace(tmp_path, self.path)  # Never leave a half-written history behind
+        except Exception as e:
+            print(f"Shuffle history not saved: {e}")
+
+
+class CandidatePool:
+    """Undrawn search results for one set of random-track criteria, fetched a page at a time"""
+
+    __slots__ = ('query', 'tracks', 'offset', 'total', 'filled_at', 'fetching')
+
+    def __init__(self, query: str):
+        self.query = query
+        self.tracks = []
+        self.offset = 0  # Offset of the next page to fetch
+        self.total = None  # Result count (capped at SHUFFLE_MAX_OFFSET) once the first page is in
+        self.filled_at = time.monotonic()
+        self.fetching = None  # threading.Event while a choose() fetches the next page
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.tracks and self.total is not None and self.offset >= self.total
+
+
+class ShuffleEngine:
+    """Random track selection without repeats.
+
+    Each criteria (artist, genre) keeps a pool of candidates from search pages of up to 50
+    tracks. A pick is a swap-with-last pop from the pool (O(1)); candidates already in the
+    play history are dropped as they come up. When a pool runs dry the next page is
+    fetched; once every page has been drawn the pool starts over, and if even that yields
+    nothing unplayed the history is reset. Pools with a random query (no criteria) search a
+    fresh query() on every refill instead of paging through one.
+    """
+
+    def __init__(self, fetch_page: Callable[[str, int, int], Tuple[List[Dict], int]],
+                 history_size: int = SHUFFLE_HISTORY_SIZE, history_path: Optional[str] = None):
+        self.fetch_page = fetch_page  # (query, offset, limit) -> (tracks, total)
+        self.history = ShuffleHistory(history_size, history_path)
+        self.pages_fetched = 0
+        self.picks = 0
+        self.skipped_played = 0
+        self.history_resets = 0
+        self._pools = OrderedDict()  # criteria -> CandidatePool
+        self._lock = threading.Lock()
+
+    def played(self, uri: str) -> bool:
+        with self._lock:
+            return uri in self.history
+
+    def record(self, uri: str):
+        with self._lock:
+            self.history.add(uri)
+
+    def clear_history(self):
+        with self._lock:
+            self.history.clear()
+
+    def choose(self, criteria: Tuple, query: Callable[[], str], skip_played: bool = True,
+               random_query: bool = False) -> Optional[Dict]:
+        """Draw a random track for criteria (query() builds its search query); None if nothing matches.
+
+        With random_query, query() returns a different search each call: every refill uses a
+        fresh one, and one that matches nothing is just replaced by another.
+        """
+        restarts = refills = 0
+        while True:
+            with self._lock:
+                pool = self._pools.get(criteria)
+                if pool is None or time.monotonic() - pool.filled_at > SHUFFLE_POOL_TTL:
+                    pool = self._new_pool(criteria, query())
+                self._pools.move_to_end(criteria)
+
+                track = self._draw(pool, skip_played)
+                if track:
+                    self.picks += 1
+                    return track
+
+                if random_query and pool.total is not None:
+                    refills += 1
+                    if refills > SHUFFLE_RANDOM_QUERY_ATTEMPTS:
+                        if restarts or not (skip_played and len(self.history)):
+                            return None
+                        # Fresh searches kept turning up only played tracks
+                        print("All tracks played - resetting shuffle history")
+                        self.history.clear()
+                        self.history_resets += 1
+                        restarts, refills = 1, 0  # One more round of searches, then give up
+                    pool = self._new_pool(criteria, query())
+                elif pool.exhausted:
+                    restarts += 1
+                    if restarts == 2 and skip_played:
+                        # Started over and still found nothing unplayed - every candidate has been played
+                        print("All tracks played - resetting shuffle history")
+                        self.history.clear()
+                        self.history_resets += 1
+                    elif restarts > 2:
+                        return None
+                    pool = self._new_pool(criteria, query())
+
+                fetching = pool.fetching
+                if fetching is None:
+                    fetching = pool.fetching = threading.Event()
+                    offset = pool.offset
+                else:
+                    offset = None  # Another choose() is fetching this pool's next page
+
+            if offset is None:
+                fetching.wait()
+                continue
+
+            # The page fetch is a network call - don't hold up other picks, record() or stats() meanwhile
+            try:
+                tracks, total = self.fetch_page(pool.query, offset, SHUFFLE_PAGE_SIZE)
+            finally:
+                with self._lock:
+                    pool.fetching = None
+                fetching.set()
+
+            with self._lock:
+                self.pages_fetched += 1
+                if not tracks and offset == 0 and not random_query:
+                    return None  # Nothing matches these criteria at all
+                if self._pools.get(criteria) is not pool:
+                    continue  # Replaced (expired or restarted) while fetching; draw again
+                pool.tracks.extend(tracks)
+                pool.offset += SHUFFLE_PAGE_SIZE
+                pool.total = min(total, SHUFFLE_MAX_OFFSET) if tracks else pool.offset
+
+    def put_back(self, criteria: Tuple, track: Dict):
+        """Return a drawn but unused track (e.g. a stale prediction) to its criteria's pool"""
+        with self._lock:
+            pool = self._pools.get(criteria)
+            if pool is not None:
+                pool.tracks.append(track)
+
+    def _new_pool(self, criteria: Tuple, query: str) -> CandidatePool:
+        pool = self._pools[criteria] = CandidatePool(query)
+        self._pools.move_to_end(criteria)
+        while len(self._pools) > SHUFFLE_MAX_POOLS:
+            self._pools.popitem(last=False)
+        return pool
+
+    def _draw(self, pool: CandidatePool, skip_played: bool) -> Optional[Dict]:
+        tracks = pool.tracks
+        while tracks:
+            index = random.randrange(len(tracks))
+            tracks[index], tracks[-1] = tracks[-1], tracks[index]
+            track = tracks.pop()
+            if not skip_played or track.get('uri') not in self.history:
+                return track
+            self.skipped_played += 1
+        return None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'history': len(self.history),
+                'pools': len(self._pools),
+                'candidates': sum(len(pool.tracks) for pool in self._pools.values()),
+                'picks': self.picks,
+                'pages_fetched': self.pages_fetched,
+                'skipped_played': self.skipped_played,
+                'history_resets': self.history_resets,
+            }
@@ -0,0 +1,72 @@
+import threading
+from typing import Dict, Hashable, Callable, Any
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs a function once per key at a time; concurrent callers with the same key share its result.
+
+    Keys are tuples whose first element names the kind of request ('lyrics', 'context',
+    'search', 'art'), so coalescing can be counted per kind. Nothing is cached: once the
+    call returns, the next caller with that key runs it again.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.coalesced_by_kind = {}
+        self._calls = {}  # key -> _Call in flight
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """fn(*args, **kwargs), or the result (or exception) of the identical call already in flight"""
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+                kind = key[0] if isinstance(key, tuple) and key else key
+                self.coalesced_by_kind[kind] = self.coalesced_by_kind.get(kind, 0) + 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                'calls': self.calls,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'coalesce_rate': self.coalesced / self.calls if self.calls else 0.0,
+            }
+            for kind, count in sorted(self.coalesced_by_kind.items()):
+                stats[f'{kind}_coalesced'] = count
+            return stats
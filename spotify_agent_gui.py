@@ -1,11 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-from PIL import Image, ImageTk
-import io
+from PIL import ImageTk
 import threading
 import time
 from config import SPOTIFY_CONFIG, GENIUS_ACCESS_TOKEN, UI_CONFIG
-from spotify_controller import SpotifyController
+from spotify_controller import SpotifyController, TransitionEngine
+from album_art_pipeline import AlbumArtPipeline
+from task_pool import TaskPool
+from stats_format import format_stats
 
 
 class SpotifyAgentGUI:
@@ -18,16 +20,30 @@ class SpotifyAgentGUI:
         self.root.configure(bg=UI_CONFIG['bg_color'])
 
         # Initialize controller
-        self.controller = SpotifyController(SPOTIFY_CONFIG)
+        self.controller = SpotifyController(dict(SPOTIFY_CONFIG, album_art_size=UI_CONFIG['album_art_size']))
+        self.async_controller = self.controller.commands  # Commands run on its event loop
+        self.async_controller.prefetch_art = True  # The art shows as soon as the track starts
         self.running = False
         self.update_thread = None
 
         # UI Variables
         self.current_track_info = None
+        # Background work, tagged with the current track URI so late results for old tracks are dropped
+        self.tasks = TaskPool(lambda: self.current_track_info['uri'] if self.current_track_info else None,
+                              name='gui-tasks')
         self.album_art_image = None
+        self.stats_window = None  # Toplevel opened by the 'stats' command
+        self.album_art_key = None  # (album id, size) currently shown
+        # Picks the smallest fitting rendition and decodes it on the task pool (cached for replays)
+        self.art_pipeline = AlbumArtPipeline(self.controller, UI_CONFIG['album_art_size'], tasks=self.tasks)
         self.is_playing = False
         self.progress_ms = 0
         self.duration_ms = 1
+        self.playback_snapshot = None  # Latest snapshot, used to extrapolate progress between polls
+        self.transition_engine = TransitionEngine(
+            self.auto_next_track,
+            self.controller.governor.as_background(self.prefetch_next_track)
+        )
 
         self.setup_ui()
         self.authenticate()
@@ -55,7 +71,17 @@ class SpotifyAgentGUI:
             width=UI_CONFIG['album_art_size'],
             height=UI_CONFIG['album_art_size']
         )
-        self.album_art_label.pack(pady=10)
+        self.album_art_label.pack(pady=(10, 0))
+
+        # What the shown cover cost to fetch and decode
+        self.art_info_label = tk.Label(
+            main_frame,
+            text="",
+            font=(UI_CONFIG['font_family'], 8),
+            bg=UI_CONFIG['bg_color'],
+            fg='#606060'
+        )
+        self.art_info_label.pack(pady=(0, 10))
 
         # Track Info Frame
         info_frame = tk.Frame(main_frame, bg=UI_CONFIG['bg_color'])
@@ -252,6 +278,10 @@ class SpotifyAgentGUI:
         )
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
 
+        # Any interaction wakes the playback poller so the UI catches up immediately
+        self.root.bind_all('<Any-KeyPress>', lambda e: self.controller.notify_activity(), add='+')
+        self.root.bind_all('<Any-ButtonPress>', lambda e: self.controller.notify_activity(), add='+')
+
     def authenticate(self):
         """Authenticate with Spotify and Genius"""
         try:
@@ -259,6 +289,7 @@ class SpotifyAgentGUI:
                 self.status_label.config(text="Status: Connected to Spotify ✓", fg=UI_CONFIG['accent_color'])
                 self.running = True
                 self.start_update_thread()
+                self.tick_progress()
 
                 # Try to authenticate with Genius
                 if GENIUS_ACCESS_TOKEN and GENIUS_ACCESS_TOKEN != 'YOUR_GENIUS_TOKEN_HERE':
@@ -283,10 +314,21 @@ class SpotifyAgentGUI:
 
     def update_loop(self):
         """Background loop to update track info and progress"""
+        self.controller.start_playback_poller()
+        version = 0
         while self.running:
             try:
+                # Wait for the controller's poller to publish a new playback snapshot
+                version, snapshot = self.controller.wait_for_playback_update(version, timeout=2)
+                if not snapshot:
+                    continue
+
                 # Update current track info
-                track = self.controller.get_current_track()
+                self.playback_snapshot = snapshot
+                if snapshot.corrected:
+                    self.root.after(0, self.status_label.config,
+                                    {'text': "Status: Spotify didn't follow the last command - showing actual playback"})
+                track = snapshot.track
                 if track:
                     if not self.current_track_info or self.current_track_info['uri'] != track['uri']:
                         # New track started
@@ -295,21 +337,17 @@ class SpotifyAgentGUI:
                         self.root.after(0, self.fetch_and_display_lyrics, track)
 
                     # Update progress
-                    self.progress_ms = track['progress_ms']
-                    self.duration_ms = track['duration_ms']
-                    self.is_playing = track['is_playing']
+                    self.progress_ms = snapshot.progress_ms
+                    self.duration_ms = snapshot.duration_ms
+                    self.is_playing = snapshot.is_playing
                     self.root.after(0, self.update_progress)
 
                     # Update play/pause button
                     button_text = "⏸️" if self.is_playing else "▶️"
                     self.root.after(0, self.play_pause_btn.config, {'text': button_text})
 
-                    # Check if track ended and auto-play next
-                    if self.controller.is_track_ended():
-                        time.sleep(1)
-                        self.root.after(0, self.auto_next_track)
-
-                time.sleep(1)  # Update every second
+                # Auto-play next when the track ends (timer scheduled from the extrapolated end time)
+                self.transition_engine.update(snapshot)
 
             except Exception as e:
                 print(f"Update loop error: {e}")
@@ -321,32 +359,41 @@ class SpotifyAgentGUI:
         self.artist_label.config(text=", ".join([artist['name'] for artist in track['artists']]))
         self.album_label.config(text=f"Album: {track['album']['name']}")
 
-        # Download and display album art
-        if track['album_art']:
-            threading.Thread(target=self.load_album_art, args=(track['album_art'],), daemon=True).start()
-
-    def load_album_art(self, url):
-        """Load album artwork from URL"""
-        try:
-            image_data = self.controller.download_album_art(url)
-            if image_data:
-                image = Image.open(io.BytesIO(image_data))
-                image = image.resize((UI_CONFIG['album_art_size'], UI_CONFIG['album_art_size']), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(image)
-
-                self.album_art_image = photo  # Keep reference
-                self.root.after(0, self.album_art_label.config, {'image': photo})
-        except Exception as e:
-            print(f"Error loading album art: {e}")
+        # Display album art (nothing to do when the album hasn't changed)
+        if self.art_pipeline.key_for(track['album']) != self.album_art_key:
+            self.art_pipeline.request(track['album'], self.load_album_art)
+
+    def load_album_art(self, key, image, load):
+        """Album art ready (possibly on a pipeline worker) - hand it to the Tk thread"""
+        self.root.after(0, self.show_album_art, key, image, load)
+
+    def show_album_art(self, key, image, load=None):
+        """Display a decoded album art image (Tk thread)"""
+        photo = ImageTk.PhotoImage(image)
+        self.album_art_image = photo  # Keep reference
+        self.album_art_key = key
+        self.album_art_label.config(image=photo)
+        self.art_info_label.config(text=self.describe_art_load(load))
+
+    def describe_art_load(self, load):
+        """Bytes fetched and decode time for the shown cover (an ArtLoad), with the running average"""
+        if not load:
+            return "Album art: from memory cache"
+        stats = self.art_pipeline.stats()
+        return (f"Album art: {load.bytes / 1024:.1f} KB fetched in {load.fetch_ms:.0f} ms, "
+                f"decoded {load.decoded_size[0]}x{load.decoded_size[1]} in {load.decode_ms:.1f} ms "
+                f"(avg {stats['mean_decode_ms']:.1f} ms over {stats['images']} images)")
 
     def fetch_and_display_lyrics(self, track):
-        """Fetch and display lyrics"""
-        def fetch():
-            artist_name = track['artists'][0]['name'] if track['artists'] else 'Unknown'
-            lyrics = self.controller.get_lyrics(track['name'], artist_name)
-            self.root.after(0, self.display_lyrics, lyrics)
+        """Fetch and display lyrics (dropped if the track changed before they arrived)"""
+        artist_name = track['artists'][0]['name'] if track['artists'] else 'Unknown'
+        self.tasks.submit(self.controller.lyrics_for, track['name'], artist_name, track.get('duration_ms', 0),
+                          on_result=self.apply_lyrics, token=track['uri'], kind='lyrics')
 
-        threading.Thread(target=fetch, daemon=True).start()
+    def apply_lyrics(self, result):
+        """Lyrics lookup finished (on a task worker) - hand the text to the Tk thread"""
+        lyrics, self.controller.synced_lyrics = result
+        self.root.after(0, self.display_lyrics, lyrics)
 
     def display_lyrics(self, lyrics):
         """Display lyrics in text widget"""
@@ -366,13 +413,23 @@ class SpotifyAgentGUI:
 
             self.time_label.config(text=f"{current_min}:{current_sec:02d} / {total_min}:{total_sec:02d}")
 
+    def tick_progress(self):
+        """Extrapolate progress locally between (adaptive, possibly sparse) playback polls"""
+        if not self.running:
+            return
+        snapshot = self.playback_snapshot
+        if snapshot and snapshot.track and snapshot.is_playing:
+            self.progress_ms = snapshot.estimated_progress_ms()
+            self.update_progress()
+        self.root.after(250, self.tick_progress)
+
     def on_progress_change(self, value):
         """Handle progress bar drag"""
         # Only seek if user is dragging (not if auto-updating)
         if self.duration_ms > 0:
             new_position = int((float(value) / 100) * self.duration_ms)
-            # Add small delay to avoid too many API calls
-            self.root.after(500, lambda: self.controller.seek(new_position))
+            # Add small delay to avoid too many API calls (only the latest queued seek is sent)
+            self.root.after(500, lambda: self.tasks.submit(self.controller.seek, new_position, token=None, kind='seek'))
 
     def on_volume_change(self, value):
         """Handle volume change"""
@@ -381,28 +438,31 @@ class SpotifyAgentGUI:
         self.controller.set_volume(volume)
 
     def toggle_play_pause(self):
-        """Toggle play/pause"""
-        if self.is_playing:
-            self.controller.pause()
-        else:
-            self.controller.resume()
+        """Toggle play/pause (the predicted state shows at once; the request runs off the Tk thread)"""
+        command = self.controller.pause if self.is_playing else self.controller.resume
+        self.tasks.submit(command, token=None, kind='play_pause')
 
     def previous_track(self):
         """Go to previous track"""
-        self.controller.previous_track()
+        self.async_controller.submit(self.async_controller.previous_track())
 
     def next_track(self):
         """Go to next track"""
-        self.controller.next_track()
+        self.async_controller.submit(self.async_controller.next_track())
 
     def auto_next_track(self):
-        """Automatically play next track when current ends"""
-        # Parse last command or play random
-        if hasattr(self, 'last_command_result'):
-            cmd = self.last_command_result
-            self.controller.play_random_track(artist=cmd.get('artist'), genre=cmd.get('genre'))
-        else:
-            self.controller.play_random_track()
+        """Automatically play next track when current ends (on the async loop - never blocks Tk)"""
+        # Same criteria as the last command, or any random track
+        cmd = getattr(self, 'last_command_result', {})
+        self.async_controller.submit(
+            self.async_controller.play_random_track(artist=cmd.get('artist'), genre=cmd.get('genre'))
+        )
+
+    def prefetch_next_track(self, snapshot):
+        """Search the next random track and warm the device registry before the track ends"""
+        cmd = getattr(self, 'last_command_result', {})
+        self.controller.prefetch_random_tracks(artist=cmd.get('artist'), genre=cmd.get('genre'))
+        self.controller.resolve_device_id()
 
     def set_mode(self, mode):
         """Set playback mode"""
@@ -422,25 +482,26 @@ class SpotifyAgentGUI:
         if not command:
             return
 
+        if command.lower() == 'stats':
+            self.command_entry.delete(0, tk.END)
+            self.show_stats()
+            return
+
         self.status_label.config(text=f"Processing: {command}")
 
         # Parse command
         cmd_result = self.controller.parse_command(command)
         self.last_command_result = cmd_result
 
-        # Execute command
-        threading.Thread(
-            target=self._execute_command,
-            args=(cmd_result,),
-            daemon=True
-        ).start()
+        # Execute command on the async controller's loop
+        self.async_controller.submit(self._execute_command(cmd_result))
 
         self.command_entry.delete(0, tk.END)
 
-    def _execute_command(self, cmd):
+    async def _execute_command(self, cmd):
         """Execute parsed command in background"""
         try:
-            track = self.controller.play_random_track(
+            track = await self.async_controller.play_random_track(
                 artist=cmd.get('artist'),
                 genre=cmd.get('genre')
             )
@@ -458,9 +519,39 @@ class SpotifyAgentGUI:
         except Exception as e:
             self.root.after(0, self.status_label.config, {'text': f"Status: Error - {str(e)}"})
 
+    def show_stats(self):
+        """Open (or refresh) a window with background task, album art, cache and HTTP metrics"""
+        sections = [("Background tasks", {'tasks': self.tasks.stats()}),
+                    ("Album art", {'art': self.art_pipeline.stats()}),
+                    ("Cache stats", self.controller.get_cache_stats()),
+                    ("HTTP connections", self.controller.get_http_stats()),
+                    ("Spotify rate limit", {'governor': self.controller.get_rate_limit_stats()}),
+                    ("Optimistic playback state", {'predict': self.controller.get_prediction_stats()})]
+        lines = []
+        for title, groups in sections:
+            lines.append(f"{title}:")
+            for name, stats in groups.items():
+                lines.append(f"  {name:<8} {format_stats(stats)}")
+
+        if not (self.stats_window and self.stats_window.winfo_exists()):
+            self.stats_window = tk.Toplevel(self.root)
+            self.stats_window.title("Stats")
+            self.stats_text = scrolledtext.ScrolledText(self.stats_window, width=120, height=30,
+                                                        font=('Courier', 9), bg='#282828', fg='white')
+            self.stats_text.pack(fill=tk.BOTH, expand=True)
+        self.stats_text.delete(1.0, tk.END)
+        self.stats_text.insert(1.0, "\n".join(lines))
+        self.stats_window.lift()
+        self.status_label.config(text="Status: Stats displayed (type 'stats' again to refresh)")
+
     def on_closing(self):
         """Handle window closing"""
         self.running = False
+        self.controller.stop_playback_poller()
+        self.transition_engine.cancel()
+        self.art_pipeline.shutdown()
+        self.tasks.shutdown()
+        self.async_controller.stop()
         if self.update_thread:
             self.update_thread.join(timeout=2)
         self.root.destroy()
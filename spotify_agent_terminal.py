@@ -2,8 +2,8 @@ import os
 import sys
 import threading
 import time
-import msvcrt
 import argparse
+from collections import deque
 from datetime import timedelta
 from io import BytesIO
 from PIL import Image
@@ -16,17 +16,30 @@ from rich.live import Live
 from rich.text import Text
 from rich import box
 from config import SPOTIFY_CONFIG, GENIUS_ACCESS_TOKEN
-from spotify_controller import SpotifyController
+from spotify_controller import SpotifyController, TransitionEngine
+from tui_renderer import PanelRenderer
+from keyboard_input import (create_input_backend, KEY_ENTER, KEY_BACKSPACE, KEY_CTRL_C,
+                            KEY_UP, KEY_DOWN, KEY_LEFT, KEY_RIGHT)
+from task_pool import TaskPool
+from stats_format import format_stats
+
+
+INPUT_WAIT_TIMEOUT = 0.5  # Max seconds the input thread blocks before re-checking self.running
 
 
 class SpotifyTerminalAgent:
     """Terminal-based Spotify Smart Agent"""
 
-    def __init__(self, start_mode='resume', quit_mode='pause'):
+    def __init__(self, start_mode='resume', quit_mode='pause', controller=None):
         self.console = Console()
-        self.controller = SpotifyController(SPOTIFY_CONFIG)
+        # Everything below (commands, prefetch, rate limiting) is bound to this controller
+        self.controller = controller or SpotifyController(SPOTIFY_CONFIG)
+        self.async_controller = self.controller.commands  # Commands run on its event loop
         self.running = False
         self.current_track = None
+        # Background work, tagged with the current track URI so late results for old tracks are dropped
+        self.tasks = TaskPool(lambda: self.current_track.get('uri') if self.current_track else None,
+                              name='terminal-tasks')
         self.lyrics = "No lyrics available"
         self.is_playing = False
         self.progress_ms = 0
@@ -35,6 +48,11 @@ class SpotifyTerminalAgent:
         self.play_mode = "Normal"
         self.current_track_index = -1  # Track the current index in context_tracks for scrolling
         self.initial_load_done = False  # Track if we've done the initial track load
+        self.transition_engine = TransitionEngine(
+            self.auto_next_track, self.controller.governor.as_background(self.prefetch_next_track)
+        )
+        self.playback_snapshot = None  # Latest snapshot, used to extrapolate progress between polls
+        self.renderer = None  # PanelRenderer - panels are rebuilt only when their state changes
 
         # Behavior settings
         self.start_mode = start_mode  # 'resume' or 'pause'
@@ -43,9 +61,17 @@ class SpotifyTerminalAgent:
         # For keyboard input
         self.command_input = ""
         self.input_mode = False
+        self.input_backend = None  # keyboard_input.InputBackend, opened in start()
+        self.input_latencies_ms = deque(maxlen=200)
 
     def cleanup(self):
         """Cleanup on exit - pause or resume based on quit_mode"""
+        self.controller.stop_playback_poller()
+        self.transition_engine.cancel()
+        self.async_controller.stop()
+        self.tasks.shutdown()
+        if self.input_backend:
+            self.input_backend.close()  # Restore the terminal's line mode
         try:
             if self.quit_mode == 'pause':
                 if self.is_playing:
@@ -89,104 +115,123 @@ class SpotifyTerminalAgent:
         update_thread.start()
 
         # Start input thread
-        input_thread = threading.Thread(target=self.input_loop, daemon=True)
-        input_thread.start()
+        self.input_backend = create_input_backend()
+        if self.input_backend:
+            input_thread = threading.Thread(target=self.input_loop, daemon=True)
+            input_thread.start()
+        else:
+            self.status_message = "Keyboard input unavailable (stdin is not a terminal)"
 
         # Display UI
         self.display_ui()
 
     def update_loop(self):
         """Background loop to update track info"""
+        self.controller.start_playback_poller()
+        version = 0
         while self.running:
             try:
-                track = self.controller.get_current_track()
-                if track:
-                    # Check if this is a new track OR first time loading
-                    is_new_track = not self.current_track or self.current_track.get('uri') != track['uri']
-                    force_initial_load = not self.initial_load_done
-
-                    if is_new_track or force_initial_load:
-                        # New track or initial load
-                        self.current_track = track
-
-                        # IMPORTANT: Update controller's current_track for update_context_tracks to work
-                        self.controller.current_track = track
-
-                        if force_initial_load:
-                            self.status_message = "Loading track info..."
-
-                        self.fetch_lyrics()
-
-                        # Update context tracks (album or artist) - do it synchronously for initial load
-                        if force_initial_load:
-                            self.controller.update_context_tracks()
-                            self.initial_load_done = True
-
-                            # Handle paused track based on start_mode setting
-                            if not track['is_playing']:
-                                if self.start_mode == 'resume':
-                                    self.status_message = "Resuming paused track..."
-                                    time.sleep(0.5)
-                                    self.controller.resume()
-                                    time.sleep(0.5)
-                                    self.status_message = "Resumed playback!"
-                                else:
-                                    self.status_message = "Track loaded (paused)"
-                            else:
-                                self.status_message = "Track info loaded!"
-                        else:
-                            threading.Thread(target=self.controller.update_context_tracks, daemon=True).start()
-
-                        # Update current track index by finding it in context_tracks
-                        # Wait a moment for context_tracks to populate if needed
-                        if force_initial_load:
-                            time.sleep(0.5)
-
-                        track_uri = track.get('uri')
-                        for i, ctx_track in enumerate(self.controller.current_context_tracks):
-                            if ctx_track.get('uri') == track_uri:
-                                self.current_track_index = i
-                                break
-
-                    self.progress_ms = track['progress_ms']
-                    self.duration_ms = track['duration_ms']
-                    self.is_playing = track['is_playing']
-
-                    # Auto-next when track ends
-                    if self.controller.is_track_ended():
-                        time.sleep(1)
-                        self.auto_next_track()
-
-                elif not self.initial_load_done:
-                    # No track playing on startup
-                    self.status_message = "No track currently playing. Type 'play' to start."
-                    self.initial_load_done = True
-
-                time.sleep(1)
+                version, snapshot = self.controller.wait_for_playback_update(version, timeout=2)
+                if snapshot:
+                    self.update_tick(snapshot)
 
             except Exception as e:
                 self.status_message = f"Update error: {str(e)}"
                 time.sleep(2)
 
+    def update_tick(self, snapshot):
+        """Apply one playback snapshot from the controller's poller to the UI state"""
+        self.playback_snapshot = snapshot
+        if snapshot.corrected:
+            self.status_message = "⚠ Spotify didn't follow the last command - showing actual playback"
+        track = snapshot.track
+        if track:
+            # Check if this is a new track OR first time loading
+            is_new_track = not self.current_track or self.current_track.get('uri') != track['uri']
+            force_initial_load = not self.initial_load_done
+
+            if is_new_track or force_initial_load:
+                # New track or initial load
+                self.current_track = track
+
+                # IMPORTANT: Update controller's current_track for update_context_tracks to work
+                self.controller.current_track = track
+
+                if force_initial_load:
+                    self.status_message = "Loading track info..."
+
+                self.fetch_lyrics()
+
+                # Update context tracks (album or artist) - do it synchronously for initial load
+                if force_initial_load:
+                    self.controller.update_context_tracks()
+                    self.initial_load_done = True
+
+                    # Handle paused track based on start_mode setting
+                    if not track['is_playing']:
+                        if self.start_mode == 'resume':
+                            self.status_message = "Resuming paused track..."
+                            self.controller.resume()
+                            resumed = self.controller.wait_for_play_state(True)
+                            if resumed and resumed.is_playing:
+                                snapshot = self.playback_snapshot = resumed
+                            self.status_message = "Resumed playback!"
+                        else:
+                            self.status_message = "Track loaded (paused)"
+                    else:
+                        self.status_message = "Track info loaded!"
+                else:
+                    self.tasks.submit(self.controller.update_context_tracks, kind='context')
+
+                # Update current track index by finding it in context_tracks
+                # (on initial load the first page was loaded synchronously above)
+                track_index = self.controller.current_context_tracks.index_of(track.get('uri'))
+                if track_index >= 0:
+                    self.current_track_index = track_index
+
+            self.progress_ms = snapshot.progress_ms
+            self.duration_ms = snapshot.duration_ms
+            self.is_playing = snapshot.is_playing
+
+        elif not self.initial_load_done:
+            # No track playing on startup
+            self.status_message = "No track currently playing. Type 'play' to start."
+            self.initial_load_done = True
+
+        # Auto-next when track ends (timer scheduled from the extrapolated end time)
+        self.transition_engine.update(snapshot)
+
     def fetch_lyrics(self):
-        """Fetch lyrics for current track"""
-        def fetch():
-            if self.current_track:
-                artist_name = self.current_track['artists'][0]['name'] if self.current_track['artists'] else 'Unknown'
-                self.lyrics = self.controller.get_lyrics(
-                    self.current_track['name'],
-                    artist_name,
-                    self.current_track.get('duration_ms', 0)
-                )
+        """Fetch lyrics for current track (applied only if it is still the current track when they arrive)"""
+        track = self.current_track
+        if not track:
+            return
+        artist_name = track['artists'][0]['name'] if track['artists'] else 'Unknown'
+        lookup = (track['name'], artist_name, track.get('duration_ms', 0))
+
+        # Prefetched lyrics come straight from the cache - apply them before the next frame
+        if self.controller.lyrics_ready(*lookup):
+            self.apply_lyrics(self.controller.lyrics_for(*lookup))
+        else:
+            self.tasks.submit(self.controller.lyrics_for, *lookup, on_result=self.apply_lyrics,
+                              token=track.get('uri'), kind='lyrics')
 
-        threading.Thread(target=fetch, daemon=True).start()
+    def apply_lyrics(self, result):
+        """Show a (lyrics text, SyncedLyrics) result"""
+        self.lyrics, self.controller.synced_lyrics = result
 
     def display_ui(self):
         """Display the terminal UI with live updates"""
         try:
-            with Live(self.generate_layout(), refresh_per_second=20, console=self.console, screen=False) as live:
+            self.renderer = self.create_renderer()
+            self.renderer.render()
+            with Live(self.renderer.layout, auto_refresh=False, console=self.console, screen=False) as live:
+                live.refresh()
                 while self.running:
-                    live.update(self.generate_layout())
+                    self.extrapolate_progress()
+                    # Only redraw when some panel's state actually changed
+                    if self.renderer.render():
+                        live.refresh()
                     time.sleep(0.05)  # Very fast refresh for responsive input display
         except KeyboardInterrupt:
             self.running = False
@@ -195,8 +240,55 @@ class SpotifyTerminalAgent:
             self.cleanup()
             self.console.print("\n\n[bold yellow]Goodbye! 👋[/bold yellow]\n")
 
+    def extrapolate_progress(self):
+        """Advance progress locally between (adaptive, possibly sparse) playback polls"""
+        snapshot = self.playback_snapshot
+        if snapshot and snapshot.track and self.current_track and snapshot.track['uri'] == self.current_track.get('uri'):
+            self.progress_ms = snapshot.estimated_progress_ms()
+
+    def create_renderer(self):
+        """Terminal layout with a version stamp per panel (the state that panel renders)"""
+        renderer = PanelRenderer(self.generate_layout_skeleton())
+        renderer.add_panel("track_info", self._track_info_stamp, self.generate_track_info)
+        renderer.add_panel("track_list", self._track_list_stamp, self.generate_track_list)
+        renderer.add_panel("lyrics", self._lyrics_stamp, self.generate_lyrics_panel)
+        renderer.add_panel("controls", lambda: None, self.generate_controls_panel)
+        renderer.add_panel("input", lambda: self.command_input, self.generate_input_panel)
+        return renderer
+
+    def _track_info_stamp(self):
+        track = self.current_track
+        return (track.get('uri') if track else None, self.play_mode, self.progress_ms // 1000,
+                self.duration_ms, self.is_playing, self.status_message)
+
+    def _track_list_stamp(self):
+        context_tracks = self.controller.current_context_tracks
+        track = self.current_track
+        # Follow the current track into the track list here, not in the build (pages stream in late)
+        index = context_tracks.index_of(track.get('uri')) if track else -1
+        if index >= 0:
+            self.current_track_index = index
+        return (id(context_tracks), len(context_tracks), track.get('uri') if track else None,
+                track['album']['name'] if track and track.get('album') else None, self.current_track_index)
+
+    def _lyrics_stamp(self):
+        synced_lyrics = self.controller.synced_lyrics
+        if synced_lyrics:
+            return id(synced_lyrics), synced_lyrics.index_at(self.progress_ms)
+        return None, self.lyrics
+
     def generate_layout(self):
-        """Generate the terminal layout"""
+        """Generate the terminal layout with every panel freshly built"""
+        layout = self.generate_layout_skeleton()
+        layout["track_info"].update(self.generate_track_info())
+        layout["track_list"].update(self.generate_track_list())
+        layout["lyrics"].update(self.generate_lyrics_panel())
+        layout["controls"].update(self.generate_controls_panel())
+        layout["input"].update(self.generate_input_panel())
+        return layout
+
+    def generate_layout_skeleton(self):
+        """Generate the terminal layout structure (header filled in, panels empty)"""
         layout = Layout()
 
         # Split into sections (balanced sizes)
@@ -227,16 +319,6 @@ class SpotifyTerminalAgent:
             Layout(name="track_list", ratio=2)
         )
 
-        layout["main"]["left_panel"]["track_info"].update(self.generate_track_info())
-        layout["main"]["left_panel"]["track_list"].update(self.generate_track_list())
-        layout["main"]["lyrics"].update(self.generate_lyrics_panel())
-
-        # Controls
-        layout["controls"].update(self.generate_controls_panel())
-
-        # Command input box
-        layout["input"].update(self.generate_input_panel())
-
         return layout
 
     def generate_track_info(self):
@@ -303,7 +385,8 @@ class SpotifyTerminalAgent:
 
     def generate_track_list(self):
         """Generate track list panel (album or artist tracks) with smart scrolling"""
-        if not self.controller.current_context_tracks:
+        context_tracks = self.controller.current_context_tracks
+        if not context_tracks:
             return Panel(
                 "[dim]No track list available[/dim]",
                 title="Track List",
@@ -322,20 +405,15 @@ class SpotifyTerminalAgent:
             artist_name = self.current_track['artists'][0]['name']
             context_type = f"Top Tracks: {artist_name}"
 
-        # Find current track index by URI matching
-        current_index = -1
-        for i, track in enumerate(self.controller.current_context_tracks):
-            if track.get('uri') == current_uri:
-                current_index = i
-                self.current_track_index = i  # Update the stored index
-                break
+        # Find current track index by URI (hash lookup)
+        current_index = context_tracks.index_of(current_uri)
 
         # If URI matching failed, use the explicitly stored index (from play_track_by_index)
         if current_index == -1 and self.current_track_index >= 0:
             current_index = self.current_track_index
 
         # Smart scrolling: ALWAYS center on current track in a small focused window
-        total_tracks = len(self.controller.current_context_tracks)
+        total_tracks = len(context_tracks)
         visible_tracks = 5  # Show 5 tracks at once (focused window that scrolls)
 
         # Only show all tracks if album is VERY small (3 or fewer tracks)
@@ -353,8 +431,7 @@ class SpotifyTerminalAgent:
             tracks_after = visible_tracks - tracks_before - 1  # -1 for current track itself
 
             # Calculate ideal window centered on current track
-            start_idx = max(0, current_index - tracks_before)
-            end_idx = min(total_tracks, current_index + tracks_after + 1)
+            start_idx, end_idx, _ = context_tracks.window(current_index, tracks_before, tracks_after)
 
             # Keep the window focused - don't expand to fill visible_tracks
             # Just show what fits around the current track
@@ -364,8 +441,7 @@ class SpotifyTerminalAgent:
             tracks_text.append(f"  ▲ {start_idx} more above...\n", style="dim cyan italic")
 
         # Show tracks in the window
-        for i in range(start_idx, end_idx):
-            track = self.controller.current_context_tracks[i]
+        for i, track in enumerate(context_tracks[start_idx:end_idx], start_idx):
             track_uri = track.get('uri', '')
             track_name = track.get('name', 'Unknown')
 
@@ -412,20 +488,12 @@ class SpotifyTerminalAgent:
         lyrics_text = Text()
 
         # If we have synced lyrics, show them with current line highlighted
-        if self.controller.synced_lyrics:
-            # Find current line index
-            current_index = -1
-            for i, (timestamp_ms, _) in enumerate(self.controller.synced_lyrics):
-                if timestamp_ms <= self.progress_ms:
-                    current_index = i
-
-            # Show lyrics with context (few lines before and after)
-            start_index = max(0, current_index - 3)
-            end_index = min(len(self.controller.synced_lyrics), current_index + 10)
-
-            for i in range(start_index, end_index):
-                _, line_text = self.controller.synced_lyrics[i]
+        synced_lyrics = self.controller.synced_lyrics
+        if synced_lyrics:
+            # Current line plus context (few lines before and after) via bisect lookup
+            start_index, current_index, window_lines = synced_lyrics.window(self.progress_ms, before=3, after=10)
 
+            for i, line_text in enumerate(window_lines, start_index):
                 if i == current_index:
                     # Highlight current line
                     lyrics_text.append("♪ ", style="bold cyan")
@@ -498,79 +566,75 @@ class SpotifyTerminalAgent:
         )
 
     def input_loop(self):
-        """Handle user input with real-time keyboard capture"""
+        """Dispatch keystrokes from the platform input backend as they arrive"""
         while self.running:
             try:
-                if msvcrt.kbhit():
-                    # Get the character
-                    char = msvcrt.getch()
-
-                    # Handle special keys and shortcuts IMMEDIATELY (no Enter needed)
-                    if char == b' ':  # Space
-                        # If already typing a command, add space to buffer
-                        if self.command_input:
-                            self.command_input += ' '
-                            self.status_message = "Typing command..."
-                        else:
-                            # Otherwise, use as play/pause shortcut
-                            self.toggle_play_pause()
-                        continue
-
-                    elif char == b'\x03':  # Ctrl+C
-                        self.running = False
-                        break
-
-                    elif char == b'\xe0':  # Special keys (arrows, etc.)
-                        # Read the second byte for arrow keys
-                        char2 = msvcrt.getch()
-                        if char2 == b'H':  # Up arrow - Previous track
-                            self.previous_track()
-                        elif char2 == b'P':  # Down arrow - Next track
-                            self.next_track()
-                        elif char2 == b'K':  # Left arrow - Seek backward
-                            self.seek_backward()
-                        elif char2 == b'M':  # Right arrow - Seek forward
-                            self.seek_forward()
-                        continue
-
-                    # Handle single-key shortcuts IMMEDIATELY (removed 1-4 to avoid conflict with track numbers)
-                    elif char in [b'q', b'Q']:
-                        try:
-                            decoded = char.decode('utf-8').lower()
-                            if decoded == 'q':
-                                self.running = False
-                        except:
-                            pass
-                        continue
-
-                    # Handle command input (requires Enter)
-                    elif char == b'\r':  # Enter key
-                        if self.command_input.strip():
-                            command = self.command_input.strip()
-                            self.command_input = ""
-                            self.handle_command(command)
-
-                    elif char == b'\x08':  # Backspace
-                        if self.command_input:
-                            self.command_input = self.command_input[:-1]
-
-                    else:
-                        # Regular character - add to command buffer
-                        try:
-                            decoded = char.decode('utf-8')
-                            # Only add printable characters
-                            if decoded.isprintable() or decoded == ' ':
-                                self.command_input += decoded
-                                self.status_message = "Typing command..."
-                        except:
-                            pass  # Silently ignore decode errors
-
-                time.sleep(0.05)  # Small delay to prevent CPU overuse
+                # Blocks until a key arrives; the timeout only lets the loop notice shutdown
+                event = self.input_backend.read_key(timeout=INPUT_WAIT_TIMEOUT)
+                if event:
+                    self.handle_key(event)
 
             except Exception as e:
                 self.status_message = f"Input error: {str(e)}"
                 time.sleep(1)
 
+    def handle_key(self, event):
+        """Handle one KeyEvent - shortcuts act immediately, anything else edits the command line"""
+        key = event.key
+        self.controller.notify_activity()  # Poll densely while the user interacts
+
+        if key == ' ':  # Space
+            # If already typing a command, add space to buffer
+            if self.command_input:
+                self.command_input += ' '
+                self.status_message = "Typing command..."
+            else:
+                # Otherwise, use as play/pause shortcut
+                self.toggle_play_pause()
+
+        elif key == KEY_CTRL_C:
+            self.running = False
+
+        elif key == KEY_UP:  # Previous track
+            self.previous_track()
+        elif key == KEY_DOWN:  # Next track
+            self.next_track()
+        elif key == KEY_LEFT:  # Seek backward
+            self.seek_backward()
+        elif key == KEY_RIGHT:  # Seek forward
+            self.seek_forward()
+
+        # Single-key shortcuts (removed 1-4 to avoid conflict with track numbers)
+        elif key in ('q', 'Q'):
+            self.running = False
+
+        # Handle command input (requires Enter)
+        elif key == KEY_ENTER:
+            if self.command_input.strip():
+                command = self.command_input.strip()
+                self.command_input = ""
+                self.handle_command(command)
+
+        elif key == KEY_BACKSPACE:
+            if self.command_input:
+                self.command_input = self.command_input[:-1]
+
+        elif len(key) == 1 and key.isprintable():
+            # Regular character - add to command buffer
+            self.command_input += key
+            self.status_message = "Typing command..."
+
+        self.input_latencies_ms.append(event.latency_ms())
+
+    def input_stats(self):
+        """Key count and input-to-action latency (receipt of the key until its handler returned)"""
+        latencies = list(self.input_latencies_ms)
+        return {
+            'keys': len(latencies),
+            'mean_latency_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            'max_latency_ms': round(max(latencies), 2) if latencies else 0.0,
+        }
+
     def handle_command(self, command):
         """Handle text commands"""
         command = command.lower().strip()
@@ -604,9 +668,11 @@ class SpotifyTerminalAgent:
                 'shuffle': 'shuffle'
             }
             self.set_mode(mode_map[command])
+        elif command == 'stats':
+            self.show_stats()
         elif command.isdigit():
-            # Play track by index number
-            self.play_track_by_index(int(command))
+            # Play track by index number (off the input thread; a newer number replaces a queued one)
+            self.tasks.submit(self.play_track_by_index, int(command), token=None, kind='play')
         else:
             self.status_message = f"Unknown command: {command}. Type 'help' for commands."
 
@@ -616,13 +682,9 @@ class SpotifyTerminalAgent:
 
         cmd_result = self.controller.parse_command(command)
 
-        threading.Thread(
-            target=self._execute_play_command,
-            args=(cmd_result,),
-            daemon=True
-        ).start()
+        self.async_controller.submit(self._execute_play_command(cmd_result))
 
-    def _execute_play_command(self, cmd):
+    async def _execute_play_command(self, cmd):
         """Execute play command in background"""
         try:
             # Handle song playback
@@ -630,7 +692,7 @@ class SpotifyTerminalAgent:
                 song_name = cmd.get('song')
                 artist_name = cmd.get('artist')
                 if song_name:
-                    track = self.controller.play_song(song_name, artist_name)
+                    track = await self.async_controller.play_song(song_name, artist_name)
                     if track:
                         artist = track['artists'][0]['name'] if track['artists'] else 'Unknown'
                         self.status_message = f"Playing: {track['name']} by {artist}"
@@ -644,7 +706,7 @@ class SpotifyTerminalAgent:
                 album_name = cmd.get('album')
                 artist_name = cmd.get('artist')
                 if album_name:
-                    track = self.controller.play_album(album_name, artist_name)
+                    track = await self.async_controller.play_album(album_name, artist_name)
                     if track:
                         self.status_message = f"Playing album: {album_name}"
                     else:
@@ -654,7 +716,7 @@ class SpotifyTerminalAgent:
 
             else:
                 # Handle random track playback
-                track = self.controller.play_random_track(
+                track = await self.async_controller.play_random_track(
                     artist=cmd.get('artist'),
                     genre=cmd.get('genre')
                 )
@@ -683,12 +745,12 @@ class SpotifyTerminalAgent:
 
     def next_track(self):
         """Next track"""
-        self.controller.next_track()
+        self.async_controller.submit(self.async_controller.next_track())
         self.status_message = "Next track"
 
     def previous_track(self):
         """Previous track"""
-        self.controller.previous_track()
+        self.async_controller.submit(self.async_controller.previous_track())
         self.status_message = "Previous track"
 
     def seek_forward(self):
@@ -706,21 +768,18 @@ class SpotifyTerminalAgent:
         mode = self.controller.play_mode
 
         # For normal and repeat_all modes, manually play next track from context list
-        if mode in ['normal', 'repeat_all'] and self.controller.current_context_tracks:
+        context_tracks = self.controller.current_context_tracks
+        if mode in ['normal', 'repeat_all'] and context_tracks:
             if self.current_track_index >= 0:
-                next_index = self.current_track_index + 1
-                total_tracks = len(self.controller.current_context_tracks)
-
                 # For repeat_all, loop back to start; for normal, pause
-                if next_index >= total_tracks:
-                    if mode == 'repeat_all':
-                        next_index = 0
-                        self.status_message = "Looping back to first track..."
-                    else:
-                        # Normal mode: pause at end of album
-                        self.controller.pause()
-                        self.status_message = "Album finished - Paused"
-                        return
+                next_index = context_tracks.offset_index(self.current_track_index, 1, wrap=mode == 'repeat_all')
+                if next_index == 0:
+                    self.status_message = "Looping back to first track..."
+                elif next_index == -1:
+                    # Normal mode: pause at end of album
+                    self.controller.pause()
+                    self.status_message = "Album finished - Paused"
+                    return
 
                 # Play next track (1-based for user)
                 self.play_track_by_index(next_index + 1)
@@ -730,6 +789,12 @@ class SpotifyTerminalAgent:
         self.controller.next_track()
         self.status_message = f"Auto-playing next track (mode: {mode})"
 
+    def prefetch_next_track(self, snapshot):
+        """Warm up whatever auto_next_track will need, shortly before the track ends"""
+        if self.controller.play_mode == 'shuffle':
+            self.controller.prefetch_random_tracks()
+        self.controller.resolve_device_id()
+
     def set_mode(self, mode):
         """Set play mode"""
         self.controller.set_play_mode(mode)
@@ -766,61 +831,82 @@ class SpotifyTerminalAgent:
             self.status_message = "Invalid track at that index"
             return
 
+        # Replaying the track that's playing - the URI already matches, so wait for a progress reset
+        current = self.controller.playback_snapshot
+        replay = bool(current and current.track and current.track['uri'] == track_uri)
+        sent_at = time.monotonic()
+
+        def started(s) -> bool:
+            return bool(s.track) and s.track['uri'] == track_uri and (not replay or s.restarted_since(sent_at))
+
         # Play the track
         try:
             # Store the index we're trying to play (IMMEDIATELY for instant scrolling)
             self.current_track_index = track_index
 
+            # Shown as playing right away (album track lists don't repeat the album on each track)
+            album = self.current_track.get('album') if self.current_track else None
+            expected = track if track.get('album') else dict(track, album=album) if album else None
+
             # Try to play within album context if available
             played = False
-            if self.current_track and self.current_track.get('album'):
-                album = self.current_track['album']
-                if album.get('uri'):
-                    # Play within album context with offset (use URI for reliability)
-                    try:
-                        devices = self.controller.get_available_devices()
-                        if devices:
-                            device_id = devices[0]['id']
-                            self.controller.sp.start_playback(
-                                device_id=device_id,
-                                context_uri=album['uri'],
-                                offset={"uri": track_uri}
-                            )
-                            played = True
-                            self.status_message = f"▶ Playing track #{index} in album context"
-                    except Exception as e:
-                        self.status_message = f"Context play failed: {e}"
-                        print(f"Failed to play with context: {e}")
-
-            # Fallback to single track play if context play failed
-            if not played:
-                self.controller._play_track(track_uri)
+            if album and album.get('uri'):
+                # Play within album context with offset (use URI for reliability)
+                try:
+                    if self.controller.start_playback(
+                        track=expected,
+                        context_uri=album['uri'],
+                        offset={"uri": track_uri}
+                    ):
+                        played = True
+                        self.status_message = f"▶ Playing track #{index} in album context"
+                except Exception as e:
+                    self.status_message = f"Context play failed: {e}"
+                    print(f"Failed to play with context: {e}")
+
+            if played:
+                # Wait (polling with backoff) until Spotify reports the requested track
+                snapshot = self.controller.wait_for_playback(started)
+            else:
+                # Fallback to single track play if context play failed (it waits for the track itself)
+                self.controller.play_track(expected or track)
                 self.status_message = f"▶ Playing track #{index} (single track mode)"
+                snapshot = self.controller.playback_snapshot
 
-            # Update status after initial message
-            time.sleep(0.3)
-            self.status_message = f"▶ Playing track #{index}: {track_name} by {artist_name}"
-
-            # Wait for Spotify to update playback state and retry until we get the correct track
-            max_retries = 5
-            for retry in range(max_retries):
-                time.sleep(0.5)
-                updated_track = self.controller.get_current_track()
-
-                # Check if we got the correct track
-                if updated_track and updated_track.get('uri') == track_uri:
-                    self.current_track = updated_track
-                    # Trigger lyrics fetch for new track
-                    self.fetch_lyrics()
-                    break
-
-                # If last retry, update anyway
-                if retry == max_retries - 1:
-                    self.current_track = updated_track
+            if snapshot and started(snapshot):
+                self.status_message = f"▶ Playing track #{index}: {track_name} by {artist_name}"
+                self.current_track = snapshot.track
+                # Trigger lyrics fetch for new track
+                self.fetch_lyrics()
+            elif snapshot:
+                self.status_message = f"Track #{index} didn't start (Spotify still reports the previous state)"
+                self.current_track = snapshot.track  # Deadline passed - show whatever is playing
 
         except Exception as e:
             self.status_message = f"Error playing track: {str(e)}"
 
+    def show_stats(self):
+        """Show cache size, hit-rate and frame rendering metrics"""
+        lines = ["", "Cache stats:"]
+        for cache_name, stats in self.controller.get_cache_stats().items():
+            lines.append(f"  {cache_name:<8} {format_stats(stats)}")
+        lines.append("HTTP connections:")
+        for transport_name, stats in self.controller.get_http_stats().items():
+            lines.append(f"  {transport_name:<8} {format_stats(stats)}")
+        lines.append("Spotify rate limit:")
+        lines.append(f"  {'governor':<8} {format_stats(self.controller.get_rate_limit_stats())}")
+        lines.append("Optimistic playback state:")
+        lines.append(f"  {'predict':<8} {format_stats(self.controller.get_prediction_stats())}")
+        if self.renderer:
+            lines.append("Rendering:")
+            lines.append(f"  {'frames':<8} {format_stats(self.renderer.stats())}")
+        lines.append("Background tasks:")
+        lines.append(f"  {'tasks':<8} {format_stats(self.tasks.stats())}")
+        lines.append("Keyboard input:")
+        lines.append(f"  {'keys':<8} {format_stats(self.input_stats())}")
+        self.status_message = "Stats displayed (see terminal output)"
+        self.console.print("\n".join(lines), style="cyan")
+
     def show_help(self):
         """Show help message"""
         help_text = """
@@ -837,6 +923,7 @@ Commands:
   resume                       - Resume playback
   next / prev                  - Next/Previous track
   normal / shuffle / repeat    - Change play mode
+  stats                        - Show cache size / hit-rate stats
   help                         - Show this help
   quit / exit / q              - Exit agent
 
@@ -0,0 +1,463 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from spotify_stub_server import SpotifyStubServer
+from spotify_controller import SpotifyController
+from spotify_agent_terminal import SpotifyTerminalAgent
+from synced_lyrics import SyncedLyrics
+from lrc_parser import LrcParser, parse_lrc
+from album_art_cache import DEFAULT_ALBUM_ART_SIZE, pick_album_image
+from album_art_pipeline import decode_art
+
+
+# Maximum warm HTTP round trips per user action (foreground + background work it triggers).
+# The first sample of each action is reported separately as the cold cost.
+# Lower these as optimizations land; --check fails when an action exceeds its budget.
+API_CALL_BUDGETS = {
+    'play_song': 2,  # play + one poll confirming the track started
+    'play_random_track': 3,  # play + poll + the new track's lyrics (warmed as it starts; the UI would fetch them next)
+    'play_album': 2,
+    'next_track': 2,
+    'play_track_by_index': 2,
+    'update_loop_tick': 1,
+    'toggle_play_pause': 1,
+}
+
+
+class ActionBenchmark:
+    """Measures HTTP round trips and wall time per user action against the local stub"""
+
+    def __init__(self, latency: float = 0.02, repeat: int = 5):
+        self.latency = latency
+        self.repeat = repeat
+        self.server = None
+        self.controller = None
+        self.agent = None
+        self._update_loop_started = False
+
+    def setup(self):
+        self.server = SpotifyStubServer(latency=self.latency).start()
+        # Hundreds of back-to-back actions would drain the real rate-limit bucket and time the
+        # governor instead of the actions (--rate-limit measures the governor on its own)
+        self.controller = SpotifyController(dict(self.server.controller_config(), spotify_rate_limit=(100000, 30.0)))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.controller.authenticate()
+
+        self.agent = SpotifyTerminalAgent(controller=self.controller)
+        self.agent.running = True
+
+    def teardown(self):
+        if self.agent:
+            self.agent.running = False
+            self.agent.async_controller.stop()
+        if self.server:
+            self.server.stop()
+
+    # ----- Per-action setup and execution -----
+
+    def _prepare_album(self):
+        self.controller.play_album('folklore')
+        self.controller.set_play_mode('normal')
+        self._update_loop_tick()
+
+    def _update_loop_tick(self):
+        # One poller refresh feeding one front-end tick
+        self.agent.update_tick(self.controller.refresh_playback())
+
+    def _run_async(self, coro):
+        return self.agent.async_controller.submit(coro).result(timeout=30)
+
+    def _prepare_auto_advance(self):
+        # Auto-advance needs the real poller + update loop running
+        if not self._update_loop_started:
+            threading.Thread(target=self.agent.update_loop, daemon=True).start()
+            self._update_loop_started = True
+        self._prepare_album()
+
+    def _auto_advance(self):
+        # Seek to 3s before the end and wait for the transition engine to record the gap
+        engine = self.agent.transition_engine
+        transitions = len(engine.gaps_ms)
+        snapshot = self.controller.refresh_playback()
+        self.controller.seek(snapshot.duration_ms - 3000)
+        deadline = time.monotonic() + 15
+        while len(engine.gaps_ms) == transitions and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+    def actions(self):
+        """(name, prepare, run, metrics) for every benchmarked action"""
+        return [
+            ('play_song', None, lambda: self.controller.play_song('Yesterday', 'The Beatles')),
+            ('play_random_track', None, lambda: self.controller.play_random_track(artist='Queen')),
+            ('play_album', None, lambda: self.controller.play_album('Midnights', 'Taylor Swift')),
+            ('next_track', self._prepare_album, self.controller.next_track),
+            ('play_track_by_index', self._prepare_album, lambda: self.agent.play_track_by_index(5)),
+            ('update_loop_tick', self._prepare_album, self._update_loop_tick),
+            # Predicted state is published before the request; each prepare tick reconciles the last one
+            ('toggle_play_pause', self._update_loop_tick, self.agent.toggle_play_pause,
+             lambda: self.controller.get_prediction_stats()),
+            # AsyncSpotifyController directly (commands also warm lyrics, so no call budget)
+            ('play_song_async', None, lambda: self._run_async(
+                self.agent.async_controller.play_song('Yesterday', 'The Beatles'))),
+            ('play_album_async', None, lambda: self._run_async(
+                self.agent.async_controller.play_album('Midnights', 'Taylor Swift'))),
+            ('next_track_async', self._prepare_album, lambda: self._run_async(
+                self.agent.async_controller.next_track())),
+            # Runs last: starts the background update loop, so its calls include polling
+            ('auto_advance', self._prepare_auto_advance, self._auto_advance,
+             lambda: self.agent.transition_engine.stats()),
+        ]
+
+    def measure(self, prepare, run) -> dict:
+        if prepare:
+            with contextlib.redirect_stdout(io.StringIO()):
+                prepare()
+        self.server.wait_idle()
+        self.server.reset_counts()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            foreground_calls = self.server.request_count()
+            self.server.wait_idle()  # Let background threads (lyrics, context) finish
+
+        return {
+            'wall_ms': elapsed_ms,
+            'foreground_calls': foreground_calls,
+            'calls': self.server.request_count(),
+            'endpoints': self.server.counts_by_endpoint(),
+        }
+
+    def run(self, only=None) -> dict:
+        results = {}
+        self.setup()
+        try:
+            for name, prepare, run, *metrics in self.actions():
+                if only and name not in only:
+                    continue
+                cold = self.measure(prepare, run)
+                samples = [self.measure(prepare, run) for _ in range(self.repeat)]
+                results[name] = {
+                    'cold_calls': cold['calls'],
+                    'calls': max(sample['calls'] for sample in samples),
+                    'foreground_calls': max(sample['foreground_calls'] for sample in samples),
+                    'wall_ms_median': statistics.median(sample['wall_ms'] for sample in samples),
+                    'wall_ms_max': max(sample['wall_ms'] for sample in samples),
+                    'endpoints': samples[-1]['endpoints'],
+                    'budget': API_CALL_BUDGETS.get(name),
+                    'metrics': metrics[0]() if metrics else {},
+                }
+        finally:
+            self.teardown()
+        return results
+
+
+def legacy_parse_lrc(lrc_text: str) -> SyncedLyrics:
+    """The original per-line re.match parser ([MM:SS.xx] only), kept as the LRC baseline"""
+    lyrics = []
+    pattern = r'\[(\d{2}):(\d{2})\.(\d{2})\](.*)'
+    for line in lrc_text.split('\n'):
+        match = re.match(pattern, line)
+        if match:
+            timestamp_ms = int(match.group(1)) * 60000 + int(match.group(2)) * 1000 + int(match.group(3)) * 10
+            text = match.group(4).strip()
+            if text:
+                lyrics.append((timestamp_ms, text))
+    return SyncedLyrics(lyrics)
+
+
+def synthetic_lrc_corpus(documents: int = 200, lines: int = 80, seed: int = 7, plain: bool = False) -> list:
+    """LRC documents mixing every timestamp form the parser accepts (plain: only [mm:ss.xx] lines)"""
+    rng = random.Random(seed)
+    words = ['love', 'night', 'city', 'light', 'dream', 'fire', 'heart', 'road', 'rain', 'gold']
+    corpus = []
+    for doc in range(documents):
+        out = [f'[ar:Artist {doc}]', f'[ti:Song {doc}]', '[offset:+100]' if doc % 5 == 0 else '[length:03:30]']
+        ms = 0
+        for line in range(lines):
+            ms += rng.randint(1500, 4500)
+            minutes, seconds, millis = ms // 60000, ms // 1000 % 60, ms % 1000
+            text = ' '.join(rng.choice(words) for _ in range(rng.randint(3, 8)))
+            style = 0 if plain else line % 4
+            if style == 0:
+                out.append(f'[{minutes:02d}:{seconds:02d}.{millis // 10:02d}]{text}')
+            elif style == 1:
+                out.append(f'[{minutes:02d}:{seconds:02d}.{millis:03d}]{text}')
+            elif style == 2:  # Repeated chorus line with two timestamps
+                out.append(f'[{minutes:02d}:{seconds:02d}.{millis // 10:02d}][{minutes + 5:02d}:{seconds:02d}.00]{text}')
+            else:  # Enhanced LRC word timings
+                stamped = ' '.join(f'<{minutes:02d}:{seconds:02d}.{(millis // 10 + i) % 100:02d}>{word}'
+                                   for i, word in enumerate(text.split()))
+                out.append(f'[{minutes:02d}:{seconds:02d}.{millis // 10:02d}]{stamped}')
+        corpus.append('\n'.join(out))
+    return corpus
+
+
+def load_lrc_corpus(directory: str) -> list:
+    """Every .lrc file under directory"""
+    corpus = []
+    for path in glob.glob(os.path.join(directory, '**', '*.lrc'), recursive=True):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            corpus.append(f.read())
+    return corpus
+
+
+def benchmark_lrc(corpus: list, repeat: int = 5) -> dict:
+    """Parse throughput and lines recovered: legacy regex loop vs LrcParser (whole text and streamed)"""
+    def streamed(text):
+        parser = LrcParser()
+        for start in range(0, len(text), 512):  # Simulate chunks arriving off the wire
+            parser.feed(text[start:start + 512])
+        return parser.close()
+
+    total_bytes = sum(len(text.encode('utf-8')) for text in corpus)
+    results = {}
+    for name, parse in (('legacy', legacy_parse_lrc), ('lrc_parser', parse_lrc), ('lrc_parser_streamed', streamed)):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parsed = [parse(text) for text in corpus]
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results[name] = {
+            'ms': best * 1000,
+            'mb_per_s': total_bytes / best / 1e6 if best else 0.0,
+            'lines': sum(len(lyrics) for lyrics in parsed),
+        }
+    return {'documents': len(corpus), 'bytes': total_bytes, 'parsers': results}
+
+
+def print_lrc_report(results: dict, corpus: str = 'corpus'):
+    print(f"\nLRC parser benchmark, {corpus} ({results['documents']} documents, {results['bytes'] / 1024:.0f} KiB)\n")
+    print(f"{'Parser':<22}{'Best ms':>10}{'MB/s':>8}{'Lines':>9}")
+    print("-" * 49)
+    for name, result in results['parsers'].items():
+        print(f"{name:<22}{result['ms']:>10.1f}{result['mb_per_s']:>8.1f}{result['lines']:>9}")
+    print()
+
+
+def legacy_decode_art(data: bytes, size: int):
+    """The original full-resolution decode + LANCZOS resize, kept as the album art baseline"""
+    from PIL import Image
+    image = Image.open(io.BytesIO(data))
+    return image.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def benchmark_album_art(size: int = DEFAULT_ALBUM_ART_SIZE, latency: float = 0.0, repeat: int = 5) -> dict:
+    """Bytes fetched and decode time per cover: largest rendition + full decode vs sized rendition + draft decode"""
+    results = {}
+    with SpotifyStubServer(latency=latency) as server:
+        controller = SpotifyController(server.controller_config())
+        albums = list(server.catalog.albums.values())
+        pipelines = (
+            ('legacy', lambda images: images[0]['url'], legacy_decode_art),
+            ('sized_draft', lambda images: pick_album_image(images, size), lambda data, size: decode_art(data, size)[0]),
+        )
+        for name, pick, decode in pipelines:
+            downloaded = [controller.download_album_art(pick(album['images'])) for album in albums]
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for data in downloaded:
+                    decode(data, size)
+                timings.append((time.perf_counter() - started) * 1000 / len(downloaded))
+            results[name] = {
+                'images': len(downloaded),
+                'mean_bytes': sum(len(data) for data in downloaded) / len(downloaded),
+                'decode_ms': min(timings),
+            }
+    return {'size': size, 'pipelines': results}
+
+
+def print_art_report(results: dict):
+    print(f"\nAlbum art benchmark ({results['size']}px display size, per image)\n")
+    print(f"{'Pipeline':<22}{'Images':>8}{'Bytes':>10}{'Decode ms':>12}")
+    print("-" * 52)
+    for name, result in results['pipelines'].items():
+        print(f"{name:<22}{result['images']:>8}{result['mean_bytes']:>10.0f}{result['decode_ms']:>12.2f}")
+    print()
+
+
+def benchmark_render(frames: int = 400, frame_ms: int = 50) -> dict:
+    """Terminal UI cost per 50ms frame during playback: full layout rebuild vs dirty-tracked panels"""
+    from rich.console import Console
+    with SpotifyStubServer(latency=0.0) as server:
+        controller = SpotifyController(server.controller_config())
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.authenticate()
+            controller.play_album('folklore')
+        agent = SpotifyTerminalAgent(controller=controller)
+        agent.update_tick(controller.refresh_playback())
+        agent.console = Console(file=io.StringIO(), width=120, height=40)
+        start_ms = agent.progress_ms
+
+        def full():
+            agent.console.print(agent.generate_layout())
+
+        renderer = agent.create_renderer()
+
+        def incremental():
+            if renderer.render():
+                agent.console.print(renderer.layout)
+
+        results = {}
+        for name, frame in (('full', full), ('incremental', incremental)):
+            timings = []
+            for index in range(frames):
+                agent.progress_ms = start_ms + index * frame_ms
+                agent.command_input = 'play yesterday'[:index // 40]  # Occasional typing
+                started = time.perf_counter()
+                frame()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {'mean_ms': statistics.mean(timings), 'max_ms': max(timings)}
+        results['incremental'].update(renderer.stats())
+    return {'frames': frames, 'frame_ms': frame_ms, 'pipelines': results}
+
+
+def print_render_report(results: dict):
+    print(f"\nTerminal render benchmark ({results['frames']} frames, {results['frame_ms']}ms apart)\n")
+    print(f"{'Renderer':<14}{'Mean ms':>10}{'Max ms':>10}{'Skipped':>10}")
+    print("-" * 44)
+    for name, result in results['pipelines'].items():
+        skipped = result.get('frames_skipped', '-')
+        print(f"{name:<14}{result['mean_ms']:>10.3f}{result['max_ms']:>10.2f}{skipped:>10}")
+    print()
+
+
+def benchmark_rate_limit(server_limit: tuple = (20, 2.0), presses: int = 40, press_interval: float = 0.02) -> dict:
+    """Key-mashing seek commands against a rate-limited stub while the poller runs at its active rate"""
+    results = {}
+    client_limits = (
+        ('retry_after_only', (100000, 1.0)),  # Bucket never binds - only 429s slow requests down
+        ('governed', server_limit),
+    )
+    for name, client_limit in client_limits:
+        with SpotifyStubServer(latency=0.0, rate_limit=server_limit) as server:
+            controller = SpotifyController(dict(server.controller_config(), spotify_rate_limit=client_limit))
+            with contextlib.redirect_stdout(io.StringIO()):
+                controller.authenticate()
+                controller.play_album('folklore')
+                controller.start_playback_poller()
+                latencies = []
+                for _ in range(presses):
+                    controller.notify_activity()
+                    started = time.perf_counter()
+                    controller.seek(30000)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    time.sleep(press_interval)
+                controller.stop_playback_poller()
+            results[name] = {
+                'median_ms': statistics.median(latencies),
+                'max_ms': max(latencies),
+                'server_429s': server.rate_limited_count,
+                'governor': controller.get_rate_limit_stats(),
+            }
+    return {'server_limit': list(server_limit), 'presses': presses, 'modes': results}
+
+
+def print_rate_limit_report(results: dict):
+    limit, window = results['server_limit']
+    print(f"\nRate limit benchmark ({results['presses']} seek presses, stub allows {limit} requests / {window:.0f}s)\n")
+    print(f"{'Mode':<20}{'Median ms':>11}{'Max ms':>10}{'429s':>7}{'Throttle s':>12}")
+    print("-" * 60)
+    for name, result in results['modes'].items():
+        print(f"{name:<20}{result['median_ms']:>11.1f}{result['max_ms']:>10.1f}{result['server_429s']:>7}"
+              f"{result['governor']['throttle_s']:>12.2f}")
+    print()
+
+
+def print_report(results: dict, latency: float):
+    print(f"\nAPI call budget benchmark (simulated latency {latency * 1000:.0f}ms/request)\n")
+    print(f"{'Action':<22}{'Cold':>6}{'Calls':>7}{'Fg':>5}{'Budget':>8}{'Median ms':>12}{'Max ms':>10}")
+    print("-" * 70)
+    for name, result in results.items():
+        budget = result['budget'] if result['budget'] is not None else '-'
+        print(f"{name:<22}{result['cold_calls']:>6}{result['calls']:>7}{result['foreground_calls']:>5}{budget:>8}"
+              f"{result['wall_ms_median']:>12.1f}{result['wall_ms_max']:>10.1f}")
+        for endpoint, count in sorted(result['endpoints'].items()):
+            print(f"    {count:>3} x {endpoint}")
+        for metric, value in result['metrics'].items():
+            print(f"    {metric} = {value}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Spotify API round trips per user action')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated per-request latency in seconds (default: 0.02)')
+    parser.add_argument('--repeat', type=int, default=5, help='Warm samples per action, after one cold sample (default: 5)')
+    parser.add_argument('--action', action='append', help='Only run the named action (repeatable)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--check', action='store_true', help='Exit non-zero if any action exceeds its call budget')
+    parser.add_argument('--lrc', action='store_true', help='Benchmark the LRC parser instead of API calls')
+    parser.add_argument('--lrc-dir', help='Directory of .lrc files to use as the corpus (default: synthetic corpus)')
+    parser.add_argument('--art', action='store_true', help='Benchmark album art fetch size and decode time instead')
+    parser.add_argument('--render', action='store_true', help='Benchmark terminal UI frame build time instead')
+    parser.add_argument('--rate-limit', action='store_true', help='Benchmark key-mashing against a stub that answers 429')
+    args = parser.parse_args()
+
+    if args.rate_limit:
+        rate_limit_results = benchmark_rate_limit()
+        if args.json:
+            print(json.dumps(rate_limit_results, indent=2))
+        else:
+            print_rate_limit_report(rate_limit_results)
+        return
+
+    if args.render:
+        render_results = benchmark_render()
+        if args.json:
+            print(json.dumps(render_results, indent=2))
+        else:
+            print_render_report(render_results)
+        return
+
+    if args.art:
+        art_results = benchmark_album_art(repeat=args.repeat)
+        if args.json:
+            print(json.dumps(art_results, indent=2))
+        else:
+            print_art_report(art_results)
+        return
+
+    if args.lrc or args.lrc_dir:
+        if args.lrc_dir:
+            corpora = {args.lrc_dir: load_lrc_corpus(args.lrc_dir)}
+        else:
+            # Plain [mm:ss.xx] is what the legacy parser handles and most lyrics use; the mixed
+            # corpus adds multi-stamp and word-timed lines that only LrcParser parses
+            corpora = {'plain': synthetic_lrc_corpus(plain=True), 'mixed': synthetic_lrc_corpus()}
+        lrc_results = {name: benchmark_lrc(corpus, repeat=args.repeat) for name, corpus in corpora.items()}
+        if args.json:
+            print(json.dumps(lrc_results, indent=2))
+        else:
+            for name, results in lrc_results.items():
+                print_lrc_report(results, name)
+        return
+
+    results = ActionBenchmark(latency=args.latency, repeat=args.repeat).run(only=args.action)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results, args.latency)
+
+    if args.check:
+        over_budget = [name for name, result in results.items()
+                       if result['budget'] is not None and result['calls'] > result['budget']]
+        if over_budget:
+            print(f"Over API call budget: {', '.join(over_budget)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
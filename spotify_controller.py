@@ -1,10 +1,258 @@
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import random
+import threading
 import time
 import requests
-from typing import Optional, List, Dict, Tuple
-import re
+import urllib3
+from requests.adapters import HTTPAdapter
+from collections import deque
+from typing import Optional, List, Dict, Tuple, NamedTuple, Callable
+from concurrent.futures import ThreadPoolExecutor
+from lyrics_cache import LyricsCache, CachedLyrics, DEFAULT_LYRICS_CACHE_PATH, lyrics_cache_key
+from album_art_cache import ArtDiskStore, DEFAULT_ART_CACHE_DIR, DEFAULT_ALBUM_ART_SIZE, pick_album_image
+from synced_lyrics import SyncedLyrics
+from lrc_parser import parse_lrc
+from search_cache import SearchCache
+from context_loader import ContextLoader, ContextTracks
+from track_list import TrackList
+from rate_limiter import RequestGovernor, GovernedAdapter, SPOTIFY_RATE_LIMIT, SPOTIFY_RATE_WINDOW
+from singleflight import SingleFlight
+from shuffle_engine import ShuffleEngine, SHUFFLE_HISTORY_SIZE, DEFAULT_SHUFFLE_HISTORY_PATH
+
+
+LRCLIB_API_URL = "https://lrclib.net/api/get"
+DEFAULT_MARKET = 'US'
+PROFILE_TTL_SECONDS = 6 * 60 * 60  # Re-check the user's country a few times a day
+DEVICE_TTL_SECONDS = 5 * 60  # Device list is re-fetched lazily after this, or on device errors
+
+# Adaptive playback polling (seconds between current_playback() calls)
+POLL_INTERVALS = {
+    'active': 0.5,     # Right after a user command or keypress
+    'near_end': 0.5,   # Within NEAR_END_WINDOW_MS of the end of the track
+    'playing': 15.0,   # Mid-track - progress is extrapolated locally in between
+    'paused': 10.0,
+    'idle': 30.0,      # Nothing playing
+}
+NEAR_END_WINDOW_MS = 10000
+ACTIVITY_WINDOW_SECONDS = 5.0  # How long to keep polling densely after activity
+
+# End-of-track transitions
+TRANSITION_PREFETCH_MS = 10000  # Prefetch next-track metadata this long before the end
+TRANSITION_LEAD_MS = 250  # Initial head start for the next-track command (tuned from measured gaps)
+TRANSITION_MAX_LEAD_MS = 2000
+
+# Confirming a playback command: poll right away, then back off exponentially until the deadline
+PLAYBACK_WAIT_TIMEOUT = 2.0  # Max seconds to wait for Spotify to report a command's effect
+PLAYBACK_WAIT_FIRST_INTERVAL = 0.05
+PLAYBACK_WAIT_MAX_INTERVAL = 0.4
+SKIP_WAIT_TIMEOUT = 0.5  # next/previous with nothing queued never changes track - fall back to random sooner
+RESTART_PROGRESS_SLACK_MS = 1000  # A replay is confirmed once progress is no further than the time since the command
+
+# Optimistic playback state: a command's expected result is published at once, then confirmed
+# by the next real snapshot - or rolled back once polls have had time to catch up
+PREDICTION_GRACE_SECONDS = 2.0  # Polls may still report the pre-command state for this long
+PREDICTION_PROGRESS_TOLERANCE_MS = 2000
+
+# Shared HTTP transport for LRCLIB, album art and other non-Spotify-API requests
+HTTP_TIMEOUT = (3.05, 5)  # (connect, read) seconds, per call
+HTTP_RETRIES = 2  # Bounded retries for connection errors and 5xx responses (GET only)
+HTTP_POOL_SIZE = 8  # Keep-alive connections kept per host
+SPOTIFY_RETRY_STATUSES = (500, 502, 503, 504)  # 429s are left to the RequestGovernor (Retry-After)
+
+# Search terms for random tracks when no artist/genre is given
+RANDOM_TRACK_QUERIES = (
+    'love', 'night', 'day', 'time', 'life', 'heart', 'dream',
+    'dance', 'summer', 'light', 'way', 'world', 'baby', 'girl',
+    'boy', 'feel', 'want', 'need', 'forever', 'tonight', 'music',
+    'a', 'b', 'c', 'd', 'e', 'the', 'you', 'me', 'we'
+)
+
+
+class HttpTransport:
+    """Keep-alive requests session with per-host connection pools, bounded retries and timeouts.
+
+    With a governor, a GovernedAdapter runs the retries itself so every attempt (retries
+    included) takes a rate-limit token, and 429 responses are retried after their Retry-After.
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, retries: int = HTTP_RETRIES,
+                 timeout=HTTP_TIMEOUT, status_forcelist=(500, 502, 503, 504), allowed_methods=('GET',),
+                 governor: Optional[RequestGovernor] = None):
+        self.timeout = timeout
+        self.session = requests.Session()
+        # One pool per host (pool_connections), each keeping up to pool_size idle connections alive
+        if governor:
+            self.adapter = GovernedAdapter(governor, retries=retries, backoff_factor=0.3,
+                                           status_forcelist=status_forcelist, allowed_methods=allowed_methods,
+                                           pool_connections=pool_size, pool_maxsize=pool_size)
+        else:
+            retry = urllib3.Retry(
+                total=retries,
+                backoff_factor=0.3,
+                status_forcelist=status_forcelist,
+                allowed_methods=frozenset(allowed_methods),
+                raise_on_status=False  # Hand the last response back so callers can look at the status
+            )
+            self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    def request(self, method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+        """Send a request over a pooled connection (timeout defaults to the transport's)"""
+        return self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Connection reuse across every host pool (requests include retries)"""
+        pools = self.adapter.poolmanager.pools
+        hosts = requests_sent = connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts += 1
+            requests_sent += pool.num_requests
+            connections += pool.num_connections
+        return {
+            'hosts': hosts,
+            'requests': requests_sent,
+            'connections': connections,
+            'reused': requests_sent - connections,
+            'reuse_rate': (requests_sent - connections) / requests_sent if requests_sent else 0.0,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class PlaybackSnapshot(NamedTuple):
+    """Immutable view of Spotify playback state from a single current_playback() call"""
+    track: Optional[Dict]  # get_current_track()-style dict, None when nothing is playing
+    progress_ms: int
+    duration_ms: int
+    is_playing: bool
+    fetched_at: float  # time.monotonic() when the state was fetched
+    predicted: bool = False  # Expected result of a command, not yet confirmed by Spotify
+    corrected: bool = False  # Real state that replaced a prediction Spotify didn't bear out
+
+    def estimated_progress_ms(self, now: Optional[float] = None) -> int:
+        """Progress extrapolated from fetched_at, assuming playback continued"""
+        if not self.is_playing:
+            return self.progress_ms
+        elapsed_ms = int(((now if now is not None else time.monotonic()) - self.fetched_at) * 1000)
+        return min(self.progress_ms + elapsed_ms, self.duration_ms)
+
+    def remaining_ms(self, now: Optional[float] = None) -> int:
+        """Time left in the current track, extrapolated from fetched_at"""
+        return self.duration_ms - self.estimated_progress_ms(now)
+
+    def restarted_since(self, since: float) -> bool:
+        """Whether progress is no further than the time since a replay sent at time.monotonic() since"""
+        return self.progress_ms <= (self.fetched_at - since) * 1000 + RESTART_PROGRESS_SLACK_MS
+
+
+class TransitionEngine:
+    """Schedules the end-of-track action from the extrapolated end time of the latest snapshot.
+
+    Feed every published PlaybackSnapshot to update(). A timer fires on_track_end slightly
+    before the current track is due to end (the head start adapts to measured gaps), and
+    on_prefetch runs once per track when the end is TRANSITION_PREFETCH_MS away. The silence
+    between the old track's end and the next track's start is recorded per transition.
+    """
+
+    def __init__(self, on_track_end: Callable[[], None],
+                 on_prefetch: Optional[Callable[[PlaybackSnapshot], None]] = None,
+                 prefetch_ms: int = TRANSITION_PREFETCH_MS, lead_ms: int = TRANSITION_LEAD_MS):
+        self.on_track_end = on_track_end
+        self.on_prefetch = on_prefetch
+        self.prefetch_ms = prefetch_ms
+        self.lead_ms = lead_ms
+        self.gaps_ms = deque(maxlen=100)  # Measured silence per transition (negative = overlap/cut short)
+        self._lock = threading.Lock()
+        self._timer = None
+        self._scheduled_end_at = None
+        self._prefetched_uri = None
+        self._fired_uri = None  # Track we already advanced from
+        self._fired_end_at = None  # When that track was expected to end
+
+    def update(self, snapshot: Optional[PlaybackSnapshot]):
+        """Re-plan from a new snapshot (track change, seek, pause, or just fresher timing)"""
+        with self._lock:
+            if not snapshot or not snapshot.track:
+                self._cancel_timer()
+                return
+
+            uri = snapshot.track['uri']
+            now = time.monotonic()
+            remaining_ms = snapshot.remaining_ms(now)
+
+            if self._fired_uri is not None and not snapshot.predicted:  # Gaps are measured on real state only
+                if uri == self._fired_uri and remaining_ms < self.prefetch_ms:
+                    return  # Still seeing the finished track - the next one is on its way
+                if snapshot.is_playing:
+                    self._record_gap(snapshot)  # Next track (or a repeat of this one) has started
+                self._fired_uri = None
+
+            if not snapshot.is_playing:
+                self._cancel_timer()
+                return
+
+            if remaining_ms <= self.prefetch_ms and self._prefetched_uri != uri and self.on_prefetch:
+                self._prefetched_uri = uri
+                threading.Thread(target=self.on_prefetch, args=(snapshot,), daemon=True).start()
+
+            end_at = now + remaining_ms / 1000
+            if self._timer and self._scheduled_end_at is not None and abs(end_at - self._scheduled_end_at) < 0.1:
+                return  # Existing timer is still accurate
+            self._cancel_timer()
+            self._scheduled_end_at = end_at
+            delay = max(0.0, end_at - now - self.lead_ms / 1000)
+            self._timer = threading.Timer(delay, self._fire, args=(uri, end_at))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        """Drop any pending transition"""
+        with self._lock:
+            self._cancel_timer()
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+        self._timer = None
+        self._scheduled_end_at = None
+
+    def _fire(self, uri: str, end_at: float):
+        with self._lock:
+            if self._scheduled_end_at != end_at:
+                return  # Rescheduled while we were waiting for the lock
+            self._timer = None
+            self._scheduled_end_at = None
+            self._fired_uri = uri
+            self._fired_end_at = end_at
+        self.on_track_end()
+
+    def _record_gap(self, snapshot: PlaybackSnapshot):
+        """Gap = when the new track actually started minus when the old one was due to end"""
+        started_at = snapshot.fetched_at - snapshot.progress_ms / 1000
+        gap_ms = int((started_at - self._fired_end_at) * 1000)
+        self.gaps_ms.append(gap_ms)
+        # Nudge the head start toward zero gap for the next transition
+        self.lead_ms = int(min(TRANSITION_MAX_LEAD_MS, max(0, self.lead_ms + gap_ms / 2)))
+
+    def stats(self) -> Dict:
+        """Transition count and gap metrics (ms)"""
+        gaps = list(self.gaps_ms)
+        return {
+            'transitions': len(gaps),
+            'last_gap_ms': gaps[-1] if gaps else None,
+            'mean_gap_ms': sum(gaps) / len(gaps) if gaps else None,
+            'max_gap_ms': max(gaps) if gaps else None,
+            'lead_ms': self.lead_ms,
+        }
 
 
 class SpotifyController:
@@ -17,252 +265,439 @@ class SpotifyController:
         self.play_mode = 'normal'  # normal, repeat_one, repeat_all, shuffle
         self.playlist_queue = []
         self.current_index = 0
-        self.played_tracks_history = set()  # Track URIs that have been played in shuffle mode
-        self.max_history_size = 100  # Max number of tracks to remember
-        self.synced_lyrics = []  # List of (timestamp_ms, lyric_line) tuples
-        self.current_context_tracks = []  # List of tracks in current album/context
+        self.synced_lyrics = SyncedLyrics()  # Indexed (timestamp_ms, lyric_line) pairs
+        self.current_context_tracks = TrackList()  # Tracks in current album/context, indexed by URI
+        self.lyrics_api_url = config.get('lyrics_api_url', LRCLIB_API_URL)
+
+        # Client-side rate limiting for the Spotify Web API: (requests, window seconds)
+        self.governor = RequestGovernor(*config.get('spotify_rate_limit', (SPOTIFY_RATE_LIMIT, SPOTIFY_RATE_WINDOW)))
+
+        # Pooled keep-alive transports: one for lyrics/art/other providers, one handed to spotipy
+        self.http = HttpTransport(
+            pool_size=config.get('http_pool_size', HTTP_POOL_SIZE),
+            retries=config.get('http_retries', HTTP_RETRIES),
+            timeout=config.get('http_timeout', HTTP_TIMEOUT)
+        )
+        self.spotify_http = HttpTransport(
+            pool_size=config.get('http_pool_size', HTTP_POOL_SIZE),
+            retries=3,
+            status_forcelist=SPOTIFY_RETRY_STATUSES,
+            # Only reads are resent after the request may have reached Spotify; a replayed
+            # player command (next, seek, volume) would act twice. Failed connects are retried for any method.
+            allowed_methods=('GET',),
+            governor=self.governor
+        )
+
+        # Identical lyrics/search/context/art requests in flight at once share one round trip
+        self.inflight = SingleFlight()
+
+        # Persistent LRCLIB lookup cache (set config['lyrics_cache_path'] to None to disable)
+        self.lyrics_cache = None
+        lyrics_cache_path = config.get('lyrics_cache_path', DEFAULT_LYRICS_CACHE_PATH)
+        if lyrics_cache_path:
+            try:
+                self.lyrics_cache = LyricsCache(lyrics_cache_path)
+            except Exception as e:
+                print(f"Lyrics cache disabled: {e}")
+
+        # Album art rendition to fetch: smallest one at least this many pixels wide
+        self.album_art_size = config.get('album_art_size', DEFAULT_ALBUM_ART_SIZE)
+
+        # Content-addressed disk store of downloaded album art (set config['art_cache_dir'] to None to disable)
+        self.art_store = None
+        art_cache_dir = config.get('art_cache_dir', DEFAULT_ART_CACHE_DIR)
+        if art_cache_dir:
+            try:
+                self.art_store = ArtDiskStore(art_cache_dir)
+            except Exception as e:
+                print(f"Album art cache disabled: {e}")
+
+        # Song/album search results (LRU+TTL, misses cached too, stale entries refreshed in background)
+        self.search_cache = SearchCache(max_entries=config.get('search_cache_size', 256))
+        self._search_revalidating = set()
+        self._search_revalidate_lock = threading.Lock()
+
+        # Paginated, cached album/playlist/artist track lists (first page returned, rest streamed in)
+        self.context_loader = ContextLoader(self, workers=config.get('context_workers', 4))
+        self._context_key = None  # (kind, id) of current_context_tracks
+        self._context_requested = None  # (kind, id) of the latest load_context call
+
+        # Background lyrics prefetch for upcoming tracks
+        self.lyrics_prefetch_count = config.get('lyrics_prefetch_count', 3)
+        self._lyrics_prefetch_pool = ThreadPoolExecutor(
+            max_workers=config.get('lyrics_prefetch_workers', 2), thread_name_prefix='lyrics-prefetch'
+        )
+        self._lyrics_prefetch_inflight = set()
+        self._lyrics_prefetch_lock = threading.Lock()
+
+        # Session-scoped profile/market cache (resolved at authenticate, refreshed in background)
+        self.user_profile = None
+        self.market = DEFAULT_MARKET
+        self.profile_ttl = config.get('profile_ttl', PROFILE_TTL_SECONDS)
+        self._profile_fetched_at = 0.0
+        self._profile_refreshing = False
+        self._profile_lock = threading.Lock()
+
+        # Device registry (cached device list + active device, invalidated on device errors)
+        self.devices = []
+        self.active_device_id = None
+        self.device_ttl = config.get('device_ttl', DEVICE_TTL_SECONDS)
+        self._devices_fetched_at = None
+        self._active_device_at = None  # When active_device_id was last confirmed (device list or playback state)
+        self._device_lock = threading.Lock()
+
+        # Shared playback-state poller (one current_playback() call feeds every reader)
+        self.playback_snapshot = None  # Latest PlaybackSnapshot
+        self.playback_version = 0  # Bumped every time a new snapshot is published
+        self.poll_intervals = dict(POLL_INTERVALS, **config.get('poll_intervals', {}))
+        self.last_activity_at = 0.0
+        self._poll_wakeup = threading.Event()
+        self._playback_changed = threading.Condition()
+        self._poller_thread = None
+        self._poller_running = False
+
+        # Optimistic playback state (predicted snapshot of the last command until Spotify confirms it)
+        self._prediction = None  # Pending predicted PlaybackSnapshot
+        self._prediction_expires_at = 0.0  # Real snapshots fetched after this roll a wrong prediction back
+        self._actual_snapshot = None  # Latest snapshot fetched from Spotify (published or not)
+        self.predictions = 0
+        self.predictions_confirmed = 0
+        self.predictions_superseded = 0  # Replaced by the next command's prediction before a verdict
+        self.mispredictions = 0
+        self.mispredicted_fields = {}  # 'track' / 'is_playing' / 'progress' / 'failed' -> count
+
+        # Random track candidates + persisted no-repeat history (set config['shuffle_history_path'] to None for in-memory)
+        self.shuffle = ShuffleEngine(
+            self._search_track_page,
+            history_size=config.get('shuffle_history_size', SHUFFLE_HISTORY_SIZE),
+            history_path=config.get('shuffle_history_path', DEFAULT_SHUFFLE_HISTORY_PATH)
+        )
+
+        # Random track picked ahead of an end-of-track transition: ((artist, genre), track)
+        self._predicted_random_track = None
+        self._predicted_random_lock = threading.Lock()  # Set by the prefetch thread, taken by commands
+
+        # Composite commands (play/skip) are implemented once, on AsyncSpotifyController
+        self._commands = None
+        self._commands_lock = threading.Lock()
 
     def authenticate(self):
         """Authenticate with Spotify"""
         try:
-            auth_manager = SpotifyOAuth(
-                client_id=self.config['client_id'],
-                client_secret=self.config['client_secret'],
-                redirect_uri=self.config['redirect_uri'],
-                scope=self.config['scope']
-            )
-            self.sp = spotipy.Spotify(auth_manager=auth_manager)
+            if self.config.get('access_token'):
+                # Pre-issued token (e.g. the local stub server) - skip the OAuth flow
+                self.sp = spotipy.Spotify(auth=self.config['access_token'],
+                                          requests_session=self.spotify_http.session)
+            else:
+                auth_manager = SpotifyOAuth(
+                    client_id=self.config['client_id'],
+                    client_secret=self.config['client_secret'],
+                    redirect_uri=self.config['redirect_uri'],
+                    scope=self.config['scope']
+                )
+                self.sp = spotipy.Spotify(auth_manager=auth_manager,
+                                          requests_session=self.spotify_http.session)
+
+            # Optional override of the Web API base URL (e.g. spotify_stub_server.py)
+            if self.config.get('api_base_url'):
+                self.sp.prefix = self.config['api_base_url']
+
+            self.refresh_user_profile()
             print("Spotify authentication successful!")
             return True
         except Exception as e:
             print(f"Authentication error: {e}")
             return False
 
-    def parse_lrc_lyrics(self, lrc_text: str) -> List[Tuple[int, str]]:
-        """Parse LRC format lyrics into (timestamp_ms, text) tuples"""
-        lyrics = []
-        # LRC format: [MM:SS.xx]Lyric text
-        pattern = r'\[(\d{2}):(\d{2})\.(\d{2})\](.*)'
-
-        for line in lrc_text.split('\n'):
-            match = re.match(pattern, line)
-            if match:
-                minutes = int(match.group(1))
-                seconds = int(match.group(2))
-                centiseconds = int(match.group(3))
-                text = match.group(4).strip()
-
-                # Convert to milliseconds
-                timestamp_ms = (minutes * 60 * 1000) + (seconds * 1000) + (centiseconds * 10)
-
-                if text:  # Only add non-empty lines
-                    lyrics.append((timestamp_ms, text))
-
-        return sorted(lyrics, key=lambda x: x[0])  # Sort by timestamp
+    def refresh_user_profile(self) -> str:
+        """Fetch the user's profile and cache their market/country"""
+        try:
+            user_profile = self.sp.current_user()
+            if user_profile:
+                with self._profile_lock:
+                    self.user_profile = user_profile
+                    self.market = user_profile.get('country') or DEFAULT_MARKET
+        except Exception as e:
+            print(f"Error fetching user profile: {e}")
+        finally:
+            # Also stamp failures so a broken profile endpoint isn't retried on every search
+            with self._profile_lock:
+                self._profile_fetched_at = time.monotonic()
+                self._profile_refreshing = False
+        return self.market
+
+    def get_market(self) -> str:
+        """Return the cached market without a network hop, refreshing it in the background when stale"""
+        with self._profile_lock:
+            is_stale = time.monotonic() - self._profile_fetched_at > self.profile_ttl
+            if is_stale and not self._profile_refreshing and self.sp:
+                self._profile_refreshing = True
+                threading.Thread(target=self.governor.as_background(self.refresh_user_profile), daemon=True).start()
+            return self.market
+
+    def parse_lrc_lyrics(self, lrc_text: str) -> SyncedLyrics:
+        """Parse LRC format lyrics into an indexed SyncedLyrics model"""
+        return parse_lrc(lrc_text)
+
+    def get_available_devices(self, force_refresh: bool = False):
+        """Get list of available Spotify devices (served from the device registry when fresh)"""
+        with self._device_lock:
+            is_fresh = (self._devices_fetched_at is not None
+                        and time.monotonic() - self._devices_fetched_at < self.device_ttl)
+            if is_fresh and self.devices and not force_refresh:
+                return list(self.devices)
 
-    def get_available_devices(self):
-        """Get list of available Spotify devices"""
         try:
-            devices = self.sp.devices()
-            return devices['devices']
+            devices = self.sp.devices()['devices']
         except Exception as e:
             print(f"Error getting devices: {e}")
             return []
 
-    def play_random_track(self, artist: Optional[str] = None, genre: Optional[str] = None):
-        """Play a random track based on criteria"""
-        try:
-            tracks = self._search_tracks(artist=artist, genre=genre)
-
-            if not tracks:
-                print("No tracks found matching criteria")
-                return None
-
-            # In shuffle mode, filter out already-played tracks
-            if self.play_mode == 'shuffle':
-                unplayed_tracks = [t for t in tracks if t.get('uri') not in self.played_tracks_history]
-
-                # If all tracks have been played, reset history and use all tracks
-                if not unplayed_tracks:
-                    print("All tracks played - resetting shuffle history")
-                    self.played_tracks_history.clear()
-                    unplayed_tracks = tracks
+        with self._device_lock:
+            self.devices = devices
+            self._devices_fetched_at = self._active_device_at = time.monotonic()
+            active = next((device for device in devices if device.get('is_active')), None)
+            self.active_device_id = active['id'] if active else None
+        return list(devices)
+
+    def invalidate_devices(self):
+        """Forget cached devices so the next play command re-resolves them"""
+        with self._device_lock:
+            self.devices = []
+            self.active_device_id = None
+            self._devices_fetched_at = None
+            self._active_device_at = None
+
+    @staticmethod
+    def _is_device_error(error: Exception) -> bool:
+        """Whether an API error means our idea of the active device is stale"""
+        return "NO_ACTIVE_DEVICE" in str(error) or "Device not found" in str(error)
+
+    def resolve_device_id(self) -> Optional[str]:
+        """Return the device to play on: the cached active device, else the first available one.
+
+        The cached device is trusted for device_ttl after it was last confirmed, so playback
+        moved elsewhere through Spotify Connect isn't pulled back to the old device.
+        """
+        with self._device_lock:
+            if (self.active_device_id and self._active_device_at is not None
+                    and time.monotonic() - self._active_device_at < self.device_ttl):
+                return self.active_device_id
+
+        devices = self.get_available_devices()
+        if not devices:
+            return None
 
-                tracks = unplayed_tracks
+        with self._device_lock:
+            if not self.active_device_id:
+                # Playing with an explicit device_id activates it, no transfer needed
+                print(f"Activating device: {devices[0]['name']}...")
+                self.active_device_id = devices[0]['id']
+            return self.active_device_id
 
-            # Select random track
-            track = random.choice(tracks)
+    def start_playback(self, track: Optional[Dict] = None, **kwargs) -> bool:
+        """Start playback on the resolved device, re-resolving once if the cached device is stale.
 
-            # Add to history if in shuffle mode
-            if self.play_mode == 'shuffle':
-                self.played_tracks_history.add(track['uri'])
-                # Limit history size to prevent memory issues
-                if len(self.played_tracks_history) > self.max_history_size:
-                    # Remove oldest entries (convert to list, remove first half, convert back)
-                    history_list = list(self.played_tracks_history)
-                    self.played_tracks_history = set(history_list[len(history_list)//2:])
+        track (a Spotify track object, album included) is the track expected to start: it is
+        shown right away as a predicted snapshot, and rolled back if the command fails.
+        """
+        prediction = self.predict_playback(track=track) if track else None
+        try:
+            for attempt in range(2):
+                device_id = self.resolve_device_id()
+                if not device_id:
+                    print("\n[ERROR] No Spotify devices found!")
+                    print("Please open Spotify on one of your devices (computer, phone, etc.)\n")
+                    break
 
-            self._play_track(track['uri'])
-            self.current_track = track
-            return track
+                try:
+                    self.sp.start_playback(device_id=device_id, **kwargs)
+                    self.notify_activity()
+                    return True
+                except Exception as e:
+                    if not self._is_device_error(e) or attempt == 1:
+                        raise
+                    self.invalidate_devices()
+        except Exception:
+            self.cancel_prediction(prediction)
+            raise
+        self.cancel_prediction(prediction)
+        return False
+
+    @property
+    def commands(self):
+        """AsyncSpotifyController that implements the play/skip commands (shared with the front-ends)"""
+        with self._commands_lock:
+            if self._commands is None:
+                from async_spotify_controller import AsyncSpotifyController  # It imports this module
+                self._commands = AsyncSpotifyController(self)
+            return self._commands
+
+    def _run_command(self, coro):
+        """Block on a command coroutine running on the commands' event loop (never call from that loop)"""
+        return self.commands.submit(coro).result()
 
+    def play_random_track(self, artist: Optional[str] = None, genre: Optional[str] = None):
+        """Play a random track based on criteria"""
+        return self._run_command(self.commands.play_random_track(artist, genre))
+
+    def pick_random_track(self, artist: Optional[str] = None, genre: Optional[str] = None) -> Optional[Dict]:
+        """Random track to play next (the prefetched prediction if it still applies), recorded in shuffle history"""
+        # Use the track picked ahead of time by prefetch_random_tracks if it still applies
+        with self._predicted_random_lock:
+            predicted, self._predicted_random_track = self._predicted_random_track, None
+        track = None
+        if predicted:
+            if predicted[0] != (artist, genre):
+                self.shuffle.put_back(*predicted)  # Picked for other criteria - leave it for them
+            elif not self.shuffle.played(predicted[1]['uri']):
+                track = predicted[1]
+        if track is None:
+            track = self._choose_random_track(artist=artist, genre=genre)
+
+        # Add to history if in shuffle mode
+        if track and self.play_mode == 'shuffle':
+            self.shuffle.record(track['uri'])
+        return track
+
+    def _choose_random_track(self, artist: Optional[str] = None, genre: Optional[str] = None) -> Optional[Dict]:
+        """Draw a random track from the criteria's candidate pool, skipping already-played tracks in shuffle mode"""
+        try:
+            return self.shuffle.choose((artist, genre), lambda: self._random_track_query(artist, genre),
+                                       skip_played=self.play_mode == 'shuffle',
+                                       random_query=not (artist or genre))  # A new random word per refill
         except Exception as e:
-            print(f"Error playing random track: {e}")
+            print(f"Error searching tracks: {e}")
             return None
 
-    def search_album(self, album_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
-        """Search for an album by name, optionally filtered by artist"""
-        try:
-            # Build search query
-            query = album_name
-            if artist_name:
-                query = f'album:{album_name} artist:{artist_name}'
+    def _cached_search(self, kind: str, name: str, artist_name: Optional[str], search: Callable) -> Optional[Dict]:
+        """Serve a search from the search cache; stale hits are returned at once and refreshed in background"""
+        entry = self.search_cache.get(kind, name, artist_name)
+        if entry is not None:
+            if entry.stale:
+                self._revalidate_search(kind, name, artist_name, search)
+            return entry.value
+
+        # Raises on API errors, which are never cached
+        key = ('search',) + self.search_cache.key(kind, name, artist_name)
+        result = self.inflight.do(key, search, name, artist_name)
+        self.search_cache.put(kind, name, artist_name, result)
+        return result
 
-            results = self.sp.search(q=query, type='album', limit=5)
-            if results and 'albums' in results and results['albums']['items']:
-                albums = results['albums']['items']
+    def _revalidate_search(self, kind: str, name: str, artist_name: Optional[str], search: Callable):
+        key = self.search_cache.key(kind, name, artist_name)
+        with self._search_revalidate_lock:
+            if key in self._search_revalidating:
+                return
+            self._search_revalidating.add(key)
 
-                # If artist specified, try to find exact match
-                if artist_name:
-                    for album in albums:
-                        for artist in album['artists']:
-                            if artist_name.lower() in artist['name'].lower():
-                                return album
+        def revalidate():
+            try:
+                self.search_cache.put(kind, name, artist_name, search(name, artist_name))
+            except Exception as e:
+                print(f"Error refreshing cached search: {e}")
+            finally:
+                with self._search_revalidate_lock:
+                    self._search_revalidating.discard(key)
 
-                # Return first result (most popular)
-                return albums[0]
+        threading.Thread(target=self.governor.as_background(revalidate), daemon=True).start()
 
-            return None
+    def search_album(self, album_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        """Search for an album by name, optionally filtered by artist"""
+        try:
+            return self._cached_search('album', album_name, artist_name, self._search_album)
         except Exception as e:
             print(f"Error searching album: {e}")
             return None
 
-    def search_song(self, song_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
-        """Search for a song by name, optionally filtered by artist"""
-        try:
-            # Build search query
-            query = song_name
-            if artist_name:
-                query = f'track:{song_name} artist:{artist_name}'
+    def _search_album(self, album_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        # Build search query
+        query = album_name
+        if artist_name:
+            query = f'album:{album_name} artist:{artist_name}'
+
+        results = self.sp.search(q=query, type='album', limit=5)
+        if results and 'albums' in results and results['albums']['items']:
+            albums = results['albums']['items']
 
-            results = self.sp.search(q=query, type='track', limit=5)
-            if results and 'tracks' in results and results['tracks']['items']:
-                tracks = results['tracks']['items']
+            # If artist specified, try to find exact match
+            if artist_name:
+                for album in albums:
+                    for artist in album['artists']:
+                        if artist_name.lower() in artist['name'].lower():
+                            return album
 
-                # If artist specified, try to find exact match
-                if artist_name:
-                    for track in tracks:
-                        for artist in track['artists']:
-                            if artist_name.lower() in artist['name'].lower():
-                                return track
+            # Return first result (most popular)
+            return albums[0]
 
-                # Return first result (most popular)
-                return tracks[0]
+        return None
 
-            return None
+    def search_song(self, song_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        """Search for a song by name, optionally filtered by artist"""
+        try:
+            return self._cached_search('track', song_name, artist_name, self._search_song)
         except Exception as e:
             print(f"Error searching song: {e}")
             return None
 
-    def play_album(self, album_name: str, artist_name: Optional[str] = None):
-        """Play an album from the beginning"""
-        try:
-            # Search for the album
-            album = self.search_album(album_name, artist_name)
-
-            if not album:
-                print(f"Album not found: {album_name}")
-                return None
-
-            album_uri = album['uri']
-            album_id = album['id']
-            album_title = album['name']
-            artist = album['artists'][0]['name'] if album['artists'] else 'Unknown'
+    def _search_song(self, song_name: str, artist_name: Optional[str] = None) -> Optional[Dict]:
+        # Build search query
+        query = song_name
+        if artist_name:
+            query = f'track:{song_name} artist:{artist_name}'
 
-            print(f"Playing album: {album_title} by {artist}")
+        results = self.sp.search(q=query, type='track', limit=5)
+        if results and 'tracks' in results and results['tracks']['items']:
+            tracks = results['tracks']['items']
 
-            # Preload album tracks
-            self.current_context_tracks = self.get_album_tracks(album_id)
-
-            # Check for available devices
-            devices = self.get_available_devices()
-            if not devices:
-                print("\n[ERROR] No active Spotify devices found!")
-                return None
+            # If artist specified, try to find exact match
+            if artist_name:
+                for track in tracks:
+                    for artist in track['artists']:
+                        if artist_name.lower() in artist['name'].lower():
+                            return track
 
-            # Play the album (starts from first track)
-            device_id = devices[0]['id'] if devices else None
-            self.sp.start_playback(device_id=device_id, context_uri=album_uri)
-            time.sleep(0.5)
+            # Return first result (most popular)
+            return tracks[0]
 
-            # Get current track info
-            self.current_track = self.get_current_track()
-            return self.current_track
+        return None
 
-        except Exception as e:
-            print(f"Error playing album: {e}")
-            return None
+    def play_album(self, album_name: str, artist_name: Optional[str] = None):
+        """Play an album from the beginning"""
+        return self._run_command(self.commands.play_album(album_name, artist_name))
 
     def play_song(self, song_name: str, artist_name: Optional[str] = None):
         """Play a specific song"""
-        try:
-            # Search for the song
-            track = self.search_song(song_name, artist_name)
-
-            if not track:
-                print(f"Song not found: {song_name}")
-                return None
-
-            track_title = track['name']
-            artist = track['artists'][0]['name'] if track['artists'] else 'Unknown'
-
-            print(f"Playing song: {track_title} by {artist}")
-
-            # Play the track
-            self._play_track(track['uri'])
-            self.current_track = track
-            return track
-
-        except Exception as e:
-            print(f"Error playing song: {e}")
-            return None
-
-    def _search_tracks(self, artist: Optional[str] = None, genre: Optional[str] = None, limit: int = 20):
-        """Search for tracks based on criteria from Spotify's entire catalog"""
-        try:
-            query_parts = []
-
-            if artist:
-                query_parts.append(f'artist:{artist}')
-            if genre:
-                query_parts.append(f'genre:{genre}')
-
-            if not query_parts:
-                # No criteria - get random tracks from Spotify catalog
-                return self._get_random_tracks_from_spotify(limit)
-
-            # Get user's market/country
-            market = 'US'  # Default fallback
-            try:
-                user_profile = self.sp.current_user()
-                if user_profile and 'country' in user_profile:
-                    market = user_profile['country']
-            except:
-                pass
-
-            query = ' '.join(query_parts)
-            # Use limit of 10 with explicit market
-            results = self.sp.search(q=query, type='track', limit=10, market=market)
-            return results['tracks']['items']
-
-        except Exception as e:
-            print(f"Error searching tracks: {e}")
-            return []
-
-    def _get_random_tracks_from_spotify(self, limit: int = 50):
-        """Get random tracks from Spotify's entire catalog"""
-        # Use simple search API (most reliable method)
-        return self._search_with_random_query(limit)
+        return self._run_command(self.commands.play_song(song_name, artist_name))
+
+    def prefetch_random_tracks(self, artist: Optional[str] = None, genre: Optional[str] = None):
+        """Pick the next random track ahead of time (used by play_random_track) and warm its lyrics"""
+        with self.governor.background():
+            track = self._choose_random_track(artist=artist, genre=genre)
+        if track:
+            with self._predicted_random_lock:
+                previous, self._predicted_random_track = self._predicted_random_track, ((artist, genre), track)
+            if previous:
+                self.shuffle.put_back(*previous)  # Superseded before it was used
+            self.prefetch_lyrics([track])
+
+    def _random_track_query(self, artist: Optional[str] = None, genre: Optional[str] = None) -> str:
+        """Search query for random track criteria"""
+        query_parts = []
+        if artist:
+            query_parts.append(f'artist:{artist}')
+        if genre:
+            query_parts.append(f'genre:{genre}')
+        if not query_parts:
+            # No criteria - random common word or letter across Spotify's entire catalog
+            return random.choice(RANDOM_TRACK_QUERIES)
+        return ' '.join(query_parts)
+
+    def _search_track_page(self, query: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        """(tracks, total) for one page of a track search in the user's market"""
+        results = self.sp.search(q=query, type='track', limit=limit, offset=offset, market=self.get_market())
+        tracks = (results or {}).get('tracks') or {}
+        return tracks.get('items', []), tracks.get('total', 0)
 
     def _get_tracks_from_featured_playlists(self, limit: int = 50):
         """Get tracks from Spotify's featured playlists"""
@@ -290,170 +725,74 @@ class SpotifyController:
             print(f"Error getting featured playlist tracks: {e}")
             return []
 
-    def _search_with_random_query(self, limit: int = 50):
-        """Search with random query to get random tracks"""
-        try:
-            # Get user's market/country from their profile
-            market = 'US'  # Default fallback
-            try:
-                user_profile = self.sp.current_user()
-                if user_profile and 'country' in user_profile:
-                    market = user_profile['country']
-            except:
-                pass  # Use default market if profile fetch fails
-
-            # Use random common words or letters
-            random_queries = [
-                'love', 'night', 'day', 'time', 'life', 'heart', 'dream',
-                'dance', 'summer', 'light', 'way', 'world', 'baby', 'girl',
-                'boy', 'feel', 'want', 'need', 'forever', 'tonight', 'music',
-                'a', 'b', 'c', 'd', 'e', 'the', 'you', 'me', 'we'
-            ]
-
-            query = random.choice(random_queries)
-            # Try with minimal limit and explicit market
-            results = self.sp.search(q=query, type='track', limit=10, market=market)
-
-            if results and 'tracks' in results and 'items' in results['tracks']:
-                return results['tracks']['items']
-
-            return []
-
-        except Exception as e:
-            print(f"Error with random query search: {e}")
-            return []
-
-    def _play_track(self, uri: str):
-        """Play a specific track"""
-        try:
-            # Check for available devices first
-            devices = self.get_available_devices()
-            if not devices:
-                print("\n[ERROR] No Spotify devices found!")
-                print("Please open Spotify on one of your devices (computer, phone, etc.)\n")
-                return
-
-            # If no device is active, try to activate the first available one
-            active_device = None
-            for device in devices:
-                if device.get('is_active'):
-                    active_device = device
-                    break
-
-            if not active_device and devices:
-                # Try to transfer playback to first available device
-                print(f"Activating device: {devices[0]['name']}...")
-                try:
-                    self.sp.transfer_playback(device_id=devices[0]['id'], force_play=False)
-                    time.sleep(1)  # Give it time to activate
-                    active_device = devices[0]
-                except Exception as transfer_error:
-                    print(f"Could not activate device automatically: {transfer_error}")
-                    print("\nPlease manually start playing something on your Spotify app first,")
-                    print("then try the 'play' command again.\n")
-                    return
-
-            # Now try to play on the active device
-            device_id = active_device['id'] if active_device else None
-            self.sp.start_playback(device_id=device_id, uris=[uri])
-            time.sleep(0.5)  # Give it time to start
-        except Exception as e:
-            print(f"Error playing track: {e}")
-            if "NO_ACTIVE_DEVICE" in str(e) or "Device not found" in str(e):
-                print("\n[TIP] Open Spotify on your phone/computer and play any song first,")
-                print("then try again. Just having the app open isn't enough.\n")
+    def play_track(self, track: Dict) -> bool:
+        """Play a specific track (a Spotify track object; shown as playing right away when it has its album)"""
+        return self._run_command(self.commands.play_track(track))
 
     def pause(self):
         """Pause playback"""
+        prediction = self.predict_playback(is_playing=False)
         try:
             self.sp.pause_playback()
+            self.notify_activity()
         except Exception as e:
+            self.cancel_prediction(prediction)
             print(f"Error pausing: {e}")
+            if self._is_device_error(e):
+                self.invalidate_devices()
 
     def resume(self):
         """Resume playback"""
+        prediction = self.predict_playback(is_playing=True)
         try:
             self.sp.start_playback()
+            self.notify_activity()
         except Exception as e:
+            self.cancel_prediction(prediction)
             print(f"Error resuming: {e}")
+            if self._is_device_error(e):
+                self.invalidate_devices()
 
     def next_track(self):
         """Skip to next track and auto-play"""
-        try:
-            if self.play_mode == 'repeat_one':
-                # Replay current track
-                if self.current_track:
-                    self._play_track(self.current_track['uri'])
-            elif self.play_mode == 'shuffle':
-                # In shuffle mode, play a new random track that hasn't been played
-                self.play_random_track()
-            else:
-                # Try to skip to next track in queue
-                try:
-                    self.sp.next_track()
-                    time.sleep(0.5)
-                    new_track = self.get_current_track()
-
-                    # If still on same track (no queue), play a random track instead
-                    if new_track and self.current_track and new_track.get('uri') == self.current_track.get('uri'):
-                        self.play_random_track()
-                    else:
-                        self.current_track = new_track
-                except:
-                    # If next_track fails, play a random track
-                    self.play_random_track()
-        except Exception as e:
-            print(f"Error skipping track: {e}")
+        return self._run_command(self.commands.next_track())
 
     def previous_track(self):
         """Go to previous track and auto-play"""
-        try:
-            # Try to skip to previous track
-            try:
-                self.sp.previous_track()
-                time.sleep(0.5)
-                new_track = self.get_current_track()
-
-                # If still on same track (no queue), play a random track instead
-                if new_track and self.current_track and new_track.get('uri') == self.current_track.get('uri'):
-                    self.play_random_track()
-                else:
-                    self.current_track = new_track
-            except:
-                # If previous_track fails, play a random track
-                self.play_random_track()
-        except Exception as e:
-            print(f"Error going to previous track: {e}")
+        return self._run_command(self.commands.previous_track())
 
     def seek_forward(self, seconds: int = 10):
         """Seek forward in current track"""
         try:
-            current = self.get_current_track()
-            if current:
-                new_position = current['progress_ms'] + (seconds * 1000)
+            current = self.get_playback_snapshot()
+            if current and current.track:
+                new_position = current.estimated_progress_ms() + (seconds * 1000)
                 # Don't seek past the end
-                new_position = min(new_position, current['duration_ms'] - 1000)
-                self.sp.seek_track(new_position)
+                new_position = min(new_position, current.duration_ms - 1000)
+                self.seek(new_position)
         except Exception as e:
             print(f"Error seeking forward: {e}")
 
     def seek_backward(self, seconds: int = 10):
         """Seek backward in current track"""
         try:
-            current = self.get_current_track()
-            if current:
-                new_position = current['progress_ms'] - (seconds * 1000)
+            current = self.get_playback_snapshot()
+            if current and current.track:
+                new_position = current.estimated_progress_ms() - (seconds * 1000)
                 # Don't seek before the beginning
                 new_position = max(new_position, 0)
-                self.sp.seek_track(new_position)
+                self.seek(new_position)
         except Exception as e:
             print(f"Error seeking backward: {e}")
 
     def seek(self, position_ms: int):
         """Seek to position in current track"""
+        prediction = self.predict_playback(progress_ms=position_ms)
         try:
             self.sp.seek_track(position_ms)
+            self.notify_activity()
         except Exception as e:
+            self.cancel_prediction(prediction)
             print(f"Error seeking: {e}")
 
     def set_volume(self, volume: int):
@@ -463,151 +802,481 @@ class SpotifyController:
         except Exception as e:
             print(f"Error setting volume: {e}")
 
-    def get_current_track(self) -> Optional[Dict]:
-        """Get currently playing track info"""
+    def refresh_playback(self) -> Optional[PlaybackSnapshot]:
+        """Fetch playback state once and publish it as the latest snapshot"""
         try:
             current = self.sp.current_playback()
-            if current and current['item']:
-                track = current['item']
-                return {
-                    'name': track['name'],
-                    'artists': track['artists'],  # Keep full artist objects with IDs
-                    'album': track['album'],  # Keep full album object with ID
-                    'album_art': track['album']['images'][0]['url'] if track['album']['images'] else None,
-                    'duration_ms': track['duration_ms'],
-                    'progress_ms': current['progress_ms'],
-                    'uri': track['uri'],
-                    'is_playing': current['is_playing']
-                }
-            return None
         except Exception as e:
             print(f"Error getting current track: {e}")
             return None
 
-    def get_lyrics(self, song_name: str, artist_name: str, duration_ms: int = 0) -> Optional[str]:
-        """Fetch synced lyrics from LRCLIB"""
-        try:
-            # LRCLIB API endpoint
-            url = "https://lrclib.net/api/get"
-            params = {
-                'track_name': song_name,
-                'artist_name': artist_name,
+        # The player state names the active device - keeps the device registry current for free
+        device = current.get('device') if current else None
+        if device and device.get('id'):
+            with self._device_lock:
+                self.active_device_id = device['id']
+                self._active_device_at = time.monotonic()
+
+        track = None
+        if current and current['item']:
+            track = self._track_info(current['item'], current['progress_ms'], current['is_playing'])
+
+        snapshot = PlaybackSnapshot(
+            track=track,
+            progress_ms=track['progress_ms'] if track else 0,
+            duration_ms=track['duration_ms'] if track else 0,
+            is_playing=track['is_playing'] if track else False,
+            fetched_at=time.monotonic()
+        )
+        with self._playback_changed:
+            self._actual_snapshot = snapshot
+            published = self._reconcile(snapshot)
+            if published is not None:
+                self._publish(published)
+        return snapshot
+
+    def _track_info(self, item: Dict, progress_ms: int, is_playing: bool) -> Dict:
+        """get_current_track()-style dict for a Spotify track object"""
+        return {
+            'name': item['name'],
+            'artists': item['artists'],  # Keep full artist objects with IDs
+            'album': item['album'],  # Keep full album object with ID
+            'album_art': pick_album_image(item['album'].get('images') or [], self.album_art_size),
+            'duration_ms': item['duration_ms'],
+            'progress_ms': progress_ms,
+            'uri': item['uri'],
+            'is_playing': is_playing
+        }
+
+    def _publish(self, snapshot: PlaybackSnapshot):
+        with self._playback_changed:
+            self.playback_snapshot = snapshot
+            self.playback_version += 1
+            self._playback_changed.notify_all()
+
+    def predict_playback(self, track: Optional[Dict] = None, progress_ms: Optional[int] = None,
+                         is_playing: Optional[bool] = None) -> Optional[PlaybackSnapshot]:
+        """Publish the expected result of a command right away; refresh_playback reconciles it.
+
+        track is a Spotify track object (album included) about to start from the beginning.
+        Without one the latest snapshot is adjusted instead: progress_ms after a seek,
+        is_playing after pause/resume. Returns the prediction (None with nothing to predict from).
+        """
+        with self._playback_changed:
+            now = time.monotonic()
+            if track is not None:
+                progress_ms = progress_ms or 0
+                is_playing = True if is_playing is None else is_playing
+                track = self._track_info(track, progress_ms, is_playing)
+            else:
+                base = self.playback_snapshot
+                if not base or not base.track:
+                    return None
+                progress_ms = base.estimated_progress_ms(now) if progress_ms is None else progress_ms
+                is_playing = base.is_playing if is_playing is None else is_playing
+                track = dict(base.track, progress_ms=progress_ms, is_playing=is_playing)
+
+            prediction = PlaybackSnapshot(
+                track=track,
+                progress_ms=min(max(progress_ms, 0), track['duration_ms']),
+                duration_ms=track['duration_ms'],
+                is_playing=is_playing,
+                fetched_at=now,
+                predicted=True
+            )
+            if self._prediction is not None:
+                self.predictions_superseded += 1
+            self._prediction = prediction
+            self._prediction_expires_at = now + PREDICTION_GRACE_SECONDS
+            self.predictions += 1
+            self._publish(prediction)
+            return prediction
+
+    def cancel_prediction(self, prediction: Optional[PlaybackSnapshot]):
+        """The command behind prediction failed: roll back to the last real snapshot"""
+        with self._playback_changed:
+            if prediction is None or self._prediction is not prediction:
+                return  # Already reconciled, or superseded by a newer command
+            self._prediction = None
+            self._count_misprediction('failed')
+            if self._actual_snapshot is not None:
+                self._publish(self._actual_snapshot._replace(corrected=True))
+
+    def _reconcile(self, actual: PlaybackSnapshot) -> Optional[PlaybackSnapshot]:
+        """Snapshot to publish for a freshly fetched one (None = keep showing the pending prediction)"""
+        prediction = self._prediction
+        if prediction is None:
+            return actual
+        mismatch = self._prediction_mismatch(prediction, actual)
+        if mismatch is None:
+            self._prediction = None
+            self.predictions_confirmed += 1
+            return actual
+        if actual.fetched_at < self._prediction_expires_at:
+            return None  # Spotify may not have applied the command yet
+        # Polls have had time to catch up and still disagree: roll back and flag it
+        self._prediction = None
+        self._count_misprediction(mismatch)
+        return actual._replace(corrected=True)
+
+    @staticmethod
+    def _prediction_mismatch(prediction: PlaybackSnapshot, actual: PlaybackSnapshot) -> Optional[str]:
+        """Which part of prediction the real snapshot contradicts (None when it bears it out)"""
+        if not actual.track or actual.track['uri'] != prediction.track['uri']:
+            return 'track'
+        if actual.is_playing != prediction.is_playing:
+            return 'is_playing'
+        drift_ms = actual.progress_ms - prediction.estimated_progress_ms(actual.fetched_at)
+        if abs(drift_ms) > PREDICTION_PROGRESS_TOLERANCE_MS:
+            return 'progress'
+        return None
+
+    def _count_misprediction(self, field: str):
+        self.mispredictions += 1
+        self.mispredicted_fields[field] = self.mispredicted_fields.get(field, 0) + 1
+
+    def get_prediction_stats(self) -> Dict:
+        """Optimistic playback state: predictions made, confirmed by Spotify, and rolled back"""
+        with self._playback_changed:
+            decided = self.predictions_confirmed + self.mispredictions
+            stats = {
+                'predicted': self.predictions,
+                'confirmed': self.predictions_confirmed,
+                'mispredicted': self.mispredictions,
+                'superseded': self.predictions_superseded,
+                'pending': int(self._prediction is not None),
+                'mispredict_rate': self.mispredictions / decided if decided else 0.0,
             }
+            for field, count in sorted(self.mispredicted_fields.items()):
+                stats[f'{field}_mispredicted'] = count
+            return stats
+
+    def wait_for_playback(self, predicate: Callable[[PlaybackSnapshot], bool],
+                          deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        """Poll playback until predicate(snapshot) holds; the last snapshot if the deadline passes first.
+
+        deadline is a time.monotonic() value (default PLAYBACK_WAIT_TIMEOUT from now). The first
+        poll is immediate and the interval doubles from there, so a command returns as soon as
+        Spotify reports its effect instead of after a worst-case sleep.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + PLAYBACK_WAIT_TIMEOUT
+        interval = PLAYBACK_WAIT_FIRST_INTERVAL
+        while True:
+            snapshot = self.refresh_playback()
+            if snapshot and predicate(snapshot):
+                return snapshot
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return snapshot
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, PLAYBACK_WAIT_MAX_INTERVAL)
+
+    def wait_for_track(self, uri: str, deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        """Wait until Spotify reports uri as the current track"""
+        return self.wait_for_playback(lambda s: bool(s.track) and s.track['uri'] == uri, deadline)
+
+    def wait_for_track_change(self, old_uri: Optional[str], deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        """Wait until Spotify reports a current track other than old_uri"""
+        return self.wait_for_playback(lambda s: bool(s.track) and s.track['uri'] != old_uri, deadline)
+
+    def wait_for_restart(self, uri: str, since: float, deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        """Wait until uri is reported playing from the start again (replayed at time.monotonic() since)"""
+        return self.wait_for_playback(
+            lambda s: bool(s.track) and s.track['uri'] == uri and s.restarted_since(since), deadline
+        )
+
+    def wait_for_play_state(self, is_playing: bool, deadline: Optional[float] = None) -> Optional[PlaybackSnapshot]:
+        """Wait until Spotify reports playback as playing (or paused)"""
+        return self.wait_for_playback(lambda s: s.is_playing == is_playing, deadline)
+
+    def get_playback_snapshot(self) -> Optional[PlaybackSnapshot]:
+        """Latest published snapshot, fetching one only if nothing has been polled yet"""
+        snapshot = self.playback_snapshot
+        if snapshot is None:
+            snapshot = self.refresh_playback()
+        return snapshot
+
+    def wait_for_playback_update(self, last_version: int, timeout: Optional[float] = None) -> Tuple[int, Optional[PlaybackSnapshot]]:
+        """Block until a snapshot newer than last_version is published (or timeout)"""
+        with self._playback_changed:
+            self._playback_changed.wait_for(lambda: self.playback_version != last_version, timeout)
+            return self.playback_version, self.playback_snapshot
+
+    def start_playback_poller(self):
+        """Start the background poller that publishes playback snapshots"""
+        if self._poller_thread and self._poller_thread.is_alive():
+            return
+        self._poller_running = True
+        self._poller_thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._poller_thread.start()
+
+    def stop_playback_poller(self):
+        """Stop the background playback poller"""
+        self._poller_running = False
+        self._poll_wakeup.set()
+
+    def notify_activity(self):
+        """Wake the poller now and poll densely for a while (user command, keypress, GUI action)"""
+        self.last_activity_at = time.monotonic()
+        self._poll_wakeup.set()
+
+    def next_poll_delay(self, snapshot: Optional[PlaybackSnapshot], now: Optional[float] = None) -> float:
+        """Seconds until the next poll, based on recent activity and position in the track"""
+        now = now if now is not None else time.monotonic()
+        intervals = self.poll_intervals
+
+        if now - self.last_activity_at < ACTIVITY_WINDOW_SECONDS:
+            return intervals['active']
+        if not snapshot or not snapshot.track:
+            return intervals['idle']
+        if not snapshot.is_playing:
+            return intervals['paused']
+
+        remaining_ms = snapshot.remaining_ms(now)
+        if remaining_ms <= NEAR_END_WINDOW_MS:
+            return intervals['near_end']
+        # Sleep mid-track, but wake up right as the end-of-track window opens
+        until_window = (remaining_ms - NEAR_END_WINDOW_MS) / 1000
+        return max(intervals['near_end'], min(intervals['playing'], until_window))
+
+    def _poll_loop(self):
+        """Background loop behind start_playback_poller"""
+        with self.governor.background():  # Polls yield to user commands when rate-limited
+            while self._poller_running:
+                self._poll_wakeup.clear()
+                snapshot = self.refresh_playback() or self.playback_snapshot
+                self._poll_wakeup.wait(self.next_poll_delay(snapshot))
+
+    def get_current_track(self) -> Optional[Dict]:
+        """Get currently playing track info"""
+        snapshot = self.refresh_playback()
+        return snapshot.track if snapshot else None
+
+    def _lookup_lyrics(self, song_name: str, artist_name: str, duration_ms: int = 0) -> Optional[CachedLyrics]:
+        """Cache-then-LRCLIB lookup with no side effects (None on transient failures)"""
+        cached = self.lyrics_cache.get(song_name, artist_name, duration_ms) if self.lyrics_cache else None
+        if cached is not None:
+            return cached
+        key = ('lyrics', lyrics_cache_key(song_name, artist_name, duration_ms))
+        return self.inflight.do(key, self._fetch_lyrics, song_name, artist_name, duration_ms)
+
+    def _fetch_lyrics(self, song_name: str, artist_name: str, duration_ms: int = 0) -> Optional[CachedLyrics]:
+        """LRCLIB lookup, stored in the lyrics cache (None on transient failures)"""
+        # LRCLIB API endpoint
+        url = self.lyrics_api_url
+        params = {
+            'track_name': song_name,
+            'artist_name': artist_name,
+        }
+
+        # Add duration if available (helps with accuracy)
+        if duration_ms > 0:
+            params['duration'] = int(duration_ms / 1000)  # Convert to seconds
+
+        response = self.http.get(url, params=params)
 
-            # Add duration if available (helps with accuracy)
-            if duration_ms > 0:
-                params['duration'] = int(duration_ms / 1000)  # Convert to seconds
+        if response.status_code == 200:
+            data = response.json()
+            cached = CachedLyrics(data.get('syncedLyrics'), data.get('plainLyrics'),
+                                  bool(data.get('syncedLyrics') or data.get('plainLyrics')))
+        elif response.status_code == 404:
+            cached = CachedLyrics(None, None, False)
+        else:
+            # Server-side trouble - don't cache, try again next time
+            return None
 
-            response = requests.get(url, params=params, timeout=5)
+        if self.lyrics_cache:
+            self.lyrics_cache.put(song_name, artist_name, duration_ms, cached.synced, cached.plain)
+        return cached
 
-            if response.status_code == 200:
-                data = response.json()
+    def get_lyrics(self, song_name: str, artist_name: str, duration_ms: int = 0) -> Optional[str]:
+        """Fetch synced lyrics from LRCLIB (served from the persistent lyrics cache when possible)"""
+        lyrics, self.synced_lyrics = self.lyrics_for(song_name, artist_name, duration_ms)
+        return lyrics
 
-                # Try to get synced lyrics first
-                if data.get('syncedLyrics'):
-                    self.synced_lyrics = self.parse_lrc_lyrics(data['syncedLyrics'])
-                    return data['syncedLyrics']
+    def lyrics_for(self, song_name: str, artist_name: str, duration_ms: int = 0) -> Tuple[str, SyncedLyrics]:
+        """(lyrics text, SyncedLyrics) for a track, without touching the current lyrics state"""
+        try:
+            cached = self._lookup_lyrics(song_name, artist_name, duration_ms)
 
-                # Fallback to plain lyrics
-                elif data.get('plainLyrics'):
-                    self.synced_lyrics = []  # No sync data
-                    return data['plainLyrics']
+            # Try to get synced lyrics first
+            if cached and cached.synced:
+                return cached.synced, self.parse_lrc_lyrics(cached.synced)
+
+            # Fallback to plain lyrics
+            elif cached and cached.plain:
+                return cached.plain, SyncedLyrics()  # No sync data
 
             # If not found, return message
-            self.synced_lyrics = []
-            return "Lyrics not found"
+            return "Lyrics not found", SyncedLyrics()
 
         except Exception as e:
-            self.synced_lyrics = []
-            return "Lyrics unavailable"
+            print(f"Error fetching lyrics: {e}")
+            return "Lyrics unavailable", SyncedLyrics()
+
+    def lyrics_ready(self, song_name: str, artist_name: str, duration_ms: int = 0) -> bool:
+        """Whether get_lyrics would be answered from the cache (no network wait)"""
+        return bool(self.lyrics_cache and self.lyrics_cache.contains(song_name, artist_name, duration_ms))
+
+    def prefetch_lyrics(self, tracks: List[Dict]):
+        """Warm the lyrics cache for tracks in the background (bounded concurrency, deduplicated)"""
+        if not self.lyrics_cache:
+            return
+        for track in tracks:
+            artists = track.get('artists') or []
+            artist_name = artists[0]['name'] if artists else 'Unknown'
+            duration_ms = track.get('duration_ms', 0)
+            if not track.get('name') or self.lyrics_ready(track['name'], artist_name, duration_ms):
+                continue
+
+            key = lyrics_cache_key(track['name'], artist_name, duration_ms)
+            with self._lyrics_prefetch_lock:
+                if key in self._lyrics_prefetch_inflight:
+                    continue
+                self._lyrics_prefetch_inflight.add(key)
+            self._lyrics_prefetch_pool.submit(self._prefetch_one_lyrics, key, track['name'], artist_name, duration_ms)
+
+    def _prefetch_one_lyrics(self, key: str, song_name: str, artist_name: str, duration_ms: int):
+        try:
+            self._lookup_lyrics(song_name, artist_name, duration_ms)
+        except Exception:
+            pass  # Prefetch is best-effort; get_lyrics will retry on demand
+        finally:
+            with self._lyrics_prefetch_lock:
+                self._lyrics_prefetch_inflight.discard(key)
+
+    def prefetch_upcoming_lyrics(self, count: Optional[int] = None):
+        """Warm lyrics for the next tracks in the current album/artist context"""
+        count = count if count is not None else self.lyrics_prefetch_count
+        tracks = self.current_context_tracks
+        if not tracks or not self.current_track or count <= 0:
+            return
+
+        current_index = tracks.index_of(self.current_track.get('uri'))
+        # repeat_all wraps around to the start of the album
+        self.prefetch_lyrics(tracks.next_tracks(current_index, count, wrap=self.play_mode == 'repeat_all'))
+
+    def get_cache_stats(self) -> Dict:
+        """Size and hit-rate metrics for the controller's caches"""
+        stats = {}
+        if self.lyrics_cache:
+            stats['lyrics'] = self.lyrics_cache.stats()
+        if self.art_store:
+            stats['art'] = self.art_store.stats()
+        stats['search'] = self.search_cache.stats()
+        stats['context'] = self.context_loader.stats()
+        stats['shuffle'] = self.shuffle.stats()
+        return stats
+
+    def get_http_stats(self) -> Dict:
+        """Connection reuse for the pooled HTTP transports, and requests coalesced before reaching them"""
+        return {
+            'http': self.http.stats(),
+            'spotify': self.spotify_http.stats(),
+            'inflight': self.inflight.stats(),
+        }
+
+    def get_rate_limit_stats(self) -> Dict:
+        """Spotify API governor: bucket level, queue depth, time spent throttled and 429s"""
+        return self.governor.stats()
 
     def get_current_lyric_line(self, progress_ms: int) -> Optional[str]:
         """Get the current lyric line based on playback position"""
-        if not self.synced_lyrics:
-            return None
-
-        # Find the most recent lyric line that should be displayed
-        current_line = None
-        for timestamp_ms, text in self.synced_lyrics:
-            if timestamp_ms <= progress_ms:
-                current_line = text
-            else:
-                break
-
-        return current_line
-
-    def get_album_tracks(self, album_id: str) -> List[Dict]:
-        """Get all tracks from an album"""
+        return self.synced_lyrics.line_at(progress_ms)
+
+    def load_context(self, kind: str, context_id: str) -> TrackList:
+        """Make an album/playlist/artist the current context; returns once its first page is in.
+
+        Remaining pages stream into current_context_tracks in the background. If the first
+        page fails the exception propagates and the previous context stays current.
+        """
+        key = self._context_requested = (kind, context_id)
+        context = self.context_loader.load(kind, context_id, on_update=self._on_context_update)
+        if self._context_requested == key:  # Not overtaken by a newer load_context
+            self._context_key = key
+            self.current_context_tracks = context.tracks  # Includes any page that landed meanwhile
+        return context.tracks
+
+    def _on_context_update(self, context: ContextTracks):
+        """More pages of a context arrived (called from a loader worker)"""
+        if self._context_key != context.key:
+            return  # User moved on to another album/artist
+        self.current_context_tracks = context.tracks
+        if context.complete:
+            self.prefetch_upcoming_lyrics()  # The current track may be on a page that just landed
+
+    def get_album_tracks(self, album_id: str) -> TrackList:
+        """Get all tracks from an album (every page, cached per album)"""
         try:
-            results = self.sp.album_tracks(album_id)
-            if results and 'items' in results:
-                return results['items']
-            return []
+            return self.context_loader.load('album', album_id).wait()
         except Exception as e:
             print(f"Error getting album tracks: {e}")
-            return []
+            return TrackList()
+
+    def get_playlist_tracks(self, playlist_id: str) -> TrackList:
+        """Get all tracks from a playlist (every page, cached briefly per playlist)"""
+        try:
+            return self.context_loader.load('playlist', playlist_id).wait()
+        except Exception as e:
+            print(f"Error getting playlist tracks: {e}")
+            return TrackList()
 
-    def get_artist_top_tracks(self, artist_id: str) -> List[Dict]:
+    def get_artist_top_tracks(self, artist_id: str) -> TrackList:
         """Get artist's top tracks"""
         try:
-            # Get user's market/country
-            market = 'US'
-            try:
-                user_profile = self.sp.current_user()
-                if user_profile and 'country' in user_profile:
-                    market = user_profile['country']
-            except:
-                pass
-
-            results = self.sp.artist_top_tracks(artist_id, country=market)
-            if results and 'tracks' in results:
-                return results['tracks']
-            return []
+            return self.context_loader.load('artist', artist_id).tracks
         except Exception as e:
             print(f"Error getting artist top tracks: {e}")
-            return []
+            return TrackList()
 
     def update_context_tracks(self):
         """Update the current context tracks (album or artist)"""
         try:
             if not self.current_track:
-                self.current_context_tracks = []
+                self._context_key = None
+                self.current_context_tracks = TrackList()
                 return
 
             # Check if track has an album
             if self.current_track.get('album') and self.current_track['album'].get('id'):
-                album_id = self.current_track['album']['id']
-                self.current_context_tracks = self.get_album_tracks(album_id)
+                self.load_context('album', self.current_track['album']['id'])
             # Otherwise get artist's top tracks
             elif self.current_track.get('artists') and len(self.current_track['artists']) > 0:
-                artist_id = self.current_track['artists'][0]['id']
-                self.current_context_tracks = self.get_artist_top_tracks(artist_id)
+                self.load_context('artist', self.current_track['artists'][0]['id'])
             else:
-                self.current_context_tracks = []
+                self._context_key = None
+                self.current_context_tracks = TrackList()
+
+            self.prefetch_upcoming_lyrics()
 
         except Exception as e:
-            print(f"Error updating context tracks: {e}")
-            self.current_context_tracks = []
+            print(f"Error updating context tracks: {e}")  # load_context left the previous context current
 
     def download_album_art(self, url: str) -> Optional[bytes]:
-        """Download album artwork"""
+        """Download album artwork (served from the disk art store when already downloaded)"""
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                return response.content
-            return None
+            if self.art_store:
+                data = self.art_store.get(url)
+                if data is not None:
+                    return data
+            return self.inflight.do(('art', url), self._fetch_album_art, url)
         except Exception as e:
             print(f"Error downloading album art: {e}")
             return None
 
+    def _fetch_album_art(self, url: str) -> Optional[bytes]:
+        response = self.http.get(url)
+        if response.status_code == 200:
+            if self.art_store:
+                self.art_store.put(url, response.content)
+            return response.content
+        return None
+
     def set_play_mode(self, mode: str):
         """Set play mode: normal, repeat_one, repeat_all, shuffle"""
         valid_modes = ['normal', 'repeat_one', 'repeat_all', 'shuffle']
         if mode in valid_modes:
-            # Clear shuffle history when changing modes
-            if mode != self.play_mode:
-                self.played_tracks_history.clear()
-
             self.play_mode = mode
 
             # Update Spotify player state
@@ -626,19 +1295,6 @@ class SpotifyController:
             except Exception as e:
                 print(f"Error setting play mode: {e}")
 
-    def is_track_ended(self) -> bool:
-        """Check if current track has ended"""
-        try:
-            current = self.sp.current_playback()
-            if current and current['item']:
-                progress = current['progress_ms']
-                duration = current['item']['duration_ms']
-                # Consider ended if within last 2 seconds
-                return (duration - progress) < 2000
-            return False
-        except Exception as e:
-            return False
-
     def parse_command(self, command: str) -> Dict:
         """Parse user command and extract intent"""
         command = command.lower().strip()
@@ -0,0 +1,596 @@
+import io
+import json
+import math
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Tuple
+from urllib.parse import urlparse, parse_qs
+
+try:
+    from PIL import Image
+except ImportError:  # Art endpoint falls back to opaque bytes without Pillow
+    Image = None
+
+
+# Canned catalog: (album name, artist name, genres, track names or track count, lyrics available)
+CATALOG_ALBUMS = [
+    ('Midnights', 'Taylor Swift', ['pop'], [
+        'Lavender Haze', 'Maroon', 'Anti-Hero', 'Snow On The Beach', "You're On Your Own, Kid",
+        'Midnight Rain', 'Question...?', 'Vigilante Shit', 'Bejeweled', 'Labyrinth',
+        'Karma', 'Sweet Nothing', 'Mastermind'
+    ], True),
+    ('folklore', 'Taylor Swift', ['pop', 'indie'], [
+        'the 1', 'cardigan', 'the last great american dynasty', 'exile', 'my tears ricochet',
+        'mirrorball', 'seven', 'august', 'this is me trying', 'illicit affairs',
+        'invisible string', 'mad woman', 'epiphany', 'betty', 'peace', 'hoax'
+    ], True),
+    ('Help!', 'The Beatles', ['rock'], [
+        'Help!', 'The Night Before', "You've Got To Hide Your Love Away", 'I Need You',
+        'Another Girl', "You're Going To Lose That Girl", 'Ticket To Ride', 'Act Naturally',
+        "It's Only Love", 'You Like Me Too Much', 'Tell Me What You See',
+        "I've Just Seen A Face", 'Yesterday', 'Dizzy Miss Lizzy'
+    ], True),
+    ('A Night at the Opera', 'Queen', ['rock'], [
+        'Death on Two Legs', 'Lazing on a Sunday Afternoon', "I'm in Love with My Car",
+        "You're My Best Friend", "'39", 'Sweet Lady', 'Seaside Rendezvous',
+        'The Prophet\'s Song', 'Love of My Life', 'Good Company', 'Bohemian Rhapsody',
+        'God Save the Queen'
+    ], True),
+    ('The Complete Columbia Sessions', 'Miles Davis', ['jazz'], 120, False),
+]
+
+CATALOG_DEVICES = [
+    {'id': 'dev-kiosk', 'name': 'Kiosk Speaker', 'type': 'Computer', 'is_active': True, 'volume_percent': 50},
+    {'id': 'dev-phone', 'name': 'Phone', 'type': 'Smartphone', 'is_active': False, 'volume_percent': 80},
+]
+
+ART_SIZES = [640, 300, 64]
+
+
+def _slug(kind: str, number: int) -> str:
+    return f"{kind}{number:04d}"
+
+
+class StubCatalog:
+    """Deterministic in-memory catalog of artists, albums and tracks"""
+
+    def __init__(self, base_url: str):
+        self.artists = {}  # artist id -> artist object (with genres)
+        self.albums = {}   # album id -> album object
+        self.album_tracks = {}  # album id -> list of simplified track objects
+        self.tracks = {}   # track uri -> full track object
+        self.lyrics_available = set()  # Track uris that have LRCLIB lyrics
+
+        for album_number, (album_name, artist_name, genres, track_spec, has_lyrics) in enumerate(CATALOG_ALBUMS, 1):
+            artist = self._artist(artist_name, genres)
+            album_id = _slug('alb', album_number)
+            album = {
+                'id': album_id,
+                'name': album_name,
+                'uri': f'spotify:album:{album_id}',
+                'album_type': 'album',
+                'artists': [self._artist_ref(artist)],
+                'images': [
+                    {'url': f'{base_url}/art/{album_id}/{size}.jpg', 'width': size, 'height': size}
+                    for size in ART_SIZES
+                ],
+            }
+            self.albums[album_id] = album
+
+            if isinstance(track_spec, int):
+                track_names = [f'Session Take {n}' for n in range(1, track_spec + 1)]
+            else:
+                track_names = track_spec
+
+            simplified = []
+            for track_number, track_name in enumerate(track_names, 1):
+                track_id = _slug('trk', album_number * 1000 + track_number)
+                track = {
+                    'id': track_id,
+                    'name': track_name,
+                    'uri': f'spotify:track:{track_id}',
+                    'artists': [self._artist_ref(artist)],
+                    'duration_ms': 150000 + (zlib.crc32(track_id.encode()) % 120) * 1000,
+                    'track_number': track_number,
+                    'popularity': 100 - (zlib.crc32(track_name.encode()) % 60),
+                }
+                simplified.append(track)
+                self.tracks[track['uri']] = dict(track, album=album)
+                if has_lyrics:
+                    self.lyrics_available.add(track['uri'])
+            self.album_tracks[album_id] = simplified
+
+    def _artist(self, name: str, genres: List[str]) -> Dict:
+        for artist in self.artists.values():
+            if artist['name'] == name:
+                return artist
+        artist_id = _slug('art', len(self.artists) + 1)
+        artist = {'id': artist_id, 'name': name, 'uri': f'spotify:artist:{artist_id}', 'genres': genres}
+        self.artists[artist_id] = artist
+        return artist
+
+    @staticmethod
+    def _artist_ref(artist: Dict) -> Dict:
+        return {'id': artist['id'], 'name': artist['name'], 'uri': artist['uri']}
+
+    def track_by_uri(self, uri: str) -> Optional[Dict]:
+        return self.tracks.get(uri)
+
+    def search(self, query: str, kind: str) -> List[Dict]:
+        """Very small subset of the Spotify search grammar: field filters plus free text"""
+        filters = dict(re.findall(r'(track|album|artist|genre):(.+?)(?=\s+\w+:|$)', query))
+        free_text = re.sub(r'(track|album|artist|genre):.+?(?=\s+\w+:|$)', '', query).strip().lower()
+
+        def matches(track_name, album, artist):
+            if 'track' in filters and filters['track'].strip().lower() not in track_name.lower():
+                return False
+            if 'album' in filters and filters['album'].strip().lower() not in album['name'].lower():
+                return False
+            if 'artist' in filters and filters['artist'].strip().lower() not in artist['name'].lower():
+                return False
+            if 'genre' in filters and filters['genre'].strip().lower() not in artist['genres']:
+                return False
+            if free_text:
+                haystack = f"{track_name} {album['name']} {artist['name']}".lower()
+                return free_text in haystack
+            return True
+
+        if kind == 'album':
+            results = []
+            for album in self.albums.values():
+                artist = self.artists[album['artists'][0]['id']]
+                if 'track' not in filters and matches('', album, artist):
+                    results.append(album)
+            return results
+
+        results = []
+        for track in self.tracks.values():
+            artist = self.artists[track['artists'][0]['id']]
+            if matches(track['name'], track['album'], artist):
+                results.append(track)
+        return sorted(results, key=lambda t: -t['popularity'])
+
+    def top_tracks(self, artist_id: str) -> List[Dict]:
+        tracks = [t for t in self.tracks.values() if t['artists'][0]['id'] == artist_id]
+        return sorted(tracks, key=lambda t: -t['popularity'])[:10]
+
+    def synced_lyrics(self, track: Dict) -> str:
+        lines = []
+        for n, timestamp_ms in enumerate(range(5000, track['duration_ms'] - 5000, 4000), 1):
+            minutes, rest = divmod(timestamp_ms, 60000)
+            lines.append(f"[{minutes:02d}:{rest // 1000:02d}.{(rest % 1000) // 10:02d}]{track['name']} line {n}")
+        return '\n'.join(lines)
+
+
+class StubPlayer:
+    """Simulated Spotify Connect player state"""
+
+    def __init__(self, catalog: StubCatalog):
+        self.catalog = catalog
+        self.devices = [dict(device) for device in CATALOG_DEVICES]
+        self.queue = []  # Track uris in the current context
+        self.index = 0
+        self.context_uri = None
+        self.is_playing = False
+        self.position_ms = 0
+        self.position_at = time.monotonic()
+        self.shuffle_state = False
+        self.repeat_state = 'off'
+
+    def active_device(self) -> Optional[Dict]:
+        for device in self.devices:
+            if device['is_active']:
+                return device
+        return None
+
+    def activate(self, device_id: str) -> bool:
+        if not any(device['id'] == device_id for device in self.devices):
+            return False
+        for device in self.devices:
+            device['is_active'] = device['id'] == device_id
+        return True
+
+    def progress_ms(self) -> int:
+        progress = self.position_ms
+        if self.is_playing:
+            progress += int((time.monotonic() - self.position_at) * 1000)
+        track = self.current_item()
+        if track:
+            progress = min(progress, track['duration_ms'])
+        return progress
+
+    def current_item(self) -> Optional[Dict]:
+        if not self.queue:
+            return None
+        return self.catalog.track_by_uri(self.queue[self.index])
+
+    def set_position(self, position_ms: int):
+        self.position_ms = max(0, position_ms)
+        self.position_at = time.monotonic()
+
+    def load(self, uris: List[str], index: int = 0, context_uri: Optional[str] = None):
+        self.queue = uris
+        self.index = index
+        self.context_uri = context_uri
+        self.is_playing = True
+        self.set_position(0)
+
+    def state(self) -> Optional[Dict]:
+        track = self.current_item()
+        device = self.active_device()
+        if not track or not device:
+            return None
+        return {
+            'device': device,
+            'shuffle_state': self.shuffle_state,
+            'repeat_state': self.repeat_state,
+            'timestamp': int(time.time() * 1000),
+            'context': {'uri': self.context_uri, 'type': 'album'} if self.context_uri else None,
+            'progress_ms': self.progress_ms(),
+            'item': track,
+            'currently_playing_type': 'track',
+            'is_playing': self.is_playing,
+        }
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Routes Spotify Web API, LRCLIB and album art requests to the stub state"""
+
+    server_version = 'SpotifyStub/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method: str):
+        stub = self.server.stub
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip('/') or '/'  # spotipy appends a slash to some endpoints
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = {}
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                body = {}
+
+        stub.record(method, path)
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        retry_after = stub.rate_limited(path)
+        if retry_after:
+            self.send_response(429)
+            self.send_header('Retry-After', str(retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        with stub.lock:
+            status, payload, content_type = stub.route(method, path, params, body)
+
+        if isinstance(payload, (dict, list)):
+            data = json.dumps(payload).encode('utf-8')
+        else:
+            data = payload or b''
+        self.send_response(status)
+        if data:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+
+class SpotifyStubServer:
+    """Local stand-in for the Spotify Web API, LRCLIB and the album art CDN.
+
+    Point a SpotifyController at it with ``controller_config()``. Every request is
+    counted per endpoint so callers can measure API round trips per user action.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 rate_limit: Optional[Tuple[int, float]] = None):
+        self.latency = latency  # Simulated network round trip per request, in seconds
+        self.rate_limit = rate_limit  # (requests, window seconds) allowed on /v1/ before answering 429
+        self.rate_limited_count = 0
+        self._api_request_times = deque()
+        self.lock = threading.RLock()
+        self.requests = []  # List of (timestamp, method, endpoint)
+        self.last_request_at = 0.0
+        self._httpd = ThreadingHTTPServer((host, port), StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self.base_url = f'http://{host}:{self._httpd.server_address[1]}'
+        self.catalog = StubCatalog(self.base_url)
+        self.player = StubPlayer(self.catalog)
+        self._art_cache = {}
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def controller_config(self) -> Dict:
+        """SpotifyController config that talks to this stub instead of the real services"""
+        return {
+            'client_id': 'stub-client',
+            'client_secret': 'stub-secret',
+            'redirect_uri': 'http://127.0.0.1:8888/callback',
+            'scope': '',
+            'access_token': 'stub-token',
+            'api_base_url': f'{self.base_url}/v1/',
+            'lyrics_api_url': f'{self.base_url}/api/get',
+            'lyrics_cache_path': ':memory:',
+            'art_cache_dir': None,  # Keep benchmark runs out of the user's art cache
+            'shuffle_history_path': None,  # ...and out of the persisted shuffle history
+        }
+
+    # ----- Request accounting -----
+
+    @staticmethod
+    def endpoint_name(method: str, path: str) -> str:
+        """Collapse ids in a path so counts group by endpoint"""
+        path = re.sub(r'/(alb|art|trk)\d{4}', r'/{id}', path)
+        path = re.sub(r'/\d+\.jpg$', '/{size}.jpg', path)
+        return f'{method} {path}'
+
+    def record(self, method: str, path: str):
+        with self.lock:
+            now = time.monotonic()
+            self.requests.append((now, method, self.endpoint_name(method, path)))
+            self.last_request_at = now
+
+    def rate_limited(self, path: str) -> int:
+        """Retry-After seconds if this Web API request is over rate_limit (rolling window), else 0"""
+        if not self.rate_limit or not path.startswith('/v1/'):
+            return 0
+        limit, window = self.rate_limit
+        with self.lock:
+            now = time.monotonic()
+            recent = self._api_request_times
+            while recent and recent[0] <= now - window:
+                recent.popleft()
+            if len(recent) >= limit:
+                self.rate_limited_count += 1
+                return max(1, math.ceil(recent[0] + window - now))
+            recent.append(now)
+            return 0
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests = []
+
+    def request_count(self) -> int:
+        with self.lock:
+            return len(self.requests)
+
+    def counts_by_endpoint(self) -> Dict[str, int]:
+        counts = {}
+        with self.lock:
+            for _, _, endpoint in self.requests:
+                counts[endpoint] = counts.get(endpoint, 0) + 1
+        return counts
+
+    def wait_idle(self, quiet: float = 0.3, timeout: float = 5.0):
+        """Block until no request has arrived for `quiet` seconds (background threads settled)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                idle_for = time.monotonic() - self.last_request_at
+            if idle_for >= quiet:
+                return True
+            time.sleep(min(quiet - idle_for, 0.05) + 0.001)
+        return False
+
+    # ----- Routing -----
+
+    @staticmethod
+    def _error(status: int, message: str, reason: Optional[str] = None):
+        error = {'status': status, 'message': message}
+        if reason:
+            error['reason'] = reason
+        return status, {'error': error}, 'application/json'
+
+    def route(self, method: str, path: str, params: Dict, body: Dict):
+        ok = lambda payload: (200, payload, 'application/json')
+        no_content = (204, None, 'application/json')
+        player = self.player
+
+        if path == '/v1/me' and method == 'GET':
+            return ok({'id': 'stub-user', 'display_name': 'Stub User', 'country': 'US', 'product': 'premium'})
+
+        if path == '/v1/me/player/devices' and method == 'GET':
+            return ok({'devices': player.devices})
+
+        if path == '/v1/me/player' and method == 'GET':
+            state = player.state()
+            return ok(state) if state else no_content
+
+        if path == '/v1/me/player' and method == 'PUT':  # Transfer playback
+            device_ids = body.get('device_ids') or []
+            if not device_ids or not player.activate(device_ids[0]):
+                return self._error(404, 'Device not found')
+            if body.get('play'):
+                player.is_playing = True
+            return no_content
+
+        if path.startswith('/v1/me/player/'):
+            return self._route_player_command(method, path[len('/v1/me/player/'):], params, body)
+
+        if path == '/v1/search' and method == 'GET':
+            kind = params.get('type', 'track')
+            limit = int(params.get('limit', 10))
+            offset = int(params.get('offset', 0))
+            items = self.catalog.search(params.get('q', ''), kind)
+            key = 'albums' if kind == 'album' else 'tracks'
+            return ok({key: {'items': items[offset:offset + limit], 'total': len(items),
+                             'limit': limit, 'offset': offset}})
+
+        match = re.fullmatch(r'/v1/albums/([^/]+)/tracks', path)
+        if match and method == 'GET':
+            tracks = self.catalog.album_tracks.get(match.group(1))
+            if tracks is None:
+                return self._error(404, 'Non existing id')
+            limit = int(params.get('limit', 20))
+            offset = int(params.get('offset', 0))
+            next_url = None
+            if offset + limit < len(tracks):
+                next_url = f'{self.base_url}{path}?offset={offset + limit}&limit={limit}'
+            return ok({'items': tracks[offset:offset + limit], 'total': len(tracks),
+                       'limit': limit, 'offset': offset, 'next': next_url})
+
+        match = re.fullmatch(r'/v1/artists/([^/]+)/top-tracks', path)
+        if match and method == 'GET':
+            return ok({'tracks': self.catalog.top_tracks(match.group(1))})
+
+        if path == '/api/get' and method == 'GET':
+            return self._route_lyrics(params)
+
+        match = re.fullmatch(r'/art/([^/]+)/(\d+)\.jpg', path)
+        if match and method == 'GET':
+            return 200, self._art_bytes(match.group(1), int(match.group(2))), 'image/jpeg'
+
+        return self._error(404, 'Service not found')
+
+    def _route_player_command(self, method: str, command: str, params: Dict, body: Dict):
+        player = self.player
+        no_content = (204, None, 'application/json')
+
+        device_id = params.get('device_id')
+        if device_id and not player.activate(device_id):
+            return self._error(404, 'Device not found')
+        if not player.active_device():
+            return self._error(404, 'Player command failed: No active device found', 'NO_ACTIVE_DEVICE')
+
+        if command == 'play' and method == 'PUT':
+            if body.get('context_uri'):
+                album_id = body['context_uri'].split(':')[-1]
+                tracks = self.catalog.album_tracks.get(album_id)
+                if tracks is None:
+                    return self._error(400, 'Invalid context uri')
+                uris = [track['uri'] for track in tracks]
+                offset = body.get('offset') or {}
+                index = 0
+                if 'uri' in offset and offset['uri'] in uris:
+                    index = uris.index(offset['uri'])
+                elif 'position' in offset:
+                    index = min(int(offset['position']), len(uris) - 1)
+                player.load(uris, index, body['context_uri'])
+            elif body.get('uris'):
+                if not all(self.catalog.track_by_uri(uri) for uri in body['uris']):
+                    return self._error(400, 'Invalid track uri')
+                player.load(list(body['uris']))
+            else:
+                if not player.queue:
+                    return self._error(404, 'Player command failed: Restriction violated', 'UNKNOWN')
+                player.set_position(player.progress_ms())
+                player.is_playing = True
+            return no_content
+
+        if command == 'pause' and method == 'PUT':
+            player.set_position(player.progress_ms())
+            player.is_playing = False
+            return no_content
+
+        if command in ('next', 'previous') and method == 'POST':
+            if command == 'next' and player.index + 1 < len(player.queue):
+                player.index += 1
+            elif command == 'previous' and player.index > 0:
+                player.index -= 1
+            player.set_position(0)
+            return no_content
+
+        if command == 'seek' and method == 'PUT':
+            player.set_position(int(params.get('position_ms', 0)))
+            return no_content
+
+        if command == 'shuffle' and method == 'PUT':
+            player.shuffle_state = params.get('state') == 'true'
+            return no_content
+
+        if command == 'repeat' and method == 'PUT':
+            player.repeat_state = params.get('state', 'off')
+            return no_content
+
+        if command == 'volume' and method == 'PUT':
+            player.active_device()['volume_percent'] = int(params.get('volume_percent', 50))
+            return no_content
+
+        return self._error(404, 'Service not found')
+
+    def _route_lyrics(self, params: Dict):
+        track_name = params.get('track_name', '').lower()
+        artist_name = params.get('artist_name', '').lower()
+        for uri in self.catalog.lyrics_available:
+            track = self.catalog.tracks[uri]
+            if track['name'].lower() == track_name and track['artists'][0]['name'].lower() == artist_name:
+                synced = self.catalog.synced_lyrics(track)
+                plain = '\n'.join(line.split(']', 1)[1] for line in synced.split('\n'))
+                return 200, {
+                    'id': zlib.crc32(uri.encode()),
+                    'trackName': track['name'],
+                    'artistName': track['artists'][0]['name'],
+                    'albumName': track['album']['name'],
+                    'duration': track['duration_ms'] // 1000,
+                    'instrumental': False,
+                    'plainLyrics': plain,
+                    'syncedLyrics': synced,
+                }, 'application/json'
+        return 404, {'code': 404, 'name': 'TrackNotFound', 'message': 'Failed to find specified track'}, 'application/json'
+
+    def _art_bytes(self, album_id: str, size: int) -> bytes:
+        key = (album_id, size)
+        if key not in self._art_cache:
+            seed = zlib.crc32(album_id.encode())
+            if Image is not None:
+                color = (seed & 0xFF, (seed >> 8) & 0xFF, (seed >> 16) & 0xFF)
+                buffer = io.BytesIO()
+                Image.new('RGB', (size, size), color).save(buffer, format='JPEG', quality=85)
+                self._art_cache[key] = buffer.getvalue()
+            else:
+                self._art_cache[key] = seed.to_bytes(4, 'big') * (size * 4)
+        return self._art_cache[key]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the local Spotify Web API / LRCLIB stand-in')
+    parser.add_argument('--port', type=int, default=8901, help='Port to listen on (default: 8901)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated per-request latency in seconds')
+    args = parser.parse_args()
+
+    server = SpotifyStubServer(port=args.port, latency=args.latency).start()
+    print(f"Spotify stub listening on {server.base_url}")
+    print("Controller config:", json.dumps(server.controller_config(), indent=2))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,10 @@
+from typing import Dict
+
+
+def format_stats(stats: Dict) -> str:
+    """One line of key=value pairs for a stats() dict (*_rate keys as percentages)"""
+    return "  ".join(
+        f"{key}={value:.0%}" if key.endswith('_rate') else
+        f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in stats.items()
+    )
@@ -0,0 +1,56 @@
+from bisect import bisect_right
+from typing import Optional, List, Tuple, Iterable, Iterator
+
+
+class SyncedLyrics:
+    """Time-synced lyric lines with O(log n) position lookup.
+
+    Timestamps are kept in a sorted array next to the line texts so the current line
+    (and the window of lines around it) can be found with a bisect instead of a scan.
+    Entries are (timestamp_ms, text) or (timestamp_ms, text, word_timings) where
+    word_timings is a list of (timestamp_ms, word) from enhanced LRC.
+    """
+
+    __slots__ = ('timestamps', 'lines', 'word_timings')
+
+    def __init__(self, entries: Iterable[Tuple] = ()):
+        entries = sorted(entries, key=lambda entry: entry[0])  # Stable: keeps file order for equal stamps
+        self.timestamps = [entry[0] for entry in entries]
+        self.lines = [entry[1] for entry in entries]
+        self.word_timings = [entry[2] if len(entry) > 2 else None for entry in entries]
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __bool__(self) -> bool:
+        return bool(self.lines)
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        return iter(zip(self.timestamps, self.lines))
+
+    def __getitem__(self, index: int) -> Tuple[int, str]:
+        return self.timestamps[index], self.lines[index]
+
+    def index_at(self, progress_ms: int) -> int:
+        """Index of the line being sung at progress_ms, or -1 before the first line"""
+        return bisect_right(self.timestamps, progress_ms) - 1
+
+    def line_at(self, progress_ms: int) -> Optional[str]:
+        """Text of the line being sung at progress_ms"""
+        index = self.index_at(progress_ms)
+        return self.lines[index] if index >= 0 else None
+
+    def words_at(self, index: int) -> Optional[List[Tuple[int, str]]]:
+        """Word-level (timestamp_ms, word) timings for a line, if the source had them"""
+        return self.word_timings[index] if 0 <= index < len(self.word_timings) else None
+
+    def window(self, progress_ms: int, before: int = 3, after: int = 10) -> Tuple[int, int, List[str]]:
+        """(start_index, current_index, lines) for the lines around progress_ms.
+
+        Lines run from `before` lines ahead of the current one up to (but excluding)
+        current_index + after.
+        """
+        current_index = self.index_at(progress_ms)
+        start_index = max(0, current_index - before)
+        end_index = min(len(self.lines), current_index + after)
+        return start_index, current_index, self.lines[start_index:end_index]
@@ -0,0 +1,135 @@
+import threading
+from collections import deque
+from typing import Optional, Dict, Callable, Hashable, Any
+
+
+TASK_POOL_WORKERS = 4
+TASK_POOL_QUEUE_SIZE = 32  # Oldest queued task is dropped beyond this
+
+_CURRENT = object()  # submit() default: tag the task with the current generation token
+
+
+class _Task:
+    __slots__ = ('fn', 'args', 'kwargs', 'on_result', 'token', 'kind', 'cancel_stale')
+
+    def __init__(self, fn, args, kwargs, on_result, token, kind, cancel_stale):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.token = token
+        self.kind = kind
+        self.cancel_stale = cancel_stale
+
+
+class TaskPool:
+    """Bounded worker pool for front-end background work (lyrics, context updates, art, commands).
+
+    Each task carries a generation token - by default the current track URI when it was
+    submitted. A task whose token no longer matches is skipped if it hasn't started, and
+    its result is discarded instead of handed to on_result if it finishes late, so a slow
+    lookup for an old track can't overwrite the new track's state. Submitting a task of a
+    given kind also drops queued tasks of the same kind (latest wins).
+    """
+
+    def __init__(self, current_token: Callable[[], Hashable] = lambda: None, workers: int = TASK_POOL_WORKERS,
+                 max_queue: int = TASK_POOL_QUEUE_SIZE, name: str = 'tasks'):
+        self.current_token = current_token
+        self.workers = workers
+        self.max_queue = max_queue
+        self.name = name
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0  # Stale before they started
+        self.superseded = 0  # Replaced by a newer task of the same kind while queued
+        self.dropped = 0  # Pushed out of a full queue
+        self.discarded = 0  # Finished after their generation went stale
+        self.errors = 0
+        self._queue = deque()
+        self._threads = []
+        self._idle = 0
+        self._busy = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def submit(self, fn: Callable, *args, on_result: Optional[Callable[[Any], None]] = None,
+               token: Hashable = _CURRENT, kind: Optional[str] = None, cancel_stale: bool = True, **kwargs):
+        """Queue fn(*args, **kwargs); on_result(result) runs on the worker unless the token went stale.
+
+        token=None never goes stale. cancel_stale=False still runs the task after its
+        generation changed (e.g. to fill a cache) and only discards the result.
+        """
+        task = _Task(fn, args, kwargs, on_result,
+                     self.current_token() if token is _CURRENT else token, kind, cancel_stale)
+        with self._cond:
+            if self._closed:
+                return
+            if kind is not None:
+                queued = len(self._queue)
+                self._queue = deque(queued_task for queued_task in self._queue if queued_task.kind != kind)
+                self.superseded += queued - len(self._queue)
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(task)
+            self.submitted += 1
+            if not self._idle and len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'{self.name}-{len(self._threads)}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+
+    def is_stale(self, token: Hashable) -> bool:
+        return token is not None and token != self.current_token()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                if self._closed:
+                    return
+                task = self._queue.popleft()
+                self._busy += 1
+
+            outcome = 'completed'
+            try:
+                if task.cancel_stale and self.is_stale(task.token):
+                    outcome = 'cancelled'
+                else:
+                    result = task.fn(*task.args, **task.kwargs)
+                    if self.is_stale(task.token):
+                        outcome = 'discarded'
+                    elif task.on_result:
+                        task.on_result(result)
+            except Exception as e:
+                outcome = 'errors'
+                print(f"Background task failed: {e}")
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def shutdown(self):
+        """Drop queued tasks and let workers exit once their current task is done"""
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'threads': sum(thread.is_alive() for thread in self._threads),
+                'busy': self._busy,
+                'queued': len(self._queue),
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+                'superseded': self.superseded,
+                'dropped': self.dropped,
+                'discarded': self.discarded,
+                'errors': self.errors,
+            }
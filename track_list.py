@@ -0,0 +1,76 @@
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
+
+
+class TrackList:
+    """Ordered context tracks (album, playlist, top tracks) with an O(1) URI -> position index.
+
+    The index is built once when the list is created; extended() reuses it when more
+    pages of the same context arrive. Instances are treated as immutable so readers on
+    other threads always see a consistent list + index pair.
+    """
+
+    __slots__ = ('tracks', 'positions')
+
+    def __init__(self, tracks: Iterable[Dict] = ()):
+        self.tracks = list(tracks)
+        self.positions = {}
+        self._index_from(0)
+
+    def _index_from(self, start: int):
+        positions = self.positions
+        for index in range(start, len(self.tracks)):
+            uri = self.tracks[index].get('uri')
+            if uri and uri not in positions:  # First occurrence wins for repeated tracks
+                positions[uri] = index
+
+    def extended(self, tracks: Iterable[Dict]) -> 'TrackList':
+        """New list with tracks appended, indexing only the new ones"""
+        extended = TrackList.__new__(TrackList)
+        extended.tracks = self.tracks + list(tracks)
+        extended.positions = dict(self.positions)
+        extended._index_from(len(self.tracks))
+        return extended
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def __bool__(self) -> bool:
+        return bool(self.tracks)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.tracks)
+
+    def __getitem__(self, index):
+        return self.tracks[index]
+
+    def index_of(self, uri: Optional[str]) -> int:
+        """Position of the track with this URI, or -1"""
+        return self.positions.get(uri, -1) if uri else -1
+
+    def offset_index(self, index: int, offset: int, wrap: bool = False) -> int:
+        """Position `offset` tracks away from index (wrapping around if asked), or -1 past either end"""
+        if not self.tracks or index < 0:
+            return -1
+        target = index + offset
+        if wrap:
+            return target % len(self.tracks)
+        return target if 0 <= target < len(self.tracks) else -1
+
+    def next_tracks(self, index: int, count: int, wrap: bool = False) -> List[Dict]:
+        """Up to count tracks after index (from the start when index is -1)"""
+        upcoming = self.tracks[index + 1:index + 1 + count]
+        if wrap and len(upcoming) < count:
+            upcoming += self.tracks[:min(count - len(upcoming), max(index, 0))]
+        return upcoming
+
+    def previous_tracks(self, index: int, count: int) -> List[Dict]:
+        """Up to count tracks before index, nearest first"""
+        if index <= 0:
+            return []
+        return self.tracks[max(0, index - count):index][::-1]
+
+    def window(self, index: int, before: int = 2, after: int = 2) -> Tuple[int, int, List[Dict]]:
+        """(start, end, tracks) for the slice from `before` tracks ahead of index to `after` tracks past it"""
+        start = max(0, index - before)
+        end = min(len(self.tracks), index + after + 1)
+        return start, end, self.tracks[start:end]
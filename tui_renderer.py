@@ -0,0 +1,72 @@
+import time
+from collections import deque
+from typing import Callable, Dict, Hashable, Optional
+from rich.layout import Layout
+
+
+_UNSET = object()
+
+
+class PanelRenderer:
+    """Rich Layout whose panels are rebuilt only when the state they depend on changes.
+
+    Each panel registers a stamp function returning a cheap, hashable summary of the state
+    it renders (track URI, whole seconds of progress, current lyric index, ...) and a build
+    function returning the renderable. render() rebuilds just the panels whose stamp moved;
+    a frame where nothing moved does no building and needs no terminal refresh.
+    """
+
+    def __init__(self, layout: Layout):
+        self.layout = layout
+        self.frames = 0
+        self.frames_skipped = 0
+        self.panels_built = 0
+        self.build_ms = deque(maxlen=200)  # Time spent per frame that rebuilt something
+        self.skip_ms = deque(maxlen=200)  # Time spent per frame that rebuilt nothing (stamp checks only)
+        self._panels = []  # (layout name, stamp, build)
+        self._stamps = {}
+
+    def add_panel(self, name: str, stamp: Callable[[], Hashable], build: Callable[[], object]):
+        self._panels.append((name, stamp, build))
+
+    def invalidate(self, name: Optional[str] = None):
+        """Force a rebuild of one panel (or all) on the next frame"""
+        if name is None:
+            self._stamps.clear()
+        else:
+            self._stamps.pop(name, None)
+
+    def render(self) -> bool:
+        """Rebuild panels whose stamp changed; True if the screen needs a refresh"""
+        started = time.perf_counter()
+        self.frames += 1
+        changed = False
+        for name, stamp, build in self._panels:
+            version = stamp()
+            if self._stamps.get(name, _UNSET) == version:
+                continue
+            self._stamps[name] = version
+            self.layout[name].update(build())
+            self.panels_built += 1
+            changed = True
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if changed:
+            self.build_ms.append(elapsed_ms)
+        else:
+            self.frames_skipped += 1
+            self.skip_ms.append(elapsed_ms)
+        return changed
+
+    def stats(self) -> Dict:
+        built = list(self.build_ms)
+        skipped = list(self.skip_ms)
+        return {
+            'frames': self.frames,
+            'frames_skipped': self.frames_skipped,
+            'skip_rate': self.frames_skipped / self.frames if self.frames else 0.0,
+            'panels_built': self.panels_built,
+            'mean_build_ms': round(sum(built) / len(built), 3) if built else 0.0,
+            'max_build_ms': round(max(built), 3) if built else 0.0,
+            'mean_skip_ms': round(sum(skipped) / len(skipped), 4) if skipped else 0.0,
+        }